@@ -0,0 +1,291 @@
+"""
+End-to-end interaction latency of the main window, offscreen.
+
+For each dataset size a synthetic dataset is generated and a fresh interpreter opens
+MainWindow on it under QT_QPA_PLATFORM=offscreen, then scripts what a user does:
+open the folder, Alt+Right through the list, scrub the slider, type into the
+Ctrl+F box and Save All. Every interaction is timed from the key press until the
+event queue is empty again. The run fails (exit status 1) if a p95 exceeds its
+budget, or if an interaction got much slower on the larger datasets than on the
+smallest, since those latencies should not depend on the dataset size.
+
+    python benchmarks/latency_benchmark.py
+    python benchmarks/latency_benchmark.py --sizes 1000,100000,1000000 --output latency.json
+    python benchmarks/latency_benchmark.py --budget navigate=30 --budget find_keystroke=20
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_dataset import generate_dataset  # noqa: E402
+
+# p95 budgets in ms as (fixed, per 1000 items). Only opening a folder and the first
+# search (which builds the search index) are allowed to grow with the dataset.
+BUDGETS = {
+    'open_first_paint': (1500, 0),
+    'open_loaded': (1000, 50),
+    'navigate': (50, 0),
+    'scrub': (50, 0),
+    'find_open': (500, 0),
+    'find_keystroke': (30, 0),
+    'find_results': (500, 75),
+    'save_all_shortcut': (100, 0),
+    'save_all_complete': (3000, 0),
+}
+# Interactions whose latency must stay flat across dataset sizes.
+FLAT_INTERACTIONS = ('navigate', 'scrub', 'find_keystroke', 'save_all_shortcut')
+FLATNESS_FLOOR_MS = 5
+FIND_TEXT = "black and white"
+# An interaction that hasn't finished after this long is reported as broken.
+INTERACTION_TIMEOUT_S = 300
+
+
+def budget_ms(name, items, overrides):
+    if name in overrides:
+        return overrides[name]
+    fixed, per_thousand = BUDGETS[name]
+    return fixed + per_thousand * items / 1000
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return None
+
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+    return {
+        'count': len(ordered),
+        'p50': round(percentile(0.5), 2),
+        'p95': round(percentile(0.95), 2),
+        'max': round(ordered[-1], 2),
+    }
+
+
+# --- Child process: drives the window ---
+
+def _measure(folder, navigate_count, scrub_steps, save_count):
+    start = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtTest import QTest
+    app = QApplication([])
+    from dataset_quick_view.main_window import MainWindow
+    from dataset_quick_view.utils.config_manager import ConfigManager
+
+    config_dir = tempfile.mkdtemp(prefix='dqv-latency-config-')
+    config = ConfigManager(os.path.join(config_dir, 'config.ini'))
+    with config.batch():
+        # Every interaction must be explicit; nothing saves behind the harness' back.
+        config.set_setting('Editing', 'auto_save', 'false')
+        config.set_setting('General', 'recursive_search', 'true')
+    samples = {}
+
+    def settle():
+        app.processEvents()
+
+    def wait_for(condition, what):
+        deadline = time.perf_counter() + INTERACTION_TIMEOUT_S
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Timed out waiting for {what}")
+            app.processEvents()
+            time.sleep(0.0005)
+
+    def timed(name, action, wait_until=None):
+        t0 = time.perf_counter()
+        action()
+        settle()
+        if wait_until is not None:
+            wait_for(wait_until, name)
+        samples.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+
+    # Open folder
+    window = MainWindow(folder, config)
+    # The dataset is thrown away afterwards; don't leave a crash-recovery journal for it.
+    atexit.register(lambda: window.edit_journal.discard())
+    loader = window.file_operations.dataset_loader
+    finished = []
+    loader.loaded.connect(lambda *_args: finished.append(time.perf_counter()))
+    loader.failed.connect(lambda *_args: finished.append(time.perf_counter()))
+    window.resize(1280, 800)
+    window.show()
+    window.activateWindow()
+    settle()
+    samples['open_first_paint'] = [(time.perf_counter() - start) * 1000]
+    wait_for(lambda: finished, "the dataset to load")
+    settle()
+    samples['open_loaded'] = [(time.perf_counter() - start) * 1000]
+    item_count = window.file_list.count()
+
+    # Alt+Right through the list, jumping back to the start at the end.
+    for _ in range(min(navigate_count, max(0, item_count - 1) * 4)):
+        if window.file_list.currentRow() >= item_count - 1:
+            QTest.keyClick(window, Qt.Key.Key_Home, Qt.KeyboardModifier.AltModifier)
+            settle()
+        timed('navigate', lambda: QTest.keyClick(window, Qt.Key.Key_Right, Qt.KeyboardModifier.AltModifier))
+    navigated_to = window.file_list.currentRow()
+
+    # Scrub the slider across the whole list, like dragging its handle.
+    slider = window.file_list.slider
+    slider.setSliderDown(True)
+    for step in range(scrub_steps):
+        value = round(step * (item_count - 1) / max(1, scrub_steps - 1))
+        timed('scrub', lambda value=value: slider.setValue(value))
+    slider.setSliderDown(False)
+    settle()
+
+    # Ctrl+F and type; results appear after the dialog's debounce.
+    timed('find_open', lambda: QTest.keyClick(window, Qt.Key.Key_F, Qt.KeyboardModifier.ControlModifier))
+    find_dialog = window.dialog_manager.find_dialog
+    for character in FIND_TEXT:
+        timed('find_keystroke', lambda character=character: QTest.keyClicks(find_dialog.find_input, character))
+    timer = find_dialog.search_update_timer
+    timed('find_results', lambda: None, wait_until=lambda: not timer.isActive())
+    find_hits = len(find_dialog.global_search_results)
+    find_dialog.close()
+    # Shortcuts only reach the active window.
+    window.activateWindow()
+    settle()
+
+    # Edit captions in bulk, then Ctrl+Shift+S.
+    text_paths = sorted({text_path for text_paths in window.app_state.dataset.values() for text_path in text_paths})[:save_count]
+    window.apply_text_changes([(text_path, window.get_text_content(text_path) + ", latency edit") for text_path in text_paths])
+    settle()
+    dirty_count = len(window.app_state.dirty_files)
+    save_engine = window.file_operations.save_engine
+    t0 = time.perf_counter()
+    timed('save_all_shortcut', lambda: QTest.keyClick(window, Qt.Key.Key_S,
+                                                      Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier))
+    wait_for(lambda: not save_engine.is_busy() and not window.app_state.dirty_files, "Save All to finish")
+    samples['save_all_complete'] = [(time.perf_counter() - t0) * 1000]
+
+    window.close()
+    loader.shutdown()
+    shutil.rmtree(config_dir, ignore_errors=True)
+    print(json.dumps({
+        'items': item_count,
+        'navigated_to_row': navigated_to,
+        'find_hits': find_hits,
+        'saved_files': dirty_count,
+        'samples': samples,
+    }))
+
+
+def measure_in_child(folder, args, timeout_s):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen',
+               PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    command = [sys.executable, os.path.abspath(__file__), '--measure', folder,
+               '--navigate', str(args.navigate), '--scrub', str(args.scrub), '--save-count', str(args.save_count)]
+    process = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=timeout_s)
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"Latency measurement failed:\n{process.stderr[-3000:]}")
+
+
+# --- Parent process ---
+
+def check(report, overrides, max_growth):
+    failures = []
+    runs = report['runs']
+    for run in runs:
+        for name, stats in run['interactions'].items():
+            limit = budget_ms(name, run['items'], overrides)
+            stats['budget_ms'] = round(limit, 1)
+            if stats['p95'] > limit:
+                failures.append(f"{run['items']} items: {name} p95 {stats['p95']} ms > {limit:.0f} ms")
+    if len(runs) > 1:
+        smallest = runs[0]
+        for run in runs[1:]:
+            for name in FLAT_INTERACTIONS:
+                base = smallest['interactions'].get(name)
+                current = run['interactions'].get(name)
+                if not base or not current:
+                    continue
+                # Sub-floor latencies are noise; a 1 ms -> 3 ms change is not a regression.
+                ratio = current['p95'] / max(base['p95'], FLATNESS_FLOOR_MS)
+                if ratio > max_growth:
+                    failures.append(f"{name} p95 grew x{ratio:.1f} from {smallest['items']} to {run['items']} items")
+    return failures
+
+
+def _parse_budget(value):
+    name, _, limit = value.partition('=')
+    if name not in BUDGETS or not limit:
+        raise argparse.ArgumentTypeError(f"expected NAME=MS with NAME one of {', '.join(BUDGETS)}")
+    return name, float(limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure interaction latency of the main window on synthetic datasets.")
+    parser.add_argument('--sizes', default='1000,10000', help="Comma separated dataset sizes (default: 1000,10000).")
+    parser.add_argument('--navigate', type=int, default=1000, help="Alt+Right presses (default: 1000).")
+    parser.add_argument('--scrub', type=int, default=200, help="Slider positions to scrub through (default: 200).")
+    parser.add_argument('--save-count', type=int, default=1000, help="Captions to edit before Save All (default: 1000).")
+    parser.add_argument('--image-size', default='64x64', help="Size of the generated images (default: 64x64).")
+    parser.add_argument('--budget', type=_parse_budget, action='append', default=[], metavar='NAME=MS',
+                        help="Override a p95 budget in ms; can be repeated.")
+    parser.add_argument('--max-growth', type=float, default=3.0,
+                        help="Fail if a flat interaction's p95 grows more than this from the smallest size (default: 3).")
+    parser.add_argument('--timeout', type=float, default=3600, help="Seconds allowed per dataset size.")
+    parser.add_argument('--output', help="Write the report as JSON.")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(args.measure, args.navigate, args.scrub, args.save_count)
+        return 0
+
+    width, _, height = args.image_size.lower().partition('x')
+    image_size = (int(width), int(height or width))
+    report = {'runs': []}
+    for size in sorted(int(value) for value in args.sizes.split(',') if value.strip()):
+        temp_dir = tempfile.mkdtemp(prefix='dqv-latency-')
+        try:
+            folder = os.path.join(temp_dir, 'dataset')
+            print(f"Generating {size} item(s)...", file=sys.stderr)
+            # Real images at every size, so navigate and scrub decode as much per step at 1M
+            # items as at 1k (a 64x64 PNG is ~140 bytes); the nested folders keep directories listable.
+            depth = 0 if size <= 10000 else (1 if size <= 100000 else 2)
+            generate_dataset(folder, items=size, sizes=[image_size], depth=depth, fanout=100)
+            print(f"Measuring {size} item(s)...", file=sys.stderr)
+            result = measure_in_child(folder, args, args.timeout)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        run = {
+            'items': result['items'],
+            'find_hits': result['find_hits'],
+            'saved_files': result['saved_files'],
+            'interactions': {name: summarize(samples) for name, samples in result['samples'].items()},
+        }
+        report['runs'].append(run)
+
+    failures = check(report, dict(args.budget), args.max_growth)
+    report['failures'] = failures
+
+    for run in report['runs']:
+        print(f"{run['items']} item(s):")
+        for name, stats in run['interactions'].items():
+            print(f"  {name:<18} p50 {stats['p50']:9.2f} ms  p95 {stats['p95']:9.2f} ms  max {stats['max']:9.2f} ms"
+                  f"  (n={stats['count']}, budget {stats['budget_ms']:.0f} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
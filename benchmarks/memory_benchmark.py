@@ -0,0 +1,167 @@
+"""
+Memory footprint of the dataset structures per media item, at several dataset sizes.
+
+For each size a synthetic dataset is generated and loaded the way the window loads
+it: scan the folder, group it into the dataset, read every caption into a text
+cache and build the search index. tracemalloc measures the bytes each step keeps
+alive. The run fails (exit status 1) if a step retains more bytes per item than
+its ceiling, or if its bytes per item grow much from the smallest size to the
+largest, since these structures should scale linearly.
+
+Qt's own allocations (list items, icons, pixmaps) are invisible to tracemalloc;
+see LIST_ITEM_BYTES in widgets/file_list_view.py for how those are estimated.
+
+    python benchmarks/memory_benchmark.py
+    python benchmarks/memory_benchmark.py --sizes 1000,100000,1000000 --output memory.json
+    python benchmarks/memory_benchmark.py --ceiling search_index=2000
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_dataset import generate_dataset  # noqa: E402
+from dataset_quick_view.core.dataset_index import DatasetIndex  # noqa: E402
+from dataset_quick_view.core.caption_store import CaptionStore, read_captions  # noqa: E402
+from dataset_quick_view.core.search_index import TrigramIndex  # noqa: E402
+from dataset_quick_view.core import memory_usage  # noqa: E402
+from dataset_quick_view.utils.file_handler import scan_folder  # noqa: E402
+
+# Retained bytes per media item on the synthetic datasets (paths of ~60 characters,
+# short captions), about 1.5-2x what was measured. Real datasets with longer paths
+# and captions need more; these are for catching regressions, not sizing machines.
+CEILINGS = {
+    'scan': 650,
+    'dataset': 200,
+    'text_cache': 300,
+    'search_index': 800,
+}
+MAX_GROWTH = 1.5
+MEDIA_EXTENSIONS = ('.png', '.bmp')
+
+
+def _retained(step):
+    """Runs step() and returns (its result, bytes it keeps alive, peak bytes while it ran)."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = step()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    return result, current - before, peak - before
+
+
+def measure(folder):
+    """Loads folder step by step and returns {step: {'bytes', 'peak_bytes', 'estimate_bytes'}} and the item count."""
+    steps = {}
+    tracemalloc.start()
+    try:
+        files_by_stem, size, peak = _retained(lambda: scan_folder(folder, True))
+        steps['scan'] = {'bytes': size, 'peak_bytes': peak}
+
+        index, size, peak = _retained(lambda: DatasetIndex(folder, files_by_stem, MEDIA_EXTENSIONS))
+        steps['dataset'] = {'bytes': size, 'peak_bytes': peak}
+
+        text_paths = index.text_paths()
+        store = CaptionStore()
+
+        def fill_text_cache():
+            for text_path, content, error in read_captions(text_paths):
+                if error is None:
+                    store.text_cache[text_path] = content
+        _, size, peak = _retained(fill_text_cache)
+        steps['text_cache'] = {'bytes': size, 'peak_bytes': peak}
+
+        search_index = TrigramIndex()
+        _, size, peak = _retained(lambda: search_index.build(text_paths, store.text_cache.get))
+        steps['search_index'] = {'bytes': size, 'peak_bytes': peak}
+    finally:
+        tracemalloc.stop()
+
+    # What the in-app accounting reports for the same structures, to keep it honest.
+    estimates = memory_usage.index_usage(index)
+    estimates.update(memory_usage.caption_store_usage(store))
+    estimates.update(memory_usage.search_index_usage(search_index))
+    for name, step in steps.items():
+        step['estimate_bytes'] = estimates[name]['bytes']
+    return steps, len(index)
+
+
+def check(report, ceilings, max_growth):
+    failures = []
+    runs = report['runs']
+    for run in runs:
+        for name, step in run['steps'].items():
+            step['bytes_per_item'] = round(step['bytes'] / run['items'], 1)
+            step['ceiling'] = ceilings[name]
+            if step['bytes_per_item'] > ceilings[name]:
+                failures.append(f"{run['items']} items: {name} keeps {step['bytes_per_item']:.0f} B/item > {ceilings[name]} B/item")
+    if len(runs) > 1:
+        smallest, largest = runs[0], runs[-1]
+        for name, step in largest['steps'].items():
+            base = smallest['steps'][name]['bytes_per_item']
+            if base and step['bytes_per_item'] / base > max_growth:
+                failures.append(f"{name} grew from {base:.0f} to {step['bytes_per_item']:.0f} B/item "
+                                f"between {smallest['items']} and {largest['items']} items")
+    return failures
+
+
+def _parse_ceiling(value):
+    name, _, limit = value.partition('=')
+    if name not in CEILINGS or not limit:
+        raise argparse.ArgumentTypeError(f"expected NAME=BYTES with NAME one of {', '.join(CEILINGS)}")
+    return name, float(limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bytes per item of the dataset structures on synthetic datasets.")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="Comma separated dataset sizes (default: 1000,10000,100000).")
+    parser.add_argument('--ceiling', type=_parse_ceiling, action='append', default=[], metavar='NAME=BYTES',
+                        help="Override a bytes per item ceiling; can be repeated.")
+    parser.add_argument('--max-growth', type=float, default=MAX_GROWTH,
+                        help=f"Fail if bytes per item grow more than this from the smallest size (default: {MAX_GROWTH}).")
+    parser.add_argument('--output', help="Write the report as JSON.")
+    args = parser.parse_args()
+
+    ceilings = dict(CEILINGS, **dict(args.ceiling))
+    report = {'runs': []}
+    for size in sorted(int(value) for value in args.sizes.split(',') if value.strip()):
+        temp_dir = tempfile.mkdtemp(prefix='dqv-memory-')
+        try:
+            folder = os.path.join(temp_dir, 'dataset')
+            print(f"Generating {size} item(s)...", file=sys.stderr)
+            depth = 0 if size <= 10000 else (1 if size <= 100000 else 2)
+            generate_dataset(folder, items=size, sizes=[(8, 8)], depth=depth, fanout=100, empty_images=True)
+            print(f"Measuring {size} item(s)...", file=sys.stderr)
+            steps, items = measure(folder)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        report['runs'].append({'items': items, 'steps': steps})
+
+    failures = check(report, ceilings, args.max_growth)
+    report['failures'] = failures
+
+    for run in report['runs']:
+        print(f"{run['items']} item(s):")
+        for name, step in run['steps'].items():
+            print(f"  {name:<13} {memory_usage.format_bytes(step['bytes']):>10}  {step['bytes_per_item']:7.0f} B/item"
+                  f"  (peak {step['peak_bytes'] / run['items']:7.0f} B/item, estimate {step['estimate_bytes'] / run['items']:7.0f} B/item,"
+                  f" ceiling {step['ceiling']:.0f})")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+Micro-benchmarks for the operations that scale with dataset size.
+
+Generates a synthetic dataset (see synthetic_dataset.py), times each benchmark a
+number of times and writes the results as JSON. Passing an earlier result file with
+--compare prints the change per benchmark and exits with status 1 if any median got
+slower than the allowed ratio, so results of two versions can be diffed in CI.
+
+    python benchmarks/run_benchmarks.py --items 5000 --output before.json
+    python benchmarks/run_benchmarks.py --items 5000 --output after.json --compare before.json
+    python benchmarks/run_benchmarks.py --only scan,search --dataset path/to/dataset
+
+Qt benchmarks run on the offscreen platform. Benchmarks that write captions only
+run on generated datasets.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from synthetic_dataset import generate_dataset, add_generator_arguments, generator_kwargs  # noqa: E402
+from dataset_quick_view.utils.config_manager import Settings  # noqa: E402
+
+RESULT_FORMAT_VERSION = 1
+THUMBNAIL_SAMPLE = 200
+SEARCH_QUERIES = ("cat", "sunset", "black and white", "sharp", "zzz not found")
+
+
+class BenchmarkConfig:
+    """Stands in for ConfigManager, so benchmarks never read or write config.ini."""
+
+    def __init__(self, **overrides):
+        self.settings = Settings.defaults()._replace(**overrides)
+
+    def subscribe(self, callback):
+        pass
+
+    def unsubscribe(self, callback):
+        pass
+
+
+class BenchmarkContext:
+    def __init__(self, folder, writable):
+        self.folder = folder
+        self.writable = writable
+        self.config = BenchmarkConfig()
+        self._dataset = None
+        self._app = None
+
+    @property
+    def dataset(self):
+        if self._dataset is None:
+            from dataset_quick_view.utils.file_handler import find_dataset_files
+            self._dataset = find_dataset_files(self.folder, True)
+        return self._dataset
+
+    def text_paths(self):
+        return sorted({text_path for text_paths in self.dataset.values() for text_path in text_paths})
+
+    def qt_app(self):
+        if self._app is None:
+            from PyQt6.QtWidgets import QApplication
+            self._app = QApplication.instance() or QApplication([])
+        return self._app
+
+
+class Benchmark:
+    """A named, repeatable measurement: setup() runs untimed before every run()."""
+    name = None
+    description = ""
+    writes = False
+
+    def __init__(self, context):
+        self.context = context
+
+    def setup(self):
+        pass
+
+    def run(self):
+        raise NotImplementedError
+
+    def teardown(self):
+        pass
+
+
+class ScanBenchmark(Benchmark):
+    name = 'scan'
+    description = "find_dataset_files over the whole folder, recursively"
+
+    def run(self):
+        from dataset_quick_view.utils.file_handler import find_dataset_files
+        return len(find_dataset_files(self.context.folder, True))
+
+
+class ListPopulationBenchmark(Benchmark):
+    name = 'populate_list'
+    description = "FileListView.populate_list in list mode"
+
+    def setup(self):
+        self.context.qt_app()
+        if not hasattr(self, 'view'):
+            from dataset_quick_view.widgets.file_list_view import FileListView
+            self.view = FileListView(self.context.config, self.context.dataset)
+
+    def run(self):
+        self.view.populate_list(self.context.dataset.keys())
+        return self.view.count()
+
+    def teardown(self):
+        self.view.thumbnail_thread.quit()
+        self.view.thumbnail_thread.wait()
+
+
+class ThumbnailBenchmark(Benchmark):
+    name = 'thumbnails'
+    description = f"Decoding and scaling the first {THUMBNAIL_SAMPLE} images to 80 px thumbnails"
+
+    def setup(self):
+        self.context.qt_app()
+        from dataset_quick_view.widgets.file_list_view import ThumbnailWorker
+        self.worker = ThumbnailWorker()
+        self.made = []
+        self.worker.thumbnail_ready.connect(lambda row, _icon: self.made.append(row))
+        media_paths = sorted(self.context.dataset)[:THUMBNAIL_SAMPLE]
+        self.tasks = [(row, media_path, 80) for row, media_path in enumerate(media_paths)]
+
+    def run(self):
+        self.made.clear()
+        self.worker.process_thumbnails(self.tasks)
+        return len(self.made)
+
+
+def _search_state(context):
+    from dataset_quick_view.core.app_state import AppState
+    app_state = AppState(context.folder, context.config)
+    app_state.set_dataset(context.dataset)
+    return app_state
+
+
+class SearchColdBenchmark(Benchmark):
+    name = 'search_cold'
+    description = "Global search including building the trigram index"
+
+    def setup(self):
+        from dataset_quick_view.core.search_engine import SearchEngine
+        app_state = _search_state(self.context)
+        self.engine = SearchEngine(app_state, app_state.read_text)
+
+    def run(self):
+        return len(self.engine.search(SEARCH_QUERIES[0]))
+
+
+class SearchWarmBenchmark(Benchmark):
+    name = 'search'
+    description = f"{len(SEARCH_QUERIES)} global searches on a built index"
+
+    def setup(self):
+        if not hasattr(self, 'engine'):
+            from dataset_quick_view.core.search_engine import SearchEngine
+            app_state = _search_state(self.context)
+            self.engine = SearchEngine(app_state, app_state.read_text)
+            self.engine.ensure_index()
+        # Measure the searches themselves, not the result cache.
+        self.engine._invalidate()
+
+    def run(self):
+        return sum(len(self.engine.search(query)) for query in SEARCH_QUERIES)
+
+
+class ReplaceAllBenchmark(Benchmark):
+    name = 'replace_all'
+    description = "Replace All of a common tag across every caption on disk"
+    writes = True
+
+    def setup(self):
+        from dataset_quick_view.core.search_index import compile_search_pattern
+        from dataset_quick_view.core.transforms import RegexReplace
+        # Alternate directions so every run rewrites the same files.
+        forward = getattr(self, 'forward', False)
+        self.forward = not forward
+        find_text, replace_text = ("outdoors", "outside") if self.forward else ("outside", "outdoors")
+        self.transform = RegexReplace(compile_search_pattern(find_text, whole_words=True), replace_text)
+        self.text_paths = self.context.text_paths()
+
+    def run(self):
+        from dataset_quick_view.core.transforms import run_transforms
+        return sum(1 for result in run_transforms(self.text_paths, self.transform, return_content=False) if result.written)
+
+    def teardown(self):
+        if self.forward:
+            # Leave the dataset as generated.
+            self.setup()
+            self.run()
+
+
+class SaveAllBenchmark(Benchmark):
+    name = 'save_all'
+    description = "SaveEngine writing an edit of every caption"
+    writes = True
+
+    def setup(self):
+        from dataset_quick_view.core.save_engine import SaveEngine
+        from dataset_quick_view.core.text_baselines import TextBaselines
+        if not hasattr(self, 'originals'):
+            self.engine = SaveEngine(baselines=TextBaselines())
+            self.originals = {}
+            for text_path in self.context.text_paths():
+                with open(text_path, 'r', encoding='utf-8') as f:
+                    self.originals[text_path] = f.read()
+        self.round = getattr(self, 'round', 0) + 1
+        self.snapshot = {text_path: f"{content}, edit {self.round}" for text_path, content in self.originals.items()}
+
+    def run(self):
+        batch = self.engine.enqueue(self.snapshot).wait()
+        return len(batch.saved)
+
+    def teardown(self):
+        self.engine.enqueue(self.originals).wait()
+        self.engine.shutdown()
+
+
+BENCHMARKS = (ScanBenchmark, ListPopulationBenchmark, ThumbnailBenchmark, SearchColdBenchmark,
+              SearchWarmBenchmark, ReplaceAllBenchmark, SaveAllBenchmark)
+
+
+def run_benchmark(benchmark, repeat, warmup=1):
+    times = []
+    result = None
+    try:
+        for run_index in range(warmup + repeat):
+            benchmark.setup()
+            start = time.perf_counter()
+            result = benchmark.run()
+            elapsed = time.perf_counter() - start
+            if run_index >= warmup:
+                times.append(elapsed)
+    finally:
+        benchmark.teardown()
+    return {
+        'description': benchmark.description,
+        'result': result,
+        'runs': [round(t, 6) for t in times],
+        'min': round(min(times), 6),
+        'median': round(statistics.median(times), 6),
+        'mean': round(statistics.fmean(times), 6),
+        'max': round(max(times), 6),
+    }
+
+
+def _git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, timeout=10).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                               capture_output=True, text=True, timeout=10).stdout.strip()
+        return revision + ('-dirty' if dirty else '') if revision else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    try:
+        from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    except ImportError:
+        PYQT_VERSION_STR = QT_VERSION_STR = None
+    return {
+        'revision': _git_revision(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+    }
+
+
+def compare(results, baseline, max_ratio):
+    """Returns (lines, regressions) comparing medians with a baseline result file."""
+    lines = []
+    regressions = []
+    if baseline.get('dataset', {}).get('media_items') != results['dataset'].get('media_items'):
+        lines.append("note: the baseline was measured on a different dataset size")
+    for name, entry in results['benchmarks'].items():
+        old = baseline.get('benchmarks', {}).get(name)
+        if not old:
+            lines.append(f"  {name:<16} {entry['median'] * 1000:10.2f} ms   (new)")
+            continue
+        ratio = entry['median'] / old['median'] if old['median'] else float('inf')
+        flag = ''
+        if ratio > max_ratio:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        lines.append(f"  {name:<16} {old['median'] * 1000:10.2f} ms -> {entry['median'] * 1000:10.2f} ms  x{ratio:.2f}{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run DatasetQuickView's micro-benchmarks.")
+    parser.add_argument('--dataset', help="Benchmark an existing folder instead of generating one (write benchmarks are skipped).")
+    parser.add_argument('--only', help="Comma separated benchmark names: " + ', '.join(b.name for b in BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark (default: 5).")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--compare', help="Earlier results JSON to compare with.")
+    parser.add_argument('--max-ratio', type=float, default=1.25,
+                        help="With --compare, fail if a median is more than this many times slower (default: 1.25).")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated dataset.")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    selected = BENCHMARKS
+    if args.only:
+        names = {name.strip() for name in args.only.split(',')}
+        unknown = names - {benchmark.name for benchmark in BENCHMARKS}
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+        selected = [benchmark for benchmark in BENCHMARKS if benchmark.name in names]
+
+    temp_dir = None
+    if args.dataset:
+        folder = os.path.abspath(args.dataset)
+        dataset_info = {'folder': folder, 'generated': False}
+    else:
+        temp_dir = tempfile.mkdtemp(prefix='dqv-bench-')
+        folder = os.path.join(temp_dir, 'dataset')
+        print(f"Generating {args.items} item(s) in {folder}...", file=sys.stderr)
+        dataset_info = generate_dataset(folder, **generator_kwargs(args))
+        dataset_info['generated'] = True
+
+    context = BenchmarkContext(folder, writable=not args.dataset)
+    dataset_info['media_items'] = len(context.dataset)
+    dataset_info['caption_files'] = len(context.text_paths())
+    results = {'version': RESULT_FORMAT_VERSION, 'environment': environment(), 'dataset': dataset_info, 'benchmarks': {}}
+    try:
+        for benchmark_class in selected:
+            if benchmark_class.writes and not context.writable:
+                print(f"{benchmark_class.name}: skipped (writes captions)", file=sys.stderr)
+                continue
+            entry = run_benchmark(benchmark_class(context), args.repeat)
+            results['benchmarks'][benchmark_class.name] = entry
+            print(f"{benchmark_class.name:<16} median {entry['median'] * 1000:10.2f} ms  "
+                  f"(min {entry['min'] * 1000:.2f}, max {entry['max'] * 1000:.2f})  {benchmark_class.description}")
+    finally:
+        if temp_dir and not args.keep:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.max_ratio)
+        print(f"Compared with {args.compare} ({baseline.get('environment', {}).get('revision') or 'unknown revision'}):")
+        print("\n".join(lines))
+        if regressions:
+            print(f"FAIL: slower than x{args.max_ratio}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
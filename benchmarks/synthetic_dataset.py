@@ -0,0 +1,201 @@
+"""
+Generates synthetic datasets for benchmarking.
+
+Images are real PNG (and, for items that share a basename, BMP) files written with
+the standard library only, so generating needs neither Qt nor Pillow. Captions are
+comma separated tags drawn from a fixed vocabulary; a seed makes every dataset
+reproducible.
+
+    python benchmarks/synthetic_dataset.py out/folder --items 10000 --sizes 512x512,1024x768
+    python benchmarks/synthetic_dataset.py out/folder --items 100000 --empty-images --depth 2
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import zlib
+
+TAG_VOCABULARY = (
+    "cat", "dog", "bird", "person", "car", "tree", "house", "mountain", "river", "beach",
+    "sunset", "portrait", "outdoors", "indoors", "night", "day", "red", "blue", "green",
+    "black and white", "close-up", "wide shot", "blurry", "sharp focus", "smiling",
+    "standing", "sitting", "running", "city", "forest", "snow", "rain", "painting",
+    "photo", "illustration", "3d render", "sketch", "high contrast", "low light", "bokeh",
+)
+COLOR_VARIANTS = 8
+
+
+def parse_sizes(value):
+    """'512x512,1024x768' -> [(512, 512), (1024, 768)]"""
+    sizes = []
+    for part in value.split(','):
+        width, _, height = part.strip().lower().partition('x')
+        sizes.append((int(width), int(height or width)))
+    return sizes
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def encode_png(width, height, color):
+    """An RGB PNG with a horizontal gradient from color to black."""
+    row = bytearray()
+    for x in range(width):
+        fade = 1 - x / max(1, width - 1)
+        row += bytes(int(channel * fade) for channel in color)
+    raw = b''.join(b'\x00' + bytes(row) for _ in range(height))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header)
+            + _png_chunk(b'IDAT', zlib.compress(raw, 6)) + _png_chunk(b'IEND', b''))
+
+
+def encode_bmp(width, height, color):
+    """An uncompressed 24-bit BMP filled with color."""
+    row_size = (width * 3 + 3) & ~3
+    pixel = bytes((color[2], color[1], color[0]))
+    row = (pixel * width).ljust(row_size, b'\x00')
+    pixels = row * height
+    header = struct.pack('<2sIHHI', b'BM', 54 + len(pixels), 0, 0, 54)
+    info = struct.pack('<IiiHHIIiiII', 40, width, height, 1, 24, 0, len(pixels), 2835, 2835, 0, 0)
+    return header + info + pixels
+
+
+class ImageCache:
+    """Encodes each (format, size, color) once; generated datasets reuse the bytes."""
+
+    def __init__(self, sizes, empty=False):
+        self.sizes = sizes
+        self.empty = empty
+        self._cache = {}
+
+    def get(self, ext, size, variant):
+        if self.empty:
+            return b''
+        key = (ext, size, variant)
+        data = self._cache.get(key)
+        if data is None:
+            rng = random.Random(variant)
+            color = tuple(rng.randrange(64, 256) for _ in range(3))
+            encode = encode_bmp if ext == '.bmp' else encode_png
+            data = self._cache[key] = encode(size[0], size[1], color)
+        return data
+
+
+def make_caption(rng, min_tags=3, max_tags=12):
+    return ', '.join(rng.sample(TAG_VOCABULARY, rng.randint(min_tags, max_tags)))
+
+
+def _subfolder(index, depth, fanout):
+    parts = []
+    for _level in range(depth):
+        parts.append(f"dir{index % fanout:02d}")
+        index //= fanout
+    return os.path.join(*parts) if parts else ''
+
+
+def generate_dataset(folder, items=1000, sizes=((256, 256),), caption_exts=('.txt',), max_captions=1,
+                     min_captions=None, depth=0, fanout=10, shared_basename_ratio=0.0, empty_images=False,
+                     seed=0, progress=None):
+    """
+    Writes a dataset of `items` media items into folder and returns a summary dict.
+
+    Each item gets between min_captions (default: max_captions) and max_captions
+    caption files, using the first extensions of caption_exts. With depth > 0 items
+    are spread over nested subfolders, `fanout` per level. A shared_basename_ratio
+    share of the items are written as a second image with the same basename
+    (cat.png + cat.bmp), which the app shows as two items sharing the captions.
+    """
+    rng = random.Random(seed)
+    images = ImageCache(list(sizes), empty_images)
+    min_captions = max_captions if min_captions is None else min_captions
+    caption_exts = list(caption_exts)
+    media_count = caption_count = total_bytes = 0
+    for index in range(items):
+        directory = os.path.join(folder, _subfolder(index, depth, fanout))
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"item{index:07d}")
+        size = sizes[index % len(sizes)]
+        variant = index % COLOR_VARIANTS
+
+        extensions = ['.png']
+        if shared_basename_ratio and rng.random() < shared_basename_ratio:
+            extensions.append('.bmp')
+        for ext in extensions:
+            data = images.get(ext, size, variant)
+            with open(stem + ext, 'wb') as f:
+                f.write(data)
+            media_count += 1
+            total_bytes += len(data)
+
+        for ext in caption_exts[:rng.randint(min_captions, max_captions)]:
+            caption = make_caption(rng)
+            with open(stem + ext, 'w', encoding='utf-8') as f:
+                f.write(caption)
+            caption_count += 1
+            total_bytes += len(caption)
+
+        if progress and (index + 1) % 1000 == 0:
+            progress(index + 1, items)
+    return {
+        'folder': os.path.abspath(folder),
+        'items': items,
+        'media_files': media_count,
+        'caption_files': caption_count,
+        'bytes': total_bytes,
+        'sizes': [f"{width}x{height}" for width, height in sizes],
+        'caption_exts': caption_exts,
+        'min_captions': min_captions,
+        'max_captions': max_captions,
+        'depth': depth,
+        'fanout': fanout,
+        'shared_basename_ratio': shared_basename_ratio,
+        'empty_images': empty_images,
+        'seed': seed,
+    }
+
+
+def add_generator_arguments(parser):
+    parser.add_argument('--items', type=int, default=1000, help="Number of items (default: 1000).")
+    parser.add_argument('--sizes', type=parse_sizes, default=[(256, 256)], help="Image sizes, e.g. 512x512,1024x768 (default: 256x256).")
+    parser.add_argument('--caption-exts', default='.txt', help="Caption extensions to use, in order (default: .txt).")
+    parser.add_argument('--min-captions', type=int, help="Fewest captions per item (default: --max-captions).")
+    parser.add_argument('--max-captions', type=int, default=1, help="Most captions per item (default: 1).")
+    parser.add_argument('--depth', type=int, default=0, help="Levels of nested subfolders (default: 0).")
+    parser.add_argument('--fanout', type=int, default=10, help="Subfolders per level (default: 10).")
+    parser.add_argument('--shared-basenames', type=float, default=0.0,
+                        help="Share of items that also get a .bmp with the same basename (default: 0).")
+    parser.add_argument('--empty-images', action='store_true', help="Write zero-byte images (scan and list benchmarks only).")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def generator_kwargs(args):
+    return {
+        'items': args.items,
+        'sizes': args.sizes,
+        'caption_exts': [ext.strip() for ext in args.caption_exts.split(',') if ext.strip()],
+        'min_captions': args.min_captions,
+        'max_captions': args.max_captions,
+        'depth': args.depth,
+        'fanout': args.fanout,
+        'shared_basename_ratio': args.shared_basenames,
+        'empty_images': args.empty_images,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for benchmarking.")
+    parser.add_argument('folder', help="Output folder (created if missing).")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+    summary = generate_dataset(args.folder, progress=lambda done, total: print(f"{done}/{total}", file=sys.stderr),
+                               **generator_kwargs(args))
+    print(f"Wrote {summary['media_files']} media and {summary['caption_files']} caption file(s) "
+          f"({summary['bytes'] / 1e6:.1f} MB) to {summary['folder']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
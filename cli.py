@@ -0,0 +1,9 @@
+import sys
+import multiprocessing
+
+from dataset_quick_view.cli import main
+
+if __name__ == '__main__':
+    # Large edits run in worker processes, which frozen builds need this for.
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import sys
 import os
 import logging
+import multiprocessing
 
 # Suppress Qt's FFmpeg warnings
 os.environ['QT_LOGGING_RULES'] = 'qt.multimedia.ffmpeg.warning=false'
@@ -62,4 +63,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == '__main__':
+    # Needed by the bulk transform process pool in frozen builds.
+    multiprocessing.freeze_support()
     main()
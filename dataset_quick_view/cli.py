@@ -0,0 +1,342 @@
+"""
+Command line interface for batch work on a dataset without opening the window.
+
+    python cli.py scan path/to/dataset
+    python cli.py stats path/to/dataset --captions
+    python cli.py search path/to/dataset "red dress" --whole-words
+    python cli.py edit path/to/dataset --add-tags "photo, outdoors" --dry-run --diff
+    python cli.py memory path/to/dataset --captions --search-index
+
+Only the Qt-free core is imported, so it also runs where PyQt6 is not installed.
+Media formats and the recursive setting are read from config.ini (never written)
+unless given on the command line.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import tracemalloc
+
+from .core.dataset_index import DatasetIndex
+from .core.caption_store import CaptionStore, caption_stats, read_captions
+from .core.search_index import TrigramIndex, compile_search_pattern, search_files
+from .core.transforms import (PrefixSuffix, StripWhitespace, RegexReplace, AddTags, RemoveTags,
+                              TransformPipeline, run_transforms, split_tags)
+from .core.checkpoints import CheckpointStore
+from .core import memory_usage
+from .utils.config_manager import load_settings
+from .utils import tracing
+
+logger = logging.getLogger(__name__)
+
+
+def _split_list(value):
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def _extensions(value):
+    return [ext if ext.startswith('.') else '.' + ext for ext in (ext.lower() for ext in _split_list(value))]
+
+
+def _print_json(data):
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _load_index(args):
+    settings = load_settings(args.config)
+    recursive = settings.recursive_search if args.recursive is None else args.recursive
+    media_extensions = _extensions(args.media_ext) or settings.enabled_media_extensions
+    if not os.path.isdir(args.folder):
+        raise SystemExit(f"error: {args.folder} is not a folder")
+    return DatasetIndex.scan(args.folder, recursive, media_extensions, args.workers)
+
+
+def _caption_paths(args, index):
+    return index.text_paths(_extensions(args.caption_ext))
+
+
+def _relpath(path, folder):
+    return os.path.relpath(path, folder)
+
+
+# --- Commands ---
+
+def cmd_scan(args):
+    index = _load_index(args)
+    if args.json:
+        _print_json([{'media': _relpath(media_path, args.folder),
+                      'captions': [_relpath(text_path, args.folder) for text_path in index.dataset[media_path]]}
+                     for media_path in index.media_paths()])
+        return 0
+    for media_path in index.media_paths():
+        captions = ', '.join(_relpath(text_path, args.folder) for text_path in index.dataset[media_path])
+        print(f"{_relpath(media_path, args.folder)}\t{captions}")
+    print(f"{len(index)} item(s)", file=sys.stderr)
+    return 0
+
+
+def cmd_stats(args):
+    index = _load_index(args)
+    stats = index.stats()
+    if args.captions:
+        stats['caption_content'] = caption_stats(_caption_paths(args, index), args.workers, args.top_tags)
+    if args.json:
+        _print_json(stats)
+        return 0
+    print(f"Folder:            {stats['folder']}")
+    print(f"Files scanned:     {stats['files']}")
+    print(f"Media items:       {stats['items']} ({stats['uncaptioned_items']} without captions)")
+    print(f"Caption files:     {stats['captions']}")
+    print(f"Other files:       {stats['unpaired_files']}")
+    print("Media by type:     " + ', '.join(f"{ext} {count}" for ext, count in stats['media_by_extension'].items()))
+    print("Captions by type:  " + ', '.join(f"{ext} {count}" for ext, count in stats['captions_by_extension'].items()))
+    content = stats.get('caption_content')
+    if content:
+        print(f"Captions read:     {content['read']} ({content['empty']} empty, {content['unreadable']} unreadable)")
+        print(f"Average length:    {content['average_chars']} characters, {content['average_words']} words")
+        if content['longest']:
+            print(f"Longest caption:   {_relpath(content['longest']['path'], args.folder)} ({content['longest']['chars']} characters)")
+        if content['top_tags']:
+            print("Most common tags:")
+            for tag, count in content['top_tags']:
+                print(f"  {count:8d}  {tag}")
+    return 0
+
+
+def _search_pattern(args):
+    if not args.regex:
+        return compile_search_pattern(args.text, args.case_sensitive, args.whole_words)
+    pattern = args.text
+    if args.whole_words:
+        pattern = r'(?<!\w)(?:' + pattern + r')(?!\w)'
+    try:
+        return re.compile(pattern, 0 if args.case_sensitive else re.IGNORECASE)
+    except re.error as e:
+        raise SystemExit(f"error: invalid regular expression: {e}")
+
+
+def cmd_search(args):
+    index = _load_index(args)
+    pattern = _search_pattern(args)
+    file_count = match_count = 0
+    found = []
+    for text_path, content, matches in search_files(_caption_paths(args, index), pattern, args.workers):
+        file_count += 1
+        match_count += len(matches)
+        rel_path = _relpath(text_path, args.folder)
+        if args.json:
+            found.append({'path': rel_path, 'matches': [
+                {'line': content.count('\n', 0, match.start()) + 1,
+                 'column': match.start() - content.rfind('\n', 0, match.start()),
+                 'text': match.group(0)} for match in matches]})
+        elif args.files_only:
+            print(rel_path)
+        elif not args.count:
+            lines = content.splitlines()
+            for match in matches:
+                line_number = content.count('\n', 0, match.start()) + 1
+                column = match.start() - content.rfind('\n', 0, match.start())
+                line = lines[line_number - 1] if line_number <= len(lines) else ''
+                print(f"{rel_path}:{line_number}:{column}: {line}")
+    if args.json:
+        _print_json(found)
+    else:
+        print(f"{match_count} match(es) in {file_count} file(s)", file=sys.stdout if args.count else sys.stderr)
+    return 0 if file_count else 1
+
+
+def _build_transform(args):
+    transforms = []
+    if args.strip:
+        transforms.append(StripWhitespace())
+    if args.find is not None:
+        if args.regex:
+            try:
+                pattern = re.compile(args.find, 0 if args.case_sensitive else re.IGNORECASE)
+            except re.error as e:
+                raise SystemExit(f"error: invalid regular expression: {e}")
+        else:
+            pattern = compile_search_pattern(args.find, args.case_sensitive, args.whole_words)
+        transforms.append(RegexReplace(pattern, args.replace))
+    if args.remove_tags:
+        transforms.append(RemoveTags(split_tags(args.remove_tags)))
+    if args.add_tags:
+        transforms.append(AddTags(split_tags(args.add_tags), at_start=args.tags_at_start))
+    if args.prefix or args.suffix:
+        transforms.append(PrefixSuffix(args.prefix, args.suffix))
+    if not transforms:
+        raise SystemExit("error: nothing to do; give at least one of --prefix, --suffix, --strip, --find, --add-tags or --remove-tags")
+    return transforms[0] if len(transforms) == 1 else TransformPipeline(transforms)
+
+
+def cmd_edit(args):
+    transform = _build_transform(args)
+    index = _load_index(args)
+    text_paths = _caption_paths(args, index)
+
+    if args.checkpoint is not None and not args.dry_run:
+        summary = CheckpointStore(args.folder).create(args.checkpoint or "Before command line edit", text_paths)
+        print(f"Created checkpoint '{summary['name']}' with {summary['file_count']} file(s).", file=sys.stderr)
+
+    changed = edit_count = 0
+    errors = []
+    report = []
+    for result in run_transforms(text_paths, transform, dry_run=args.dry_run, max_workers=args.workers,
+                                 return_content=False):
+        if result.error is not None:
+            errors.append((result.text_path, result.error))
+            continue
+        if not result.changed:
+            continue
+        changed += 1
+        edit_count += result.count
+        if args.json:
+            entry = {'path': _relpath(result.text_path, args.folder), 'changes': result.count}
+            if args.dry_run:
+                entry['diff'] = result.diff
+            report.append(entry)
+        elif args.diff and result.diff:
+            print(result.diff)
+        elif args.verbose:
+            print(_relpath(result.text_path, args.folder))
+
+    if args.json:
+        _print_json({'transform': transform.describe(), 'dry_run': args.dry_run, 'files': len(text_paths),
+                     'changed': changed, 'changes': edit_count, 'files_changed': report,
+                     'errors': [{'path': _relpath(path, args.folder), 'error': error} for path, error in errors]})
+    else:
+        for text_path, error in errors:
+            print(f"error: {_relpath(text_path, args.folder)}: {error}", file=sys.stderr)
+        verb = "would change" if args.dry_run else "changed"
+        print(f"{transform.describe()}: {verb} {changed} of {len(text_paths)} file(s) ({edit_count} edit(s)).", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_memory(args):
+    if args.tracemalloc:
+        tracemalloc.start()
+    index = _load_index(args)
+    report = memory_usage.index_usage(index)
+    if args.captions or args.search_index:
+        store = CaptionStore()
+        text_paths = _caption_paths(args, index)
+        for text_path, content, error in read_captions(text_paths, args.workers):
+            if error is None:
+                store.text_cache[text_path] = content
+        report.update(memory_usage.caption_store_usage(store))
+        if args.search_index:
+            search_index = TrigramIndex()
+            search_index.build(text_paths, store.text_cache.get)
+            report.update(memory_usage.search_index_usage(search_index))
+    measured = None
+    if args.tracemalloc:
+        measured = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    item_count = len(index)
+    if args.json:
+        data = {'items': item_count, 'total_bytes': memory_usage.total_bytes(report), 'subsystems': report}
+        if measured is not None:
+            data['tracemalloc_bytes'] = measured
+        _print_json(data)
+        return 0
+    for line in memory_usage.format_report(report, item_count):
+        print(line)
+    if measured is not None:
+        print(f"{'tracemalloc':<16} {memory_usage.format_bytes(measured):>10}  (all Python allocations of the command)")
+    return 0
+
+
+# --- Argument parsing ---
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('folder', help="Dataset folder.")
+    common.add_argument('--recursive', action=argparse.BooleanOptionalAction, default=None,
+                        help="Include subfolders (default: the app's setting).")
+    common.add_argument('--media-ext', help="Comma separated media extensions, e.g. .png,.jpg (default: the app's enabled formats).")
+    common.add_argument('--caption-ext', help="Only use captions with these comma separated extensions, e.g. .txt.")
+    common.add_argument('--config', help="config.ini to read settings from (default: the app's).")
+    common.add_argument('--workers', type=int, help="Number of parallel workers (default: based on CPU count).")
+    common.add_argument('--json', action='store_true', help="Print machine readable JSON.")
+    common.add_argument('--trace', metavar='FILE', help="Write a Chrome/Perfetto trace of the command's timings to FILE.")
+
+    parser = argparse.ArgumentParser(prog='dataset_quick_view',
+                                     description="Scan, inspect, search and bulk edit caption datasets without the GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scan = subparsers.add_parser('scan', parents=[common], help="List media items and their captions.")
+    scan.set_defaults(handler=cmd_scan)
+
+    stats = subparsers.add_parser('stats', parents=[common], help="Summarize the dataset.")
+    stats.add_argument('--captions', action='store_true', help="Also read every caption for length and tag statistics.")
+    stats.add_argument('--top-tags', type=int, default=20, help="Number of most common tags to list (default: 20).")
+    stats.set_defaults(handler=cmd_stats)
+
+    search = subparsers.add_parser('search', parents=[common], help="Find text in captions.")
+    search.add_argument('text', help="Text to find.")
+    search.add_argument('--case-sensitive', action='store_true')
+    search.add_argument('--whole-words', action='store_true')
+    search.add_argument('--regex', action='store_true', help="Treat the text as a regular expression.")
+    search.add_argument('-l', '--files-only', action='store_true', help="Only print the paths of matching files.")
+    search.add_argument('-c', '--count', action='store_true', help="Only print the number of matches.")
+    search.set_defaults(handler=cmd_search)
+
+    edit = subparsers.add_parser('edit', parents=[common], help="Apply edits to every caption.",
+                                 description="Applies the given edits to every caption, in the order strip, "
+                                             "find/replace, remove tags, add tags, prefix/suffix. Files are "
+                                             "rewritten atomically.")
+    edit.add_argument('--prefix', default="", help="Text to add at the start.")
+    edit.add_argument('--suffix', default="", help="Text to add at the end.")
+    edit.add_argument('--strip', action='store_true', help="Remove leading and trailing whitespace.")
+    edit.add_argument('--find', help="Text to replace (see --replace, --regex).")
+    edit.add_argument('--replace', default="", help="Replacement for --find, inserted literally.")
+    edit.add_argument('--regex', action='store_true', help="Treat --find as a regular expression.")
+    edit.add_argument('--case-sensitive', action='store_true')
+    edit.add_argument('--whole-words', action='store_true')
+    edit.add_argument('--add-tags', help="Comma separated tags to add if missing.")
+    edit.add_argument('--tags-at-start', action='store_true', help="Insert added tags at the start instead of the end.")
+    edit.add_argument('--remove-tags', help="Comma separated tags to remove.")
+    edit.add_argument('--dry-run', action='store_true', help="Report what would change without writing.")
+    edit.add_argument('--diff', action='store_true', help="With --dry-run, print a diff per changed file.")
+    edit.add_argument('--checkpoint', nargs='?', const="", metavar='NAME',
+                      help="Create a checkpoint of the captions (restorable in the app) before writing.")
+    edit.add_argument('-v', '--verbose', action='store_true', help="Print each changed file.")
+    edit.set_defaults(handler=cmd_edit)
+
+    memory = subparsers.add_parser('memory', parents=[common], help="Estimate the memory the app's dataset structures need.",
+                                   description="Loads the dataset like the app does and reports the estimated size "
+                                               "of each structure, in total and per media item.")
+    memory.add_argument('--captions', action='store_true', help="Also read every caption into a text cache.")
+    memory.add_argument('--search-index', action='store_true', help="Also build the search index (implies --captions).")
+    memory.add_argument('--tracemalloc', action='store_true', help="Also measure all Python allocations (slower).")
+    memory.set_defaults(handler=cmd_memory)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+    args = build_parser().parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        raise SystemExit("error: --workers must be at least 1")
+    if args.trace:
+        tracing.enable()
+    try:
+        with tracing.span(args.command, 'cli'):
+            return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Output was piped into something like `head` that stopped reading.
+        sys.stderr.close()
+        return 0
+    finally:
+        if args.trace:
+            count = tracing.export_chrome_trace(args.trace)
+            print(f"Wrote {count} span(s) to {args.trace}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
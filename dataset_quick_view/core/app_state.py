@@ -1,9 +1,82 @@
-class AppState:
+import os
+
+from .caption_store import CaptionStore
+from .bulk_history import BulkEditHistory
+
+
+class AppState(CaptionStore):
     def __init__(self, folder_path, config):
+        super().__init__()
         self.folder_path = folder_path
         self.config = config
         self.dataset = {}
-        self.text_cache = {}
-        self.dirty_files = set()
+        # The last folder scan (a DatasetIndex), so format changes can re-group in memory.
+        self.index = None
+        self.text_to_media = {}
+        self.media_by_stem = {}
+        self.virtual_formats = []
+        self.bulk_history = BulkEditHistory()
         self.detached_viewer = None
-        self.current_font_size = int(self.config.get_setting('Display', 'font_size'))
+        self.current_font_size = self.config.settings.font_size
+
+    def set_index(self, index):
+        self.index = index
+        self.set_dataset(index.dataset)
+
+    def set_dataset(self, dataset):
+        self.dataset = dataset
+        self.rebuild_text_index()
+
+    def rebuild_text_index(self):
+        """Maps text paths (and path stems, for captions not created yet) back to media items."""
+        self.text_to_media = {}
+        self.media_by_stem = {}
+        for media_path, text_paths in self.dataset.items():
+            self.media_by_stem.setdefault(os.path.splitext(media_path)[0], []).append(media_path)
+            for text_path in text_paths:
+                self.text_to_media.setdefault(text_path, []).append(media_path)
+
+    def add_text_path(self, media_path, text_path):
+        text_paths = self.dataset.setdefault(media_path, [])
+        if text_path not in text_paths:
+            text_paths.append(text_path)
+        media_paths = self.text_to_media.setdefault(text_path, [])
+        if media_path not in media_paths:
+            media_paths.append(media_path)
+
+    def add_virtual_format(self, ext):
+        """
+        Declares a caption format for every item. Items show an editor for it, but
+        the file is only tracked (and later created) once its text is edited.
+        """
+        if ext not in self.virtual_formats:
+            self.virtual_formats.append(ext)
+
+    def text_paths_for(self, media_path):
+        """The text files shown for a media item: its own, then declared formats it has no file for."""
+        text_paths = self.dataset.get(media_path, [])
+        if not self.virtual_formats:
+            return text_paths
+        base, _ = os.path.splitext(media_path)
+        virtual_paths = [base + ext for ext in self.virtual_formats if base + ext not in text_paths]
+        return text_paths + virtual_paths
+
+    def track_text_path(self, text_path):
+        """Adds a caption that so far only existed as a virtual format to the dataset."""
+        if text_path in self.text_to_media:
+            return
+        for media_path in self.media_for_text(text_path):
+            self.add_text_path(media_path, text_path)
+
+    def media_for_text(self, text_path):
+        media_paths = self.text_to_media.get(text_path)
+        if media_paths:
+            return media_paths
+        # Declared formats can have several dots (.wd14.txt); strip the whole format.
+        lowered = text_path.lower()
+        for ext in sorted(self.virtual_formats, key=len, reverse=True):
+            if lowered.endswith(ext.lower()):
+                media_paths = self.media_by_stem.get(text_path[:-len(ext)])
+                if media_paths:
+                    return media_paths
+        return self.media_by_stem.get(os.path.splitext(text_path)[0], [])
@@ -0,0 +1,200 @@
+import os
+import zlib
+import pickle
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from ..utils.file_handler import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_UNDO_LEVELS = 20
+CHUNK_SIZE = 64
+
+
+def _common_length(a, b, limit, from_end):
+    # Binary search with slice comparisons, so long captions are compared at C speed.
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if (a[len(a) - mid:] == b[len(b) - mid:]) if from_end else (a[:mid] == b[:mid]):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def make_delta(old_content, new_content):
+    """
+    Compact edit script turning old_content into new_content: the common prefix and
+    suffix are only stored as lengths, plus CRCs of both full texts for verification.
+    """
+    limit = min(len(old_content), len(new_content))
+    prefix_len = _common_length(old_content, new_content, limit, from_end=False)
+    suffix_len = _common_length(old_content, new_content, limit - prefix_len, from_end=True)
+    return (prefix_len, suffix_len,
+            old_content[prefix_len:len(old_content) - suffix_len],
+            new_content[prefix_len:len(new_content) - suffix_len],
+            zlib.crc32(old_content.encode('utf-8')), zlib.crc32(new_content.encode('utf-8')))
+
+
+def apply_delta(content, delta, undo):
+    """
+    Replays a delta forwards (redo) or backwards (undo). Returns the new content,
+    content itself if it is already in the target state, or None if the file was
+    changed in some other way since the edit was recorded.
+    """
+    prefix_len, suffix_len, removed, inserted, old_crc, new_crc = delta
+    expected, replacement, expected_crc, target_crc = (inserted, removed, new_crc, old_crc) if undo else (removed, inserted, old_crc, new_crc)
+    crc = zlib.crc32(content.encode('utf-8'))
+    if crc == target_crc and len(content) == prefix_len + len(replacement) + suffix_len:
+        return content
+    if crc != expected_crc or len(content) != prefix_len + len(expected) + suffix_len:
+        return None
+    return content[:prefix_len] + replacement + content[len(content) - suffix_len:]
+
+
+class BulkEdit:
+    """One bulk operation: per-file deltas, pickled and zlib-compressed together."""
+
+    def __init__(self, description, deltas):
+        self.description = description
+        self.file_count = len(deltas)
+        self._blob = zlib.compress(pickle.dumps(deltas, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+    @property
+    def size_bytes(self):
+        return len(self._blob)
+
+    def deltas(self):
+        """List of (text_path, delta)."""
+        return pickle.loads(zlib.decompress(self._blob))
+
+
+class BulkEditHistory:
+    """Multi-level undo/redo stacks of BulkEdits."""
+
+    def __init__(self, max_levels=MAX_BULK_UNDO_LEVELS):
+        self.max_levels = max_levels
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def clear(self):
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def record(self, description, deltas):
+        if not deltas:
+            return None
+        edit = BulkEdit(description, deltas)
+        self.undo_stack.append(edit)
+        del self.undo_stack[:-self.max_levels]
+        self.redo_stack = []
+        logger.info(f"Recorded bulk edit '{description}' over {edit.file_count} file(s) in {edit.size_bytes} bytes.")
+        return edit
+
+    def next_undo(self):
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def next_redo(self):
+        return self.redo_stack[-1] if self.redo_stack else None
+
+    def mark_undone(self, edit):
+        self.undo_stack.remove(edit)
+        self.redo_stack.append(edit)
+
+    def mark_redone(self, edit):
+        self.redo_stack.remove(edit)
+        self.undo_stack.append(edit)
+
+    def size_bytes(self):
+        return sum(edit.size_bytes for edit in self.undo_stack + self.redo_stack)
+
+
+class ReplayResult:
+    __slots__ = ('text_path', 'new_content', 'changed', 'error')
+
+    def __init__(self, text_path, new_content=None, changed=False, error=None):
+        self.text_path = text_path
+        self.new_content = new_content
+        self.changed = changed
+        self.error = error
+
+
+def _replay_content(text_path, content, delta, undo):
+    new_content = apply_delta(content, delta, undo)
+    if new_content is None:
+        return ReplayResult(text_path, error="changed since the bulk edit")
+    return ReplayResult(text_path, new_content, new_content != content)
+
+
+def _replay_chunk(chunk, undo, return_content, cancel_event):
+    results = []
+    for text_path, delta in chunk:
+        if cancel_event.is_set():
+            break
+        try:
+            try:
+                with open(text_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                content = ""
+            result = _replay_content(text_path, content, delta, undo)
+            if result.changed:
+                write_text_atomic(text_path, result.new_content)
+            if not return_content:
+                result.new_content = None
+        except Exception as e:
+            result = ReplayResult(text_path, error=f"{e}")
+        results.append(result)
+    return results
+
+
+def replay_bulk_edit(edit, undo=True, in_memory=None, cancel_event=None, max_workers=None, return_content=True):
+    """
+    Undoes (or redoes) a BulkEdit, yielding a ReplayResult per file. Files in
+    in_memory (path -> content) are only computed, not written; all others are
+    rewritten on disk from a thread pool. Files that were changed in some other way
+    since the edit are left alone and reported with an error.
+    """
+    in_memory = in_memory or {}
+    cancel_event = cancel_event or threading.Event()
+    deltas = edit.deltas()
+
+    disk_deltas = []
+    for text_path, delta in deltas:
+        if text_path in in_memory:
+            if cancel_event.is_set():
+                return
+            yield _replay_content(text_path, in_memory[text_path] or "", delta, undo)
+        else:
+            disk_deltas.append((text_path, delta))
+    del deltas
+
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    chunks = (disk_deltas[i:i + CHUNK_SIZE] for i in range(0, len(disk_deltas), CHUNK_SIZE))
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit_next():
+            if cancel_event.is_set():
+                return False
+            for chunk in chunks:
+                in_flight.add(pool.submit(_replay_chunk, chunk, undo, return_content, cancel_event))
+                return True
+            return False
+
+        try:
+            for _ in range(workers * 2):
+                if not submit_next():
+                    break
+            while in_flight:
+                done, _not_done = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    submit_next()
+                    yield from future.result()
+        finally:
+            cancel_event.set()
+            for future in in_flight:
+                future.cancel()
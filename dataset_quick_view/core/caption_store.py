@@ -0,0 +1,189 @@
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .dirty_tracker import DirtyTracker
+from .text_baselines import TextBaselines
+from .transforms import split_tags
+
+READ_CHUNK_SIZE = 256
+
+
+def _read_chunk(text_paths):
+    results = []
+    for text_path in text_paths:
+        try:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                results.append((text_path, f.read(), None))
+        except Exception as e:
+            results.append((text_path, None, e))
+    return results
+
+
+def read_captions(text_paths, max_workers=None):
+    """
+    Yields (text_path, content, error) for each path, in order, reading chunks of
+    files on a thread pool. content is None when the file could not be read.
+    """
+    text_paths = list(text_paths)
+    chunks = [text_paths[i:i + READ_CHUNK_SIZE] for i in range(0, len(text_paths), READ_CHUNK_SIZE)]
+    if len(chunks) <= 1 or max_workers == 1:
+        for chunk in chunks:
+            yield from _read_chunk(chunk)
+        return
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='caption-read') as pool:
+        for results in pool.map(_read_chunk, chunks):
+            yield from results
+
+
+def caption_stats(text_paths, max_workers=None, top_tags=20):
+    """Reads every caption and summarizes lengths, empty files and the most common tags."""
+    tag_counts = Counter()
+    count = empty = unreadable = total_chars = total_words = 0
+    longest = (0, None)
+    for text_path, content, error in read_captions(text_paths, max_workers):
+        if error is not None:
+            unreadable += 1
+            continue
+        count += 1
+        if not content.strip():
+            empty += 1
+            continue
+        total_chars += len(content)
+        total_words += len(content.split())
+        longest = max(longest, (len(content), text_path))
+        tag_counts.update(set(split_tags(content)))
+    return {
+        'read': count,
+        'unreadable': unreadable,
+        'empty': empty,
+        'total_chars': total_chars,
+        'average_chars': round(total_chars / count, 1) if count else 0,
+        'average_words': round(total_words / count, 1) if count else 0,
+        'longest': {'path': longest[1], 'chars': longest[0]} if longest[1] else None,
+        'top_tags': tag_counts.most_common(top_tags),
+    }
+
+
+class TextCache(dict):
+    """
+    The path -> text dict of a CaptionStore, keeping a running total of the bytes its
+    texts hold so the memory budget can read it without a walk. Writing a path moves
+    it to the end, so iteration goes from the least recently written text.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.bytes = 0
+
+    def __setitem__(self, text_path, content):
+        old = dict.pop(self, text_path, None)
+        if old is not None:
+            self.bytes -= sys.getsizeof(old)
+        dict.__setitem__(self, text_path, content)
+        self.bytes += sys.getsizeof(content)
+
+    def __delitem__(self, text_path):
+        self.bytes -= sys.getsizeof(dict.pop(self, text_path))
+
+    def pop(self, text_path, *default):
+        if text_path in self:
+            content = dict.pop(self, text_path)
+            self.bytes -= sys.getsizeof(content)
+            return content
+        if default:
+            return default[0]
+        raise KeyError(text_path)
+
+    def popitem(self):
+        text_path, content = dict.popitem(self)
+        self.bytes -= sys.getsizeof(content)
+        return text_path, content
+
+    def setdefault(self, text_path, default=None):
+        if text_path not in self:
+            self[text_path] = default
+        return self[text_path]
+
+    def update(self, *args, **kwargs):
+        for text_path, content in dict(*args, **kwargs).items():
+            self[text_path] = content
+
+    def clear(self):
+        dict.clear(self)
+        self.bytes = 0
+
+
+class CaptionStore:
+    """
+    Caption texts of a dataset as an editor sees them: the text cache, which files
+    have unsaved edits and the on-disk baselines used to tell the two apart.
+    AppState extends it with the dataset's media items.
+    """
+
+    def __init__(self):
+        self.text_cache = TextCache()
+        self.dirty_files = DirtyTracker()
+        self.baselines = TextBaselines()
+
+    def media_for_text(self, text_path):
+        """The media items a caption belongs to; none without a dataset."""
+        return []
+
+    def track_text_path(self, text_path):
+        """Called when a caption gets its first unsaved edit."""
+
+    def reset_texts(self):
+        self.text_cache = TextCache()
+        self.dirty_files.clear()
+        self.baselines.clear()
+
+    def read_text(self, text_path):
+        """
+        Returns the text of a caption: the cached copy if it has unsaved edits or the
+        file is unchanged on disk (checked with a stat), otherwise a fresh read.
+        """
+        if text_path in self.text_cache and (text_path in self.dirty_files or self.baselines.is_current(text_path)):
+            return self.text_cache[text_path]
+        return self.baselines.read(text_path)
+
+    def evict_texts(self, bytes_needed, protected=()):
+        """
+        Drops the least recently written texts without unsaved edits until
+        bytes_needed are freed; they are read from disk again when needed.
+        Returns the bytes freed.
+        """
+        evictable = []
+        freed = 0
+        for text_path, content in self.text_cache.items():
+            if freed >= bytes_needed:
+                break
+            if text_path in self.dirty_files or text_path in protected:
+                continue
+            evictable.append(text_path)
+            freed += sys.getsizeof(content)
+        for text_path in evictable:
+            del self.text_cache[text_path]
+        return freed
+
+    def apply_text_changes(self, changes):
+        """
+        Stores many (text_path, content) edits in the cache. Edits that leave a file
+        identical to its on-disk baseline make it clean again instead of dirty.
+        Returns the changed contents by path and the media items that just became
+        dirty and clean.
+        """
+        changed = {}
+        newly_dirty = []
+        newly_clean = []
+        for text_path, content in changes:
+            self.text_cache[text_path] = content
+            if self.baselines.matches(text_path, content):
+                newly_clean.extend(self.dirty_files.discard(text_path))
+            elif text_path not in self.dirty_files:
+                self.track_text_path(text_path)
+                newly_dirty.extend(self.dirty_files.add(text_path, self.media_for_text(text_path)))
+            changed[text_path] = content
+        return changed, newly_dirty, newly_clean
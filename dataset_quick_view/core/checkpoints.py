@@ -0,0 +1,310 @@
+import os
+import json
+import gzip
+import zlib
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.config_manager import get_app_base_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 256
+
+
+def get_checkpoint_store_dir():
+    return os.path.join(get_app_base_path(), 'cache', 'checkpoints')
+
+
+def _folder_key(folder_path):
+    return hashlib.sha1(os.path.abspath(folder_path).encode('utf-8')).hexdigest()[:16]
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def _chunked(items):
+    items = list(items)
+    return [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+
+
+def _read_text_bytes(path):
+    # Read in text mode like the editors do, so a restore writes back what the app would save.
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().encode('utf-8')
+
+
+class CheckpointDiff:
+    def __init__(self):
+        self.modified = []
+        self.added = []
+        self.removed = []
+        self.unchanged = 0
+        self.errors = []
+
+    def changed_paths(self):
+        """Files a restore would rewrite: modified plus removed since the checkpoint."""
+        return self.modified + self.removed
+
+
+class CheckpointStore:
+    """
+    Content-addressed snapshots of a dataset's captions.
+
+    Each caption is stored once as a zlib-compressed blob named by its hash and shared
+    by every checkpoint (and every folder) that contains the same text. A checkpoint is
+    a gzipped JSON manifest mapping relative paths to (digest, mtime_ns, size), so
+    comparing against the live folder only re-reads files whose stat changed.
+    """
+
+    def __init__(self, folder_path, store_dir=None, max_workers=None):
+        self.folder_path = os.path.abspath(folder_path)
+        self.store_dir = store_dir or get_checkpoint_store_dir()
+        self.blob_dir = os.path.join(self.store_dir, 'blobs')
+        self.manifest_dir = os.path.join(self.store_dir, _folder_key(self.folder_path))
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+    # --- Blobs ---
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _has_blob(self, digest):
+        return os.path.exists(self._blob_path(digest))
+
+    def _write_blob(self, digest, data):
+        blob_path = self._blob_path(digest)
+        if os.path.exists(blob_path):
+            return
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp_path, blob_path)
+
+    def read_blob(self, digest):
+        with open(self._blob_path(digest), 'rb') as f:
+            return zlib.decompress(f.read()).decode('utf-8')
+
+    # --- Manifests ---
+
+    def _manifest_path(self, checkpoint_id):
+        return os.path.join(self.manifest_dir, f"{checkpoint_id}.json.gz")
+
+    def _summary_path(self, checkpoint_id):
+        return os.path.join(self.manifest_dir, f"{checkpoint_id}.summary.json")
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        manifest_path = self._manifest_path(manifest['id'])
+        tmp_path = manifest_path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+        # A small sidecar so listing checkpoints never has to open the full manifests.
+        summary = {key: manifest[key] for key in ('id', 'name', 'created', 'file_count')}
+        with open(self._summary_path(manifest['id']), 'w', encoding='utf-8') as f:
+            json.dump(summary, f)
+        return summary
+
+    def load_manifest(self, checkpoint_id):
+        with gzip.open(self._manifest_path(checkpoint_id), 'rt', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported checkpoint format in {checkpoint_id}")
+        return manifest
+
+    def list_checkpoints(self):
+        """Summaries (id, name, created, file_count) of this folder's checkpoints, newest first."""
+        summaries = []
+        if not os.path.isdir(self.manifest_dir):
+            return summaries
+        for filename in os.listdir(self.manifest_dir):
+            if not filename.endswith('.summary.json'):
+                continue
+            try:
+                with open(os.path.join(self.manifest_dir, filename), 'r', encoding='utf-8') as f:
+                    summaries.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable checkpoint {filename}: {e}")
+        summaries.sort(key=lambda summary: summary['id'], reverse=True)
+        return summaries
+
+    # --- Operations ---
+
+    def _relpath(self, text_path):
+        return os.path.relpath(os.path.abspath(text_path), self.folder_path)
+
+    def _abspath(self, rel_path):
+        return os.path.join(self.folder_path, rel_path)
+
+    def create(self, name, text_paths, cancel_event=None):
+        """
+        Snapshots the on-disk state of text_paths. Files whose size and mtime match the
+        newest existing checkpoint reuse its hash without being read again.
+        Returns the new checkpoint's summary, or None if cancelled.
+        """
+        cancel_event = cancel_event or threading.Event()
+        previous_files = {}
+        existing = self.list_checkpoints()
+        if existing:
+            try:
+                previous_files = self.load_manifest(existing[0]['id'])['files']
+            except Exception as e:
+                logger.warning(f"Could not read previous checkpoint: {e}")
+
+        def snapshot_file(text_path):
+            if cancel_event.is_set():
+                return None
+            rel_path = self._relpath(text_path)
+            stat = _stat(text_path)
+            if stat is None:
+                return None
+            previous = previous_files.get(rel_path)
+            if previous and tuple(previous[1:]) == stat and self._has_blob(previous[0]):
+                return rel_path, previous
+            data = _read_text_bytes(text_path)
+            digest = _digest(data)
+            self._write_blob(digest, data)
+            return rel_path, [digest, stat[0], stat[1]]
+
+        errors = []
+
+        def snapshot_chunk(chunk):
+            entries = []
+            for text_path in chunk:
+                try:
+                    entry = snapshot_file(text_path)
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                if entry is not None:
+                    entries.append(entry)
+            return entries
+
+        files = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for entries in pool.map(snapshot_chunk, _chunked(dict.fromkeys(text_paths))):
+                files.update(entries)
+        if cancel_event.is_set():
+            return None
+        if errors:
+            logger.warning(f"Checkpoint skipped {len(errors)} unreadable file(s), e.g. {errors[0]}")
+
+        created = time.strftime('%Y-%m-%d %H:%M:%S')
+        checkpoint_id = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}"
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'id': checkpoint_id,
+            'name': name or created,
+            'created': created,
+            'folder': self.folder_path,
+            'file_count': len(files),
+            'files': files,
+        }
+        summary = self._write_manifest(manifest)
+        logger.info(f"Created checkpoint {checkpoint_id} with {len(files)} file(s).")
+        return summary
+
+    def diff(self, checkpoint_id, text_paths):
+        """
+        Compares the live text_paths with a checkpoint. A matching size and mtime is
+        trusted; only files whose stat changed are read and hashed.
+        """
+        files = self.load_manifest(checkpoint_id)['files']
+        result = CheckpointDiff()
+        seen = set()
+        to_hash = []
+        for text_path in dict.fromkeys(text_paths):
+            rel_path = self._relpath(text_path)
+            seen.add(rel_path)
+            entry = files.get(rel_path)
+            stat = _stat(text_path)
+            if entry is None:
+                if stat is not None:
+                    result.added.append(text_path)
+            elif stat is None:
+                result.removed.append(text_path)
+            elif tuple(entry[1:]) == stat:
+                result.unchanged += 1
+            else:
+                to_hash.append((text_path, entry[0]))
+
+        def compare_chunk(chunk):
+            outcomes = []
+            for text_path, digest in chunk:
+                try:
+                    outcomes.append((text_path, _digest(_read_text_bytes(text_path)) == digest, None))
+                except Exception as e:
+                    outcomes.append((text_path, False, e))
+            return outcomes
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for outcomes in pool.map(compare_chunk, _chunked(to_hash)):
+                for text_path, same, error in outcomes:
+                    if error is not None:
+                        result.errors.append((text_path, error))
+                    elif same:
+                        result.unchanged += 1
+                    else:
+                        result.modified.append(text_path)
+
+        # Captions that existed at checkpoint time but are no longer part of the dataset.
+        for rel_path in files:
+            if rel_path not in seen and not os.path.exists(self._abspath(rel_path)):
+                result.removed.append(self._abspath(rel_path))
+        return result
+
+    def read_contents(self, checkpoint_id, text_paths):
+        """Yields (text_path, content) as stored in the checkpoint for each given path."""
+        files = self.load_manifest(checkpoint_id)['files']
+        for text_path in text_paths:
+            entry = files.get(self._relpath(text_path))
+            if entry is not None:
+                yield text_path, self.read_blob(entry[0])
+
+    def delete(self, checkpoint_id):
+        """Removes a checkpoint and every blob no other checkpoint still references."""
+        os.remove(self._manifest_path(checkpoint_id))
+        try:
+            os.remove(self._summary_path(checkpoint_id))
+        except FileNotFoundError:
+            pass
+        self.collect_garbage()
+
+    def collect_garbage(self):
+        referenced = set()
+        for folder_dir in os.listdir(self.store_dir) if os.path.isdir(self.store_dir) else []:
+            manifest_dir = os.path.join(self.store_dir, folder_dir)
+            if folder_dir == 'blobs' or not os.path.isdir(manifest_dir):
+                continue
+            for filename in os.listdir(manifest_dir):
+                if not filename.endswith('.json.gz'):
+                    continue
+                try:
+                    with gzip.open(os.path.join(manifest_dir, filename), 'rt', encoding='utf-8') as f:
+                        referenced.update(entry[0] for entry in json.load(f)['files'].values())
+                except Exception as e:
+                    # Never delete blobs while a manifest can't be read.
+                    logger.warning(f"Skipping blob cleanup, unreadable manifest {filename}: {e}")
+                    return 0
+        removed = 0
+        for root, _dirs, filenames in os.walk(self.blob_dir):
+            for filename in filenames:
+                if filename not in referenced:
+                    os.remove(os.path.join(root, filename))
+                    removed += 1
+        return removed
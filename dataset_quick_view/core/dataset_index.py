@@ -0,0 +1,65 @@
+import os
+from collections import Counter
+
+from ..utils.file_handler import scan_folder, group_dataset_files, get_enabled_media_extensions
+from ..utils import tracing
+
+
+class DatasetIndex:
+    """
+    A scanned dataset folder, independent of Qt: every file found, grouped by path
+    without extension, and the dataset (media path -> caption paths) built from it
+    for a set of media formats. Used by the window and by the command line tool.
+    """
+
+    def __init__(self, folder_path, files_by_stem=None, enabled_extensions=None, recursive=True):
+        if enabled_extensions is None:
+            enabled_extensions = get_enabled_media_extensions()
+        self.folder_path = folder_path
+        self.recursive = recursive
+        self.files_by_stem = files_by_stem or {}
+        self.enabled_extensions = tuple(ext.lower() for ext in enabled_extensions)
+        with tracing.span('group_dataset', 'dataset'):
+            self.dataset = group_dataset_files(self.files_by_stem, self.enabled_extensions)
+
+    @classmethod
+    def scan(cls, folder_path, recursive=True, enabled_extensions=None, max_workers=None):
+        """Walks folder_path (subfolders in parallel) and groups what it finds."""
+        with tracing.span('scan_folder', 'dataset', folder=folder_path):
+            files_by_stem = scan_folder(folder_path, recursive, max_workers)
+        return cls(folder_path, files_by_stem, enabled_extensions, recursive)
+
+    def regroup(self, enabled_extensions=None):
+        """A new index over the same files for other media formats; nothing is read from disk."""
+        return DatasetIndex(self.folder_path, self.files_by_stem, enabled_extensions, self.recursive)
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def media_paths(self):
+        return sorted(self.dataset)
+
+    def text_paths(self, extensions=None):
+        """Every caption of the dataset once, sorted; optionally only those with the given extensions."""
+        text_paths = {text_path for text_paths in self.dataset.values() for text_path in text_paths}
+        if extensions:
+            extensions = tuple(ext.lower() for ext in extensions)
+            text_paths = {text_path for text_path in text_paths if text_path.lower().endswith(extensions)}
+        return sorted(text_paths)
+
+    def stats(self):
+        """Counts of items, captions and file types, from the scan alone."""
+        media_by_extension = Counter(os.path.splitext(media_path)[1].lower() for media_path in self.dataset)
+        text_paths = self.text_paths()
+        captions_by_extension = Counter(os.path.splitext(text_path)[1].lower() for text_path in text_paths)
+        file_count = sum(len(paths) for paths in self.files_by_stem.values())
+        return {
+            'folder': self.folder_path,
+            'files': file_count,
+            'items': len(self.dataset),
+            'uncaptioned_items': sum(1 for text_paths in self.dataset.values() if not text_paths),
+            'captions': len(text_paths),
+            'unpaired_files': file_count - len(self.dataset) - len(text_paths),
+            'media_by_extension': dict(sorted(media_by_extension.items())),
+            'captions_by_extension': dict(sorted(captions_by_extension.items())),
+        }
@@ -0,0 +1,54 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .dataset_index import DatasetIndex
+from ..utils.file_handler import get_enabled_media_extensions
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetLoader(QObject):
+    """
+    Scans and groups a dataset folder off the GUI thread, so the window can paint
+    while a large folder is walked. Results arrive through `loaded` on the GUI
+    thread; a newer load() supersedes any scan still running.
+    """
+    loaded = pyqtSignal(int, object)  # load id, DatasetIndex
+    failed = pyqtSignal(int, object)  # load id, exception
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dataset-loader')
+        self._load_id = 0
+
+    def load(self, folder_path, recursive):
+        """Starts a scan and returns its load id."""
+        self._load_id += 1
+        # Resolve the formats now; the worker must not read settings while they change.
+        enabled_extensions = get_enabled_media_extensions()
+        self._executor.submit(self._run, self._load_id, folder_path, recursive, enabled_extensions)
+        return self._load_id
+
+    def is_current(self, load_id):
+        return load_id == self._load_id
+
+    def cancel(self):
+        """Makes any scan still running report as stale."""
+        self._load_id += 1
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, load_id, folder_path, recursive, enabled_extensions):
+        if not self.is_current(load_id):
+            return
+        try:
+            index = DatasetIndex.scan(folder_path, recursive, enabled_extensions)
+        except Exception as e:
+            logger.error(f"Could not scan {folder_path}: {e}")
+            self.failed.emit(load_id, e)
+            return
+        self.loaded.emit(load_id, index)
@@ -1,9 +1,7 @@
 from PyQt6.QtWidgets import QFileDialog, QMessageBox, QDialog
-from ..tools.find_replace_dialog import FindReplaceDialog
-from ..tools.prefix_suffix_dialog import PrefixSuffixDialog
-from ..tools.clear_whitespace_dialog import ClearWhitespaceDialog
-from ..tools.settings_dialog import SettingsDialog
-from ..widgets.media_viewer import MediaViewer
+from PyQt6.QtCore import Qt
+
+# Tool dialogs are imported when first opened, which keeps them out of startup.
 
 class DialogManager:
     def __init__(self, main_window):
@@ -17,34 +15,37 @@ class DialogManager:
 
     def open_find_dialog(self):
         if self.find_dialog is None:
+            from ..tools.find_replace_dialog import FindReplaceDialog
             self.find_dialog = FindReplaceDialog(self.main_window)
         self.find_dialog.show()
         self.find_dialog.activateWindow()
 
     def open_prefix_suffix_dialog(self):
+        from ..tools.prefix_suffix_dialog import PrefixSuffixDialog
         dialog = PrefixSuffixDialog(self.main_window)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.main_window.config.load_or_create_config() # Reload config after settings are saved
             self.main_window.settings_manager.load_settings() # Apply updated settings to UI
 
     def open_clear_whitespace_dialog(self):
+        from ..tools.clear_whitespace_dialog import ClearWhitespaceDialog
         dialog = ClearWhitespaceDialog(self.main_window)
         dialog.exec()
 
+    def open_checkpoint_dialog(self):
+        from ..tools.checkpoint_dialog import CheckpointDialog
+        dialog = CheckpointDialog(self.main_window)
+        dialog.exec()
+
     def open_settings_dialog(self):
+        # Changes are applied by the components subscribed to the config.
+        from ..tools.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self.main_window.config, self.main_window)
-        if dialog.exec():
-            self.main_window.apply_layout_settings()
-            self.main_window.file_list.apply_view_settings() # Apply new view mode
-            reply = QMessageBox.question(self.main_window, 'Reload Dataset',
-                                       "Media format settings have changed. Do you want to reload the dataset to apply them now?",
-                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                       QMessageBox.StandardButton.Yes)
-            if reply == QMessageBox.StandardButton.Yes:
-                self.main_window.file_operations.refresh_dataset()
+        dialog.exec()
 
     def open_detached_viewer(self):
         if not self.main_window.app_state.detached_viewer:
+            from ..widgets.media_viewer import MediaViewer
             self.main_window.app_state.detached_viewer = MediaViewer(self.main_window.config)
             self.main_window.app_state.detached_viewer.setWindowTitle("Detached Media Viewer")
             self.main_window.app_state.detached_viewer.resize(800, 600)
@@ -56,6 +57,20 @@ class DialogManager:
         else:
             self.main_window.app_state.detached_viewer.activateWindow()
 
+    def show_memory_dialog(self):
+        from .memory_usage import format_report, format_bytes, total_bytes
+        report = self.main_window.memory_report()
+        item_count = len(self.main_window.app_state.dataset)
+        total = total_bytes(report)
+        self.main_window.statusBar().showMessage(
+            f"Memory: {format_bytes(total)} in dataset structures, caches and images for {item_count} item(s).", 5000)
+        text = "\n".join(format_report(report, item_count))
+        budget = self.main_window.memory_budget
+        QMessageBox.information(self.main_window, "Memory Usage",
+                                f"<pre>{text}</pre><p>Caches: {format_bytes(budget.total())} of the "
+                                f"{format_bytes(budget.ceiling)} budget (see Settings).</p>"
+                                f"<p>Estimated sizes; the process also holds Qt, Python and the loaded libraries.</p>")
+
     def show_help_dialog(self):
         help_text = """<b>DatasetQuickView Help</b>
             <br><br>
@@ -64,6 +79,8 @@ class DialogManager:
                 <li><b>Alt + Right/Left:</b> Next/Previous item</li>
                 <li><b>Alt + Home/End:</b> First/Last item</li>
                 <li><b>Alt + PgUp/PgDown:</b> Jump 10 items</li>
+                <li><b>Ctrl + Shift + P:</b> Show timings of recent operations; the overlay can export them as a Chrome/Perfetto trace</li>
+                <li><b>Ctrl + Shift + M:</b> Show estimated memory used by the list, thumbnails, caches and images</li>
             </ul>
             <br>
             <b>Editing & Saving:</b>
@@ -73,6 +90,7 @@ class DialogManager:
                 <li><b>Save:</b> Saves changes for the current item (Ctrl+S).</li>
                 <li><b>Save All:</b> Saves all changes for all items (Ctrl+Shift+S).</li>
                 <li>You will be prompted to save any unsaved work when closing the app or loading a new folder.</li>
+                <li>Unsaved edits are also journaled every few seconds. If the app closes unexpectedly, you are offered to restore them the next time you open the folder.</li>
             </ul>
             <br>
             <b>Tools:</b>
@@ -80,6 +98,8 @@ class DialogManager:
                 <li><b>Load Folder:</b> Opens a new dataset folder.</li>
                 <li><b>Find / Replace:</b> Find and replace text (Ctrl+F).</li>
                 <li><b>Add Prefix/Suffix:</b> Add text to the beginning or end of text files.</li>
+                <li><b>Undo / Redo Bulk Edit:</b> Reverts or reapplies Replace All, prefix/suffix and whitespace edits.</li>
+                <li><b>Checkpoints:</b> Snapshot all saved captions, see what changed since and restore them.</li>
                 <li><b>Detach Viewer:</b> Opens the media viewer in a separate window.</li>
             </ul>
             <br>
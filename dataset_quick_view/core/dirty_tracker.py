@@ -0,0 +1,62 @@
+class DirtyTracker:
+    """
+    Unsaved text files grouped by the media item they belong to.
+
+    Supports the set operations the rest of the app used on the old dirty_files set
+    (in, len, iteration), plus per-item queries that only touch that item's files.
+    """
+
+    def __init__(self):
+        self.by_media = {}
+        self.media_by_text = {}
+
+    def __contains__(self, text_path):
+        return text_path in self.media_by_text
+
+    def __len__(self):
+        return len(self.media_by_text)
+
+    def __bool__(self):
+        return bool(self.media_by_text)
+
+    def __iter__(self):
+        return iter(list(self.media_by_text))
+
+    def add(self, text_path, media_paths):
+        """Marks text_path dirty. Returns the media paths that just became dirty."""
+        media_paths = tuple(media_paths)
+        newly_dirty = []
+        previous = self.media_by_text.get(text_path, ())
+        self.media_by_text[text_path] = tuple(dict.fromkeys(previous + media_paths))
+        for media_path in media_paths:
+            paths = self.by_media.setdefault(media_path, set())
+            if not paths:
+                newly_dirty.append(media_path)
+            paths.add(text_path)
+        return newly_dirty
+
+    def discard(self, text_path):
+        """Marks text_path clean. Returns the media paths that no longer have any dirty file."""
+        now_clean = []
+        for media_path in self.media_by_text.pop(text_path, ()):
+            paths = self.by_media.get(media_path)
+            if paths is None:
+                continue
+            paths.discard(text_path)
+            if not paths:
+                del self.by_media[media_path]
+                now_clean.append(media_path)
+        return now_clean
+
+    def clear(self):
+        self.by_media.clear()
+        self.media_by_text.clear()
+
+    def paths_for(self, media_path):
+        return set(self.by_media.get(media_path, ()))
+
+    def is_item_dirty(self, media_path):
+        return media_path in self.by_media
+
+    def dirty_media(self):
+        return list(self.by_media)
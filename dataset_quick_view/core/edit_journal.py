@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+import logging
+
+from ..utils.config_manager import get_app_base_path
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+# Rewrite the journal once it is this many times larger than the edits it describes.
+COMPACT_RATIO = 4
+COMPACT_MIN_BYTES = 1024 * 1024
+
+
+def get_journal_path(folder_path):
+    folder_key = hashlib.sha1(os.path.abspath(folder_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_app_base_path(), 'cache', f'edit_journal_{folder_key}.jsonl')
+
+
+class EditJournal:
+    """
+    Append-only crash-recovery log of the unsaved caption edits of one folder.
+
+    sync() is called periodically with the current dirty files. It appends one JSON
+    line per file whose text changed since the last sync (so any number of keystrokes
+    in between cost one record) and a null record for files that were saved or
+    reverted, then fsyncs. Once nothing is unsaved the journal file is removed, so a
+    journal found at startup means the previous session did not end cleanly.
+    """
+
+    def __init__(self, folder_path, journal_path=None):
+        self.folder_path = os.path.abspath(folder_path)
+        self.journal_path = journal_path or get_journal_path(folder_path)
+        self._journaled = {}
+        self._file = None
+        self._written_bytes = 0
+
+    def __len__(self):
+        return len(self._journaled)
+
+    def _relpath(self, text_path):
+        return os.path.relpath(os.path.abspath(text_path), self.folder_path)
+
+    def _abspath(self, rel_path):
+        return os.path.normpath(os.path.join(self.folder_path, rel_path))
+
+    def _encode(self, text_path, content):
+        return json.dumps({'path': self._relpath(text_path), 'content': content}, ensure_ascii=False) + '\n'
+
+    # --- Recovery ---
+
+    def replay(self):
+        """
+        Reads the journal left by a previous session and returns {text_path: content}
+        of the edits that were never saved. A torn last line from a crash is ignored.
+        """
+        recovered = {}
+        if not os.path.exists(self.journal_path):
+            return recovered
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Ignoring damaged journal line {line_number + 1} in {self.journal_path}")
+                        continue
+                    if 'version' in record:
+                        if record['version'] != JOURNAL_VERSION:
+                            logger.warning(f"Unsupported edit journal version in {self.journal_path}")
+                            return {}
+                        continue
+                    text_path = self._abspath(record['path'])
+                    if record.get('content') is None:
+                        recovered.pop(text_path, None)
+                    else:
+                        recovered[text_path] = record['content']
+        except Exception as e:
+            logger.error(f"Could not read edit journal {self.journal_path}: {e}")
+            return {}
+        return recovered
+
+    def adopt(self, contents):
+        """Marks recovered contents as already journaled, so they aren't written again."""
+        self._journaled.update(contents)
+
+    # --- Recording ---
+
+    def sync(self, dirty_paths, text_cache):
+        """
+        Brings the journal up to date with the unsaved edits. Contents are compared by
+        identity first, which is what makes calling this on a short timer cheap.
+        Returns the number of records written.
+        """
+        records = []
+        dirty_paths = set(dirty_paths)
+        for text_path in dirty_paths:
+            content = text_cache.get(text_path)
+            if content is None:
+                continue
+            journaled = self._journaled.get(text_path)
+            if journaled is content or journaled == content:
+                continue
+            self._journaled[text_path] = content
+            records.append(self._encode(text_path, content))
+        for text_path in [path for path in self._journaled if path not in dirty_paths]:
+            del self._journaled[text_path]
+            records.append(self._encode(text_path, None))
+        if not records:
+            return 0
+
+        if not self._journaled:
+            # Everything is saved or reverted: nothing left to recover.
+            self.discard()
+            return len(records)
+        try:
+            live_bytes = sum(len(content) for content in self._journaled.values())
+            if self._file is None or self._written_bytes > max(COMPACT_MIN_BYTES, live_bytes * COMPACT_RATIO):
+                self._rewrite()
+            else:
+                data = ''.join(records)
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._written_bytes += len(data)
+        except Exception as e:
+            logger.error(f"Could not write edit journal {self.journal_path}: {e}")
+        return len(records)
+
+    def _rewrite(self):
+        # Starts a fresh file holding only the live edits; this also drops a torn tail
+        # left behind by a crash before anything is appended after it.
+        self.close()
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': JOURNAL_VERSION, 'folder': self.folder_path}) + '\n')
+            for text_path, content in self._journaled.items():
+                f.write(self._encode(text_path, content))
+            f.flush()
+            os.fsync(f.fileno())
+            self._written_bytes = f.tell()
+        os.replace(tmp_path, self.journal_path)
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Forgets all journaled edits and removes the journal file."""
+        self.close()
+        self._journaled = {}
+        self._written_bytes = 0
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not remove edit journal {self.journal_path}: {e}")
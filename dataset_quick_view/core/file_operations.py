@@ -1,56 +1,105 @@
 import os
 from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSignalBlocker
 from .app_state import AppState
-from ..utils.file_handler import find_dataset_files
+from .save_engine import SaveEngine
+from .dataset_loader import DatasetLoader
+from .dataset_index import DatasetIndex
+from ..utils import tracing
 
 class FileOperations:
     def __init__(self, app_state, main_window):
         self.app_state = app_state
         self.main_window = main_window
+        self.save_engine = SaveEngine(baselines=app_state.baselines, parent=main_window)
+        self.save_engine.progress.connect(self._on_save_progress)
+        self.save_engine.batch_finished.connect(self._apply_saved_batch)
+        self.dataset_loader = DatasetLoader(parent=main_window)
+        self.dataset_loader.loaded.connect(self._on_dataset_loaded)
+        self.dataset_loader.failed.connect(self._on_dataset_load_failed)
+        self._on_loaded_callback = None
+
+    def load_dataset_async(self, recursive, on_loaded=None):
+        """
+        Like load_dataset followed by show_dataset, but the folder is scanned on a
+        worker thread so the window stays responsive. on_loaded() is called once the
+        file list has been populated.
+        """
+        self.main_window.search_engine.reset()
+        self._on_loaded_callback = on_loaded
+        self.dataset_loader.load(self.app_state.folder_path, recursive)
+        self.main_window.statusBar().showMessage(f"Loading {self.app_state.folder_path}...")
+
+    def _on_dataset_loaded(self, load_id, index):
+        if not self.dataset_loader.is_current(load_id):
+            return
+        self.main_window.statusBar().clearMessage()
+        # A search while the folder was loading indexed the old (or empty) dataset.
+        self.main_window.search_engine.reset()
+        self.app_state.set_index(index)
+        self.show_dataset()
+        callback, self._on_loaded_callback = self._on_loaded_callback, None
+        if callback:
+            callback()
+
+    def _on_dataset_load_failed(self, load_id, error):
+        if not self.dataset_loader.is_current(load_id):
+            return
+        self._on_loaded_callback = None
+        QMessageBox.critical(self.main_window, "Error", f"Could not load {self.app_state.folder_path}: {error}")
+
+    @tracing.traced('show_dataset', 'dataset')
+    def show_dataset(self):
+        """Fills the file list from the loaded dataset and selects the first item."""
+        if not self.app_state.dataset:
+            self.main_window.statusBar().showMessage(f"No media files found in {self.app_state.folder_path}.", 5000)
+            self.main_window.file_list.list_widget.clear()
+            self.main_window.file_list.update_progress(0, 0)
+            self.main_window.text_editor_panel.load_text_files([], self.app_state.current_font_size, self.app_state.text_cache)
+            self.main_window.media_viewer.clear_media()
+        else:
+            self.main_window.file_list.dataset = self.app_state.dataset
+            self.main_window.file_list.populate_list(self.app_state.dataset.keys())
+            self.main_window.file_list.setCurrentRow(0)
+        self.main_window.update_status()
 
     def load_dataset(self, recursive):
-        self.app_state.dataset = find_dataset_files(self.app_state.folder_path, recursive)
+        self.dataset_loader.cancel()
+        self.main_window.search_engine.reset()
+        self.app_state.set_index(DatasetIndex.scan(self.app_state.folder_path, recursive))
+
+    def apply_media_formats(self):
+        """
+        Re-groups the last scan with the currently enabled media formats. Nothing is
+        read from disk and cached or unsaved text is kept.
+        """
+        file_list = self.main_window.file_list
+        current_item = file_list.currentItem()
+        current_media_path = current_item.data(Qt.ItemDataRole.UserRole) if current_item else None
+
+        index = self.app_state.index
+        if index is None:
+            index = DatasetIndex(self.app_state.folder_path, recursive=False)
+        self.app_state.set_index(index.regroup())
+        self.main_window.search_engine.remap_dataset()
+        file_list.dataset = self.app_state.dataset
+        # Silence the selection change while the list is rebuilt, so it doesn't count
+        # as navigating away (which would auto-save the current item).
+        with QSignalBlocker(file_list.list_widget):
+            file_list.populate_list(self.app_state.dataset.keys())
+        file_list.set_items_dirty(self.app_state.dirty_files.dirty_media(), True)
+
+        row = file_list.row_for_media(current_media_path)
+        file_list.setCurrentRow(row if row != -1 else 0)
         if not self.app_state.dataset:
-            self.main_window.statusBar().showMessage("No media files found in the specified folder.", 5000)
+            self.main_window.media_viewer.clear_media()
+        self.main_window.update_status()
+        self.main_window.statusBar().showMessage(f"Media formats applied: {len(self.app_state.dataset)} item(s).", 3000)
 
     def save_item_changes(self, media_path):
         if not media_path: return
-        
-        saved_count = 0
-        # Create a copy of the dirty_files set to iterate over, as it will be modified
-        for dirty_path in list(self.app_state.dirty_files):
-            # Check if this dirty_path belongs to the current media_path
-            media_dir = os.path.dirname(media_path)
-            media_basename_no_ext = os.path.splitext(os.path.basename(media_path))[0]
-
-            dirty_dir = os.path.dirname(dirty_path)
-            dirty_basename_no_ext = os.path.splitext(os.path.basename(dirty_path))[0]
-            
-            if media_dir == dirty_dir and media_basename_no_ext == dirty_basename_no_ext:
-                try:
-                    # Ensure directory exists for new files
-                    os.makedirs(os.path.dirname(dirty_path), exist_ok=True)
-                    with open(dirty_path, 'w', encoding='utf-8') as f:
-                        f.write(self.app_state.text_cache[dirty_path])
-                    self.app_state.dirty_files.remove(dirty_path)
-                    saved_count += 1
-                except Exception as e:
-                    self.main_window.statusBar().showMessage(f"Error saving {dirty_path}: {e}", 5000)
-        
-        if saved_count > 0:
-            # Check if any other dirty files for this media_path remain
-            has_remaining_dirty_files_for_item = False
-            for dirty_path in self.app_state.dirty_files:
-                dirty_dir = os.path.dirname(dirty_path)
-                dirty_basename_no_ext = os.path.splitext(os.path.basename(dirty_path))[0]
-                media_dir = os.path.dirname(media_path)
-                media_basename_no_ext = os.path.splitext(os.path.basename(media_path))[0]
-                if media_dir == dirty_dir and media_basename_no_ext == dirty_basename_no_ext:
-                    has_remaining_dirty_files_for_item = True
-                    break
-            self.main_window.file_list.set_item_dirty(media_path, has_remaining_dirty_files_for_item)
-            self.main_window.statusBar().showMessage(f"Saved {saved_count} file(s) for current item.", 2000)
+
+        self._enqueue_save(self.app_state.dirty_files.paths_for(media_path), "for current item")
 
     def save_current_item_changes(self):
         current_item = self.main_window.file_list.currentItem()
@@ -59,31 +108,90 @@ class FileOperations:
             self.save_item_changes(media_path)
 
     def save_all_changes(self):
-        num_saved = 0
-        # Create a copy of the set to iterate over, as it might be modified
-        for path in list(self.app_state.dirty_files):
-            try:
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(self.app_state.text_cache[path])
-                self.app_state.dirty_files.remove(path)
-                
-                # Update the visual indicator in the file list
-                # Check if this media_path still has any dirty files associated with it
-                media_path = self.main_window.file_list.get_media_path_from_text_path(path)
-                if media_path:
-                    has_remaining_dirty_files_for_item = False
-                    for dirty_file_path in self.app_state.dirty_files:
-                        dirty_media_path = self.main_window.file_list.get_media_path_from_text_path(dirty_file_path)
-                        if dirty_media_path == media_path:
-                            has_remaining_dirty_files_for_item = True
-                            break
-                    self.main_window.file_list.set_item_dirty(media_path, has_remaining_dirty_files_for_item)
-                num_saved += 1
-            except Exception as e:
-                self.main_window.statusBar().showMessage(f"Error saving {path}: {e}", 5000)
-        if num_saved > 0:
-            self.main_window.statusBar().showMessage(f"Saved {num_saved} file(s).", 2000)
+        return self._enqueue_save(self.app_state.dirty_files)
+
+    def save_all_changes_and_wait(self):
+        """Saves everything and only returns once the files are on disk."""
+        batch = self.save_all_changes()
+        self.flush_saves()
+        return batch
+
+    def flush_saves(self):
+        """Waits for queued saves and applies their results immediately."""
+        for batch in self.save_engine.wait():
+            self._apply_saved_batch(batch)
+
+    @tracing.traced('enqueue_save', 'save')
+    def _enqueue_save(self, paths, description=""):
+        self.main_window.text_editor_panel.flush_pending_edits()
+        # Snapshot now: edits made while the batch is being written stay dirty.
+        snapshot = {}
+        unchanged_media_paths = []
+        conflicts = []
+        baselines = self.app_state.baselines
+        for path in list(paths):
+            if path not in self.app_state.text_cache:
+                continue
+            content = self.app_state.text_cache[path]
+            if baselines.matches(path, content):
+                unchanged_media_paths.extend(self.app_state.dirty_files.discard(path))
+                continue
+            if baselines.changed_on_disk(path):
+                conflicts.append(path)
+            snapshot[path] = content
+        self.main_window.file_list.set_items_dirty(unchanged_media_paths, False)
+
+        if conflicts and not self._confirm_overwrite(conflicts):
+            for path in conflicts:
+                del snapshot[path]
+        if not snapshot:
+            return None
+        batch = self.save_engine.enqueue(snapshot)
+        batch.description = description
+        if len(snapshot) > 1:
+            self.main_window.save_progress_bar.setRange(0, len(snapshot))
+            self.main_window.save_progress_bar.setValue(0)
+            self.main_window.save_progress_bar.show()
+        return batch
+
+    def _confirm_overwrite(self, conflicts):
+        names = "\n".join(os.path.basename(path) for path in conflicts[:10])
+        if len(conflicts) > 10:
+            names += f"\n... and {len(conflicts) - 10} more"
+        reply = QMessageBox.question(self.main_window, 'Files Changed on Disk',
+                                   f"{len(conflicts)} file(s) were changed outside DatasetQuickView since they were loaded:\n\n{names}\n\n"
+                                   "Overwrite them with your edits? Choose No to keep them unsaved.",
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                   QMessageBox.StandardButton.No)
+        return reply == QMessageBox.StandardButton.Yes
+
+    def _on_save_progress(self, done, total):
+        self.main_window.save_progress_bar.setRange(0, total)
+        self.main_window.save_progress_bar.setValue(done)
+
+    def _apply_saved_batch(self, batch):
+        if batch.applied:
+            return
+        batch.applied = True
+        if not self.save_engine.is_busy():
+            self.main_window.save_progress_bar.hide()
+
+        text_editor_panel = self.main_window.text_editor_panel
+        clean_media_paths = []
+        for path, content in batch.saved:
+            current = self.app_state.text_cache.get(path)
+            if text_editor_panel.has_pending_edits(path):
+                continue
+            if path in self.app_state.dirty_files and (current is content or current == content):
+                clean_media_paths.extend(self.app_state.dirty_files.discard(path))
+        self.main_window.file_list.set_items_dirty(clean_media_paths, False)
+
+        if batch.errors:
+            path, error = batch.errors[0]
+            self.main_window.statusBar().showMessage(f"Error saving {len(batch.errors)} file(s), e.g. {path}: {error}", 5000)
+        elif batch.saved:
+            suffix = f" {batch.description}" if batch.description else ""
+            self.main_window.statusBar().showMessage(f"Saved {len(batch.saved)} file(s){suffix}.", 2000)
 
     def revert_current_item_changes(self):
         current_item = self.main_window.file_list.currentItem()
@@ -91,23 +199,19 @@ class FileOperations:
             return
 
         media_path = current_item.data(Qt.ItemDataRole.UserRole)
-        text_paths = self.app_state.dataset.get(media_path, [])
-        
-        if not text_paths:
-            basename, _ = os.path.splitext(media_path)
-            new_txt_path = basename + ".txt"
-            text_paths = [new_txt_path]
+        self.main_window.text_editor_panel.discard_pending_edits()
 
         reverted_count = 0
-        for text_path in text_paths:
-            if text_path in self.app_state.dirty_files:
-                self.app_state.dirty_files.remove(text_path)
-                if text_path in self.app_state.text_cache:
-                    del self.app_state.text_cache[text_path]
-                reverted_count += 1
+        clean_media_paths = []
+        for text_path in self.app_state.dirty_files.paths_for(media_path):
+            clean_media_paths.extend(self.app_state.dirty_files.discard(text_path))
+            if text_path in self.app_state.text_cache:
+                del self.app_state.text_cache[text_path]
+            self.main_window.search_engine.update_text(text_path, self._read_disk_content(text_path), media_path)
+            reverted_count += 1
         
         if reverted_count > 0:
-            self.main_window.file_list.set_item_dirty(media_path, False)
+            self.main_window.file_list.set_items_dirty(clean_media_paths, False)
             self.main_window.on_file_selected(current_item, None) # Reload the view for the current item
             self.main_window.statusBar().showMessage(f"Reverted changes for {reverted_count} file(s).", 2000)
 
@@ -122,13 +226,7 @@ class FileOperations:
 
         if reply == QMessageBox.StandardButton.Yes:
             reverted_count = len(self.app_state.dirty_files)
-            self.app_state.dirty_files.clear()
-            self.app_state.text_cache.clear()
-
-            for i in range(self.main_window.file_list.count()):
-                item = self.main_window.file_list.list_widget.item(i)
-                media_path = item.data(Qt.ItemDataRole.UserRole)
-                self.main_window.file_list.set_item_dirty(media_path, False)
+            self._drop_unsaved_changes()
 
             # Reload the current item to refresh the display
             current_item = self.main_window.file_list.currentItem()
@@ -137,33 +235,69 @@ class FileOperations:
 
             self.main_window.statusBar().showMessage(f"Reverted changes for {reverted_count} file(s).", 2000)
 
+    def _drop_unsaved_changes(self):
+        self.main_window.text_editor_panel.discard_pending_edits()
+        self.main_window.search_engine.update_texts(
+            (text_path, self._read_disk_content(text_path)) for text_path in self.app_state.dirty_files)
+        dirty_media_paths = self.app_state.dirty_files.dirty_media()
+        self.app_state.dirty_files.clear()
+        self.app_state.text_cache.clear()
+        self.main_window.file_list.set_items_dirty(dirty_media_paths, False)
+
+    def _read_disk_content(self, text_path):
+        try:
+            return self.app_state.baselines.read(text_path)
+        except Exception:
+            return ""
+
+    def resolve_unsaved_changes(self, question):
+        """
+        Asks whether to save or discard unsaved edits before an operation that rereads
+        captions from disk. Returns False if the user cancelled.
+        """
+        self.main_window.text_editor_panel.flush_pending_edits()
+        if not self.app_state.dirty_files:
+            return True
+        reply = QMessageBox.question(self.main_window, 'Unsaved Changes', question,
+                                   QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel,
+                                   QMessageBox.StandardButton.Cancel)
+        if reply == QMessageBox.StandardButton.Save:
+            self.save_all_changes_and_wait()
+        elif reply == QMessageBox.StandardButton.Discard:
+            self._drop_unsaved_changes()
+        return reply != QMessageBox.StandardButton.Cancel
+
+    def restore_texts(self, contents, rescan=False):
+        """
+        Writes contents (path -> text) through the background save engine, waits for it
+        and brings the caches, the search index and the open item up to date.
+        """
+        self.main_window.text_editor_panel.discard_pending_edits()
+        batch = self.save_engine.enqueue(contents)
+        batch.description = "from checkpoint"
+        self.flush_saves()
+        clean_media_paths = []
+        for path, _content in batch.saved:
+            self.app_state.text_cache.pop(path, None)
+            clean_media_paths.extend(self.app_state.dirty_files.discard(path))
+        self.main_window.file_list.set_items_dirty(clean_media_paths, False)
+        self.main_window.search_engine.update_texts(batch.saved)
+        if rescan:
+            self.refresh_dataset()
+            return
+        current_item = self.main_window.file_list.currentItem()
+        if current_item:
+            self.main_window.on_file_selected(current_item, None)
+
     def refresh_dataset(self):
-        if self.app_state.dirty_files:
-            reply = QMessageBox.question(self.main_window, 'Unsaved Changes',
-                                       "You have unsaved changes. Do you want to save them before refreshing?",
-                                       QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel,
-                                       QMessageBox.StandardButton.Cancel)
-
-            if reply == QMessageBox.StandardButton.Save:
-                self.save_all_changes()
-            elif reply == QMessageBox.StandardButton.Cancel:
-                return
-
-        self.app_state.text_cache = {}
-        self.app_state.dirty_files = set()
-        self.load_dataset(self.main_window.recursive_checkbox.isChecked())
+        if not self.resolve_unsaved_changes("You have unsaved changes. Do you want to save them before refreshing?"):
+            return
 
-        if not self.app_state.dataset:
-            self.main_window.statusBar().showMessage(f"No media files found in {self.app_state.folder_path}.", 5000)
-            self.main_window.file_list.list_widget.clear()
-            self.main_window.file_list.update_progress(0, 0)
-            self.main_window.text_editor_panel.load_text_files([], self.app_state.current_font_size, self.app_state.text_cache)
-            self.main_window.media_viewer.clear_media()
-        else:
-            self.main_window.file_list.dataset = self.app_state.dataset
-            self.main_window.file_list.populate_list(self.app_state.dataset.keys())
-            self.main_window.file_list.setCurrentRow(0)
-        self.main_window.update_status()
+        self.flush_saves()
+        self.main_window.text_editor_panel.discard_pending_edits()
+        self.app_state.reset_texts()
+        self.load_dataset(self.main_window.recursive_checkbox.isChecked())
+        self.show_dataset()
 
     def commit_rename(self, new_name):
         current_item = self.main_window.file_list.currentItem()
@@ -204,6 +338,15 @@ class FileOperations:
 
             self.app_state.dataset[new_media_path] = new_text_paths
             del self.app_state.dataset[old_media_path]
+            self.app_state.rebuild_text_index()
+
+            for old_text_path, new_text_path in zip(old_text_paths, new_text_paths):
+                self.main_window.search_engine.remove_text(old_text_path)
+                self.main_window.search_engine.update_text(new_text_path, self.main_window.get_text_content(new_text_path) or "", new_media_path)
+            # The find dialog's hits still name the old paths; have it search again.
+            find_dialog = self.main_window.dialog_manager.find_dialog
+            if find_dialog is not None:
+                find_dialog.on_external_text_change(new_media_path)
 
             self.main_window.file_list.rename_media_file(old_media_path, new_media_path)
 
@@ -218,31 +361,19 @@ class FileOperations:
             self.main_window.cancel_rename()
 
     def load_new_folder(self, folder_path):
-        if self.app_state.dirty_files:
-            reply = QMessageBox.question(self.main_window, 'Unsaved Changes',
-                                       "You have unsaved changes in the current folder. Save them before loading a new one?",
-                                       QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel,
-                                       QMessageBox.StandardButton.Cancel)
-
-            if reply == QMessageBox.StandardButton.Save:
-                self.save_all_changes()
-            elif reply == QMessageBox.StandardButton.Cancel:
-                return
+        if not self.resolve_unsaved_changes("You have unsaved changes in the current folder. Save them before loading a new one?"):
+            return
 
+        self.main_window.search_engine.persist()
+        self.app_state.bulk_history.clear()
+        self.main_window.update_bulk_history_buttons()
+        self.app_state.virtual_formats.clear()
         self.app_state.folder_path = folder_path
-        self.app_state.text_cache = {}
-        self.app_state.dirty_files = set()
+        self.flush_saves()
+        self.main_window.text_editor_panel.discard_pending_edits()
+        self.app_state.reset_texts()
         self.load_dataset(self.main_window.recursive_checkbox.isChecked())
-
-        if not self.app_state.dataset:
-            self.main_window.statusBar().showMessage(f"No media files found in {folder_path}.", 5000)
-            self.main_window.file_list.list_widget.clear()
-            self.main_window.file_list.update_progress(0, 0)
-            self.main_window.text_editor_panel.load_text_files([], self.app_state.current_font_size, self.app_state.text_cache)
-            self.main_window.media_viewer.clear_media()
-        else:
-            self.main_window.file_list.dataset = self.app_state.dataset
-            self.main_window.file_list.populate_list(self.app_state.dataset.keys())
-            self.main_window.file_list.setCurrentRow(0)
+        self.show_dataset()
 
         self.main_window.setWindowTitle(f"DatasetQuickView - {self.app_state.folder_path}")
+        self.main_window.open_edit_journal()
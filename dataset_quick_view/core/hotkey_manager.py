@@ -16,3 +16,5 @@ class HotkeyManager:
         QShortcut(QKeySequence("Alt+Home"), self.main_window, self.main_window.select_first_item)
         QShortcut(QKeySequence("Alt+PgUp"), self.main_window, lambda: self.main_window.navigate_files(-10))
         QShortcut(QKeySequence("Alt+PgDown"), self.main_window, lambda: self.main_window.navigate_files(10))
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self.main_window, self.main_window.toggle_trace_overlay)
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self.main_window, self.main_window.dialog_manager.show_memory_dialog)
@@ -0,0 +1,92 @@
+import logging
+
+from .memory_usage import format_bytes
+
+logger = logging.getLogger(__name__)
+
+MEGABYTE = 1024 * 1024
+
+# Eviction order under pressure, lowest first. Search results are recomputed from the
+# index, clean caption texts are read from disk again when needed, evicted thumbnails
+# are decoded again when scrolled back into view, and the search index takes a pass
+# over every caption to rebuild. The current item's decoded image is only counted,
+# and its media and caption paths are protected in every cache that can evict.
+PRIORITY_SEARCH_RESULTS = 10
+PRIORITY_TEXT_CACHE = 20
+PRIORITY_THUMBNAILS = 30
+PRIORITY_SEARCH_INDEX = 40
+PRIORITY_CURRENT_ITEM = 100
+
+# Once over the ceiling, evict down to this share of it, so the caches don't hover at
+# the limit and evict on every check.
+EVICTION_TARGET = 0.9
+
+
+class MemoryBudget:
+    """
+    One memory ceiling shared by all caches. Each cache registers a size() callable,
+    which should be cheap, and optionally evict(bytes_needed, protected), which frees
+    what it can without touching the protected paths and returns the bytes it freed.
+    enforce() evicts from the lowest priority caches until the total fits again.
+    Caches that cannot evict (the current image) are counted in usage() but not
+    against the ceiling, since dropping everything else could not bring them under it.
+    """
+
+    def __init__(self, ceiling_bytes):
+        self.ceiling = ceiling_bytes
+        self.protected = frozenset()
+        self._caches = {}
+
+    def register(self, name, priority, size, evict=None):
+        self._caches[name] = (priority, size, evict)
+
+    def unregister(self, name):
+        self._caches.pop(name, None)
+
+    def set_ceiling(self, ceiling_bytes):
+        self.ceiling = ceiling_bytes
+
+    def protect(self, paths):
+        """Paths that must stay cached (the current item's media and captions)."""
+        self.protected = frozenset(path for path in paths if path)
+
+    def usage(self):
+        """Bytes held by each cache, lowest priority first."""
+        return {name: size() for name, (_priority, size, _evict) in self._by_priority()}
+
+    def total(self):
+        return sum(self.usage().values())
+
+    def evictable_total(self):
+        return sum(size() for _priority, size, evict in self._caches.values() if evict is not None)
+
+    def _by_priority(self):
+        return sorted(self._caches.items(), key=lambda entry: entry[1][0])
+
+    def enforce(self):
+        """
+        Once the evictable caches exceed the ceiling, evicts down to EVICTION_TARGET of
+        it; returns the bytes freed per cache.
+        """
+        freed = {}
+        evictable = self.evictable_total()
+        if evictable <= self.ceiling:
+            return freed
+        excess = evictable - int(self.ceiling * EVICTION_TARGET)
+        for name, (_priority, size, evict) in self._by_priority():
+            if evict is None or not size():
+                continue
+            try:
+                amount = evict(excess, self.protected)
+            except Exception as e:
+                logger.warning(f"Could not evict from {name}: {e}")
+                continue
+            if amount:
+                freed[name] = amount
+                excess -= amount
+            if excess <= 0:
+                break
+        if freed:
+            evicted = ", ".join(f"{format_bytes(amount)} from {name}" for name, amount in freed.items())
+            logger.info(f"Memory budget of {format_bytes(self.ceiling)} exceeded, evicted {evicted}")
+        return freed
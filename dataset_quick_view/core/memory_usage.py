@@ -0,0 +1,117 @@
+"""
+Approximate memory accounting for the dataset structures, independent of Qt.
+
+Sizes are Python object sizes (sys.getsizeof) followed through containers and
+instance attributes. Containers with more than SAMPLE_SIZE entries are measured
+on an evenly spaced sample and extrapolated, so a report over millions of items
+takes a fraction of a second instead of walking every string. Each structure is
+measured on its own: strings shared between structures (a media path is a key of
+the dataset and a value of the scan) are counted in each of them.
+"""
+import sys
+from array import array
+
+SAMPLE_SIZE = 2000
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, bool, complex, type(None), array)
+
+
+def _sample(items, count):
+    """An evenly spaced sample of SAMPLE_SIZE entries from an iterable of length count."""
+    step = count / SAMPLE_SIZE
+    wanted = (int(i * step) for i in range(SAMPLE_SIZE))
+    next_index = next(wanted)
+    for i, item in enumerate(items):
+        if i == next_index:
+            yield item
+            next_index = next(wanted, None)
+            if next_index is None:
+                return
+
+
+def deep_size(obj, _seen=None):
+    """Approximate bytes held by obj and everything it references."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC_TYPES):
+        return size
+
+    if isinstance(obj, dict):
+        count = len(obj)
+        if count > SAMPLE_SIZE:
+            sampled = sum(deep_size(key, seen) + deep_size(value, seen) for key, value in _sample(obj.items(), count))
+            return size + sampled * count // SAMPLE_SIZE
+        return size + sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        count = len(obj)
+        if count > SAMPLE_SIZE:
+            return size + sum(deep_size(item, seen) for item in _sample(obj, count)) * count // SAMPLE_SIZE
+        return size + sum(deep_size(item, seen) for item in obj)
+
+    # Plain objects: their attribute dict or slots.
+    if hasattr(obj, '__dict__'):
+        size += deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def index_usage(index):
+    """Rows for a DatasetIndex: the grouped dataset and the raw scan it was built from."""
+    if index is None:
+        return {}
+    return {
+        'dataset': {'bytes': deep_size(index.dataset), 'items': len(index.dataset)},
+        'scan': {'bytes': deep_size(index.files_by_stem), 'items': len(index.files_by_stem)},
+    }
+
+
+def caption_store_usage(store):
+    """Rows for a CaptionStore: cached caption texts and the on-disk baselines kept for them."""
+    return {
+        'text_cache': {'bytes': deep_size(store.text_cache), 'items': len(store.text_cache)},
+        'baselines': {'bytes': deep_size(store.baselines.baselines), 'items': len(store.baselines.baselines)},
+        'dirty_files': {'bytes': deep_size(store.dirty_files), 'items': len(store.dirty_files)},
+    }
+
+
+def search_index_usage(index, text_to_media=None, result_cache=None):
+    """Rows for a TrigramIndex and, optionally, the search engine's lookups and cached results."""
+    size = deep_size(index)
+    if text_to_media is not None:
+        size += deep_size(text_to_media)
+    if result_cache is not None:
+        size += deep_size(result_cache)
+    return {'search_index': {'bytes': size, 'items': len(index)}}
+
+
+def total_bytes(report):
+    return sum(row['bytes'] for row in report.values())
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def format_report(report, item_count=None):
+    """The report as aligned text lines, largest first, with bytes per dataset item when given."""
+    lines = []
+    for name, row in sorted(report.items(), key=lambda entry: entry[1]['bytes'], reverse=True):
+        line = f"{name:<16} {format_bytes(row['bytes']):>10}  {row['items']:>9} entries"
+        if item_count:
+            line += f"  {row['bytes'] / item_count:8.0f} B/item"
+        lines.append(line)
+    total = total_bytes(report)
+    line = f"{'total':<16} {format_bytes(total):>10}"
+    if item_count:
+        line += f"  {'':>17}  {total / item_count:8.0f} B/item"
+    lines.append(line)
+    return lines
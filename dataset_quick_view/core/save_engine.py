@@ -0,0 +1,105 @@
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..utils.file_handler import write_text_atomic
+from ..utils import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class SaveBatch:
+    """A snapshot of (path, content) pairs written together."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.saved = []
+        self.errors = []
+        self.applied = False
+        self._done = threading.Event()
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def wait(self):
+        self._done.wait()
+        return self
+
+
+class SaveEngine(QObject):
+    """
+    Writes snapshots of dirty captions off the GUI thread.
+
+    Batches run one after another, so a later save of the same file can never be
+    overtaken by an earlier one; the files inside a batch are written in parallel.
+    """
+    progress = pyqtSignal(int, int)  # files written, total files in batch
+    batch_finished = pyqtSignal(object)
+
+    def __init__(self, baselines=None, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.baselines = baselines
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='save-dispatch')
+        self._writers = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='save-writer')
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, snapshot):
+        """Queues a dict of path -> content for writing and returns its SaveBatch."""
+        batch = SaveBatch(dict(snapshot))
+        with self._lock:
+            self._pending.append(batch)
+        self._dispatcher.submit(self._run_batch, batch)
+        return batch
+
+    def is_busy(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def wait(self):
+        """Blocks until every queued batch has been written."""
+        with self._lock:
+            pending = list(self._pending)
+        for batch in pending:
+            batch.wait()
+        return pending
+
+    def shutdown(self):
+        self.wait()
+        self._dispatcher.shutdown()
+        self._writers.shutdown()
+
+    def _write(self, path, content):
+        try:
+            write_text_atomic(path, content)
+            if self.baselines is not None:
+                self.baselines.record(path, content)
+            return path, content, None
+        except Exception as e:
+            return path, content, e
+
+    def _run_batch(self, batch):
+        total = len(batch.snapshot)
+        step = max(1, total // 100)
+        try:
+            with tracing.span('save_batch', 'save', files=total):
+                for done, (path, content, error) in enumerate(self._writers.map(lambda item: self._write(*item), batch.snapshot.items()), 1):
+                    if error is None:
+                        batch.saved.append((path, content))
+                    else:
+                        logger.error(f"Error saving {path}: {error}")
+                        batch.errors.append((path, error))
+                    if done % step == 0 or done == total:
+                        self.progress.emit(done, total)
+        finally:
+            with self._lock:
+                self._pending.remove(batch)
+            batch._done.set()
+            self.batch_finished.emit(batch)
@@ -0,0 +1,301 @@
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+
+from .search_index import TrigramIndex, compile_search_pattern, find_spans
+from .search_results import SearchResults
+from .memory_usage import deep_size
+from ..utils.config_manager import get_app_base_path
+from ..utils import tracing
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_SIZE = 32
+# The memory budget leaves an index alone for this long after a search, so a big
+# index is not dropped and rebuilt over and over while someone is searching.
+INDEX_KEEP_SECONDS = 300
+
+
+def get_index_cache_path(folder_path):
+    folder_key = hashlib.sha1(os.path.abspath(folder_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_app_base_path(), 'cache', f'search_index_{folder_key}.pickle')
+
+
+class SearchEngine:
+    """Global find over all text files in the dataset, narrowed by a trigram index."""
+
+    def __init__(self, app_state, content_provider):
+        self.app_state = app_state
+        self.content_provider = content_provider
+        self.index = TrigramIndex()
+        self.text_to_media = {}
+        self.index_modified = False
+        # Bumped on every content or dataset change; part of every cache key.
+        self.generation = 0
+        self.result_cache = OrderedDict()
+        self.last_search = None
+        # The results last handed out; replaced by a patched copy when a single file changes.
+        self.active_search = None
+        # Sizes for the memory budget, measured lazily after the index or cache changed
+        self._index_bytes = None
+        self._result_cache_bytes = None
+        self.last_used = 0.0
+
+    def reset(self):
+        """Drops the index; call whenever the dataset is reloaded."""
+        self.index.clear()
+        self.text_to_media = {}
+        self.index_modified = False
+        self.active_search = None
+        self._index_bytes = None
+        self._invalidate()
+
+    def _invalidate(self):
+        self.generation += 1
+        self.result_cache.clear()
+        self._result_cache_bytes = None
+        self.last_search = None
+
+    def index_memory(self):
+        """Approximate bytes of the index and its path lookup, measured once per build."""
+        if not self.index.is_built:
+            return 0
+        if self._index_bytes is None:
+            self._index_bytes = deep_size(self.index) + deep_size(self.text_to_media)
+        return self._index_bytes
+
+    def result_cache_memory(self):
+        if self._result_cache_bytes is None:
+            self._result_cache_bytes = deep_size(self.result_cache) if self.result_cache else 0
+        return self._result_cache_bytes
+
+    def evict_results(self, bytes_needed=0, protected=()):
+        """Forgets cached results; the active results stay with the find dialog."""
+        freed = self.result_cache_memory()
+        self.result_cache.clear()
+        self._result_cache_bytes = None
+        return freed
+
+    def drop_index(self, bytes_needed=0, protected=()):
+        """
+        Saves the index if it is persisted and drops it; the next search builds it again.
+        An index searched in the last INDEX_KEEP_SECONDS is kept.
+        """
+        if time.monotonic() - self.last_used < INDEX_KEEP_SECONDS:
+            return 0
+        freed = self.index_memory()
+        if freed:
+            self.persist()
+            self.reset()
+        return freed
+
+    def _persist_enabled(self):
+        return self.app_state.config.settings.persist_index
+
+    def ensure_index(self):
+        if self.index.is_built:
+            return
+        self.text_to_media = {}
+        for media_path, text_paths in self.app_state.dataset.items():
+            for text_path in text_paths:
+                self.text_to_media.setdefault(text_path, []).append(media_path)
+
+        if self._persist_enabled():
+            cache_path = get_index_cache_path(self.app_state.folder_path)
+            if self.index.load(cache_path, self.text_to_media.keys(), self.content_provider):
+                self.index_modified = True
+                self._index_bytes = None
+                return
+
+        with tracing.span('build_search_index', 'search', files=len(self.text_to_media)):
+            self.index.build(self.text_to_media.keys(), self.content_provider)
+        self.index_modified = True
+        self._index_bytes = None
+        # An empty index (searched before the folder finished loading) would replace a good one on disk.
+        if self.text_to_media:
+            self.persist()
+
+    def persist(self):
+        if not self.index.is_built or not self.index_modified or not self._persist_enabled():
+            return
+        cache_path = get_index_cache_path(self.app_state.folder_path)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            self.index.save(cache_path)
+            self.index_modified = False
+        except Exception as e:
+            logger.warning(f"Could not save search index: {e}")
+
+    def update_text(self, text_path, content, media_path=None):
+        """Keeps the index in sync with an edited, saved or reverted text file."""
+        self._invalidate()
+        if not self.index.is_built:
+            return
+        if text_path not in self.text_to_media:
+            media_path = media_path or self._find_media_for_new_text(text_path)
+            if media_path is None:
+                return
+            self.text_to_media[text_path] = [media_path]
+        self.index.update(text_path, content)
+        self.index_modified = True
+        self._refresh_active_search(text_path, content)
+
+    def update_texts(self, changes):
+        """
+        Batch form of update_text for bulk edits. changes is an iterable of
+        (text_path, content) pairs; the active results are rebuilt with a single sort.
+        """
+        self._invalidate()
+        if not self.index.is_built:
+            return
+        changed = {}
+        for text_path, content in changes:
+            if text_path not in self.text_to_media:
+                media_path = self._find_media_for_new_text(text_path)
+                if media_path is None:
+                    continue
+                self.text_to_media[text_path] = [media_path]
+            self.index.update(text_path, content)
+            changed[text_path] = content
+        if not changed:
+            return
+        self.index_modified = True
+
+        if self.active_search is None:
+            return
+        find_text, case_sensitive, whole_words, results, hit_paths = self.active_search
+        pattern = compile_search_pattern(find_text, case_sensitive, whole_words)
+        hits = [hit for hit in results.hits if hit[1] not in changed]
+        for text_path, content in changed.items():
+            file_hits = find_spans(pattern, content) if content else []
+            if file_hits:
+                hit_paths.add(text_path)
+            else:
+                hit_paths.discard(text_path)
+            for media_path in self.text_to_media[text_path]:
+                hits.extend((media_path, text_path, position, length) for position, length in file_hits)
+        hits.sort()
+        results = SearchResults(hits)
+        self._remember(find_text, case_sensitive, whole_words, results, hit_paths)
+
+    def remap_dataset(self):
+        """
+        Follows a re-filtered dataset without rebuilding: text files that left it are
+        dropped from the index and only the ones that joined are read.
+        """
+        self._invalidate()
+        self.active_search = None
+        if not self.index.is_built:
+            return
+        text_to_media = {}
+        for media_path, text_paths in self.app_state.dataset.items():
+            for text_path in text_paths:
+                text_to_media.setdefault(text_path, []).append(media_path)
+        for text_path in self.text_to_media.keys() - text_to_media.keys():
+            self.index.remove(text_path)
+        for text_path in text_to_media.keys() - self.text_to_media.keys():
+            self.index.update(text_path, self.content_provider(text_path))
+        self.text_to_media = text_to_media
+        self.index_modified = True
+
+    def remove_text(self, text_path):
+        self._invalidate()
+        if not self.index.is_built:
+            return
+        self._refresh_active_search(text_path, "")
+        self.text_to_media.pop(text_path, None)
+        self.index.remove(text_path)
+        self.index_modified = True
+
+    def _refresh_active_search(self, text_path, content):
+        """Re-verifies one file against the active query; the new results replace the active ones."""
+        if self.active_search is None:
+            return
+        find_text, case_sensitive, whole_words, results, hit_paths = self.active_search
+        pattern = compile_search_pattern(find_text, case_sensitive, whole_words)
+        hits = find_spans(pattern, content) if content else []
+        results = results.with_file_hits(text_path, self.text_to_media.get(text_path, ()), hits)
+        if hits:
+            hit_paths.add(text_path)
+        else:
+            hit_paths.discard(text_path)
+        self._remember(find_text, case_sensitive, whole_words, results, hit_paths)
+
+    def _remember(self, find_text, case_sensitive, whole_words, results, hit_paths):
+        cache_key = (find_text, case_sensitive, whole_words, self.generation)
+        self.result_cache[cache_key] = (results, hit_paths)
+        self.result_cache.move_to_end(cache_key)
+        if len(self.result_cache) > RESULT_CACHE_SIZE:
+            self.result_cache.popitem(last=False)
+        self._result_cache_bytes = None
+        self.last_search = (cache_key, hit_paths)
+        self.active_search = (find_text, case_sensitive, whole_words, results, hit_paths)
+
+    def _find_media_for_new_text(self, text_path):
+        media_paths = self.app_state.media_for_text(text_path)
+        return media_paths[0] if media_paths else None
+
+    @tracing.traced('search', 'search')
+    def search(self, find_text, case_sensitive=False, whole_words=False):
+        """Returns the SearchResults for find_text over the whole dataset."""
+        if not find_text:
+            return SearchResults()
+        self.last_used = time.monotonic()
+        self.ensure_index()
+
+        cache_key = (find_text, case_sensitive, whole_words, self.generation)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            self._remember(find_text, case_sensitive, whole_words, *cached)
+            return cached[0]
+
+        candidates = self.index.candidates(find_text)
+        refined = self._refined_candidates(find_text, case_sensitive, whole_words)
+        if refined is not None:
+            candidates = refined if candidates is None else refined & candidates
+        if candidates is None:
+            candidates = self.text_to_media.keys()
+
+        results, hit_paths = self._verify(candidates, compile_search_pattern(find_text, case_sensitive, whole_words))
+        self._remember(find_text, case_sensitive, whole_words, results, hit_paths)
+        return results
+
+    def _refined_candidates(self, find_text, case_sensitive, whole_words):
+        """
+        If find_text extends the previous query with the same flags, only the
+        files that matched last time can match now. Whole-word queries are never
+        refined, since a longer word does not contain the shorter one as a word.
+        """
+        if self.last_search is None or whole_words:
+            return None
+        (last_text, last_case, last_whole, last_generation), hit_paths = self.last_search
+        if (last_case, last_whole, last_generation) != (case_sensitive, whole_words, self.generation):
+            return None
+        if case_sensitive:
+            is_extension = last_text in find_text
+        else:
+            is_extension = last_text.lower() in find_text.lower()
+        return hit_paths if is_extension else None
+
+    def _verify(self, candidates, pattern):
+        results = []
+        hit_paths = set()
+        for text_path in candidates:
+            media_paths = self.text_to_media.get(text_path)
+            if not media_paths:
+                continue
+            content = self.content_provider(text_path)
+            if not content:
+                continue
+            hits = find_spans(pattern, content)
+            if not hits:
+                continue
+            hit_paths.add(text_path)
+            for media_path in media_paths:
+                for position, length in hits:
+                    results.append((media_path, text_path, position, length))
+
+        results.sort()
+        return SearchResults(results), hit_paths
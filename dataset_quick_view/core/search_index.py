@@ -0,0 +1,235 @@
+import os
+import re
+import pickle
+import logging
+from array import array
+from bisect import bisect_left
+
+from .caption_store import read_captions
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+def compile_search_pattern(find_text, case_sensitive=False, whole_words=False):
+    """Builds the regex used to verify matches, mirroring the QTextDocument find flags."""
+    pattern = re.escape(find_text)
+    if whole_words:
+        pattern = r'(?<!\w)' + pattern + r'(?!\w)'
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+_ASTRAL_CHARS = re.compile('[\U00010000-\U0010FFFF]')
+
+
+def _utf16_length(text):
+    return len(text) + len(_ASTRAL_CHARS.findall(text))
+
+
+def find_spans(pattern, content):
+    """
+    Returns (position, length) for every match of pattern in content, counted in
+    UTF-16 code units so the values can be used directly as QTextCursor positions.
+    """
+    spans = [(m.start(), m.end() - m.start()) for m in pattern.finditer(content)]
+    if spans and _ASTRAL_CHARS.search(content):
+        spans = [(_utf16_length(content[:position]), _utf16_length(content[position:position + length]))
+                 for position, length in spans]
+    return spans
+
+
+def str_span(content, position, length):
+    """The inverse of find_spans: a (position, length) in UTF-16 code units as str indices."""
+    if not _ASTRAL_CHARS.search(content):
+        return position, length
+    encoded = content.encode('utf-16-le')
+    start = len(encoded[:2 * position].decode('utf-16-le', errors='ignore'))
+    end = len(encoded[:2 * (position + length)].decode('utf-16-le', errors='ignore'))
+    return start, end - start
+
+
+def search_files(text_paths, pattern, max_workers=None):
+    """
+    Scans files on disk without an index, reading them in parallel. Yields
+    (text_path, content, matches) for every file with at least one match, in the
+    order given; unreadable files are skipped.
+    """
+    for text_path, content, error in read_captions(text_paths, max_workers):
+        if error is not None or not content:
+            continue
+        matches = list(pattern.finditer(content))
+        if matches:
+            yield text_path, content, matches
+
+
+def extract_trigrams(text):
+    """Returns the set of lowercase trigrams in a string."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _contains_sorted(postings, file_id):
+    i = bisect_left(postings, file_id)
+    return i < len(postings) and postings[i] == file_id
+
+
+class TrigramIndex:
+    """
+    Inverted index from lowercase trigrams to the text files containing them.
+
+    The main postings are sorted arrays of file ids built in one pass. Files that
+    change afterwards are moved to a small overlay (path -> trigram set) and
+    excluded from the main postings, so the index never has to be rebuilt for edits.
+    Candidate sets are always a superset of the real matches and must be verified.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.paths = []
+        self.path_ids = {}
+        self.stats = []
+        self.postings = {}
+        self.overlay = {}
+        self.stale_ids = set()
+        self.is_built = False
+
+    def __len__(self):
+        return len(self.path_ids)
+
+    def build(self, text_paths, content_provider):
+        """Indexes every path; content_provider(path) returns the text or None."""
+        self.clear()
+        postings = {}
+        for text_path in text_paths:
+            if text_path in self.path_ids:
+                continue
+            file_id = len(self.paths)
+            self.paths.append(text_path)
+            self.path_ids[text_path] = file_id
+            self.stats.append(self._stat(text_path))
+            content = content_provider(text_path)
+            if not content:
+                continue
+            for trigram in extract_trigrams(content):
+                file_ids = postings.get(trigram)
+                if file_ids is None:
+                    postings[trigram] = array('I', (file_id,))
+                else:
+                    file_ids.append(file_id)
+        self.postings = postings
+        self.is_built = True
+        logger.info(f"Built trigram index over {len(self.paths)} text file(s), {len(postings)} trigram(s).")
+
+    def update(self, text_path, content):
+        """Re-indexes a single file after its content changed."""
+        file_id = self.path_ids.get(text_path)
+        if file_id is None:
+            file_id = len(self.paths)
+            self.paths.append(text_path)
+            self.path_ids[text_path] = file_id
+            self.stats.append(None)
+        self.stale_ids.add(file_id)
+        self.overlay[text_path] = extract_trigrams(content) if content else set()
+
+    def remove(self, text_path):
+        file_id = self.path_ids.pop(text_path, None)
+        if file_id is not None:
+            self.stale_ids.add(file_id)
+        self.overlay.pop(text_path, None)
+
+    def candidates(self, find_text):
+        """
+        Returns the set of paths that can possibly contain find_text, or None when
+        the query is too short to narrow anything down.
+        """
+        query_trigrams = extract_trigrams(find_text)
+        if not query_trigrams:
+            return None
+
+        posting_lists = []
+        for trigram in query_trigrams:
+            file_ids = self.postings.get(trigram)
+            if file_ids is None:
+                posting_lists = None
+                break
+            posting_lists.append(file_ids)
+
+        result = set()
+        if posting_lists:
+            posting_lists.sort(key=len)
+            smallest, rest = posting_lists[0], posting_lists[1:]
+            for file_id in smallest:
+                if file_id in self.stale_ids:
+                    continue
+                if all(_contains_sorted(file_ids, file_id) for file_ids in rest):
+                    result.add(self.paths[file_id])
+
+        for text_path, trigrams in self.overlay.items():
+            if text_path in self.path_ids and query_trigrams <= trigrams:
+                result.add(text_path)
+        return result
+
+    def _stat(self, text_path):
+        try:
+            st = os.stat(text_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def save(self, index_path):
+        data = {
+            'version': INDEX_FORMAT_VERSION,
+            'paths': self.paths,
+            'stats': self.stats,
+            'postings': self.postings,
+            'overlay': self.overlay,
+            'stale_ids': self.stale_ids,
+        }
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+        logger.info(f"Saved search index to {index_path}")
+
+    def load(self, index_path, text_paths, content_provider):
+        """
+        Loads a persisted index and re-indexes any file whose size or mtime changed.
+        Returns False if there was nothing usable on disk.
+        """
+        try:
+            with open(index_path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Could not load search index {index_path}: {e}")
+            return False
+        if data.get('version') != INDEX_FORMAT_VERSION:
+            return False
+
+        self.clear()
+        self.paths = data['paths']
+        self.stats = data['stats']
+        self.postings = data['postings']
+        self.overlay = data['overlay']
+        self.stale_ids = data['stale_ids']
+        self.path_ids = {path: file_id for file_id, path in enumerate(self.paths) if file_id not in self.stale_ids or path in self.overlay}
+        self.is_built = True
+
+        wanted = set(text_paths)
+        for text_path in list(self.path_ids):
+            if text_path not in wanted:
+                self.remove(text_path)
+        refreshed = 0
+        for text_path in wanted:
+            file_id = self.path_ids.get(text_path)
+            if file_id is not None and text_path not in self.overlay and self.stats[file_id] == self._stat(text_path):
+                continue
+            self.update(text_path, content_provider(text_path) or "")
+            refreshed += 1
+        logger.info(f"Loaded search index from {index_path} ({refreshed} file(s) re-indexed).")
+        return True
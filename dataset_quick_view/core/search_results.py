@@ -0,0 +1,66 @@
+from bisect import bisect_left, bisect_right
+
+# Sorts after any real match length, so (media, text, pos, _AFTER) is past every hit at pos.
+_AFTER = float('inf')
+
+
+class SearchResults:
+    """
+    Find hits as (media_path, text_path, position, length) tuples kept sorted by
+    (media, text path, position). Lookups relative to a media item or another hit
+    are bisections, so next/previous/sync never scan the whole list.
+    """
+
+    def __init__(self, hits=()):
+        self.hits = list(hits)
+        self._media_paths = None
+
+    def __len__(self):
+        return len(self.hits)
+
+    def __bool__(self):
+        return bool(self.hits)
+
+    def __getitem__(self, index):
+        return self.hits[index]
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def media_paths(self):
+        if self._media_paths is None:
+            self._media_paths = {hit[0] for hit in self.hits}
+        return self._media_paths
+
+    def first_index_for_media(self, media_path):
+        """Index of the first hit on media_path, or -1 if it has none."""
+        i = bisect_left(self.hits, (media_path,))
+        if i < len(self.hits) and self.hits[i][0] == media_path:
+            return i
+        return -1
+
+    def index_at_or_after_media(self, media_path):
+        """Index of the first hit on media_path or any later item, or -1."""
+        i = bisect_left(self.hits, (media_path,))
+        return i if i < len(self.hits) else -1
+
+    def index_before_media(self, media_path):
+        """Index of the last hit on an item sorted before media_path, or -1."""
+        return bisect_left(self.hits, (media_path,)) - 1
+
+    def index_after(self, media_path, text_path, position):
+        """Index of the first hit strictly after the given position, or -1."""
+        i = bisect_right(self.hits, (media_path, text_path, position, _AFTER))
+        return i if i < len(self.hits) else -1
+
+    def with_file_hits(self, text_path, media_paths, file_hits):
+        """
+        A copy with every hit in text_path replaced by file_hits, a list of (position,
+        length). The results are never changed in place, since a view may be showing them.
+        """
+        hits = self.hits
+        for media_path in media_paths:
+            lo = bisect_left(hits, (media_path, text_path))
+            hi = bisect_left(hits, (media_path, text_path, _AFTER), lo)
+            hits = hits[:lo] + [(media_path, text_path, position, length) for position, length in file_hits] + hits[hi:]
+        return SearchResults(hits)
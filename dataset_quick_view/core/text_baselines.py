@@ -0,0 +1,81 @@
+import os
+import hashlib
+
+
+def content_digest(content):
+    """Fast, short fingerprint of a caption's text."""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class TextBaselines:
+    """
+    Remembers what each caption looked like on disk when it was last read or written:
+    (mtime_ns, size, digest). A cheap stat tells whether the file is still the same,
+    and the digest tells whether some in-memory text is identical to it.
+    """
+
+    def __init__(self):
+        self.baselines = {}
+
+    def clear(self):
+        self.baselines.clear()
+
+    def forget(self, text_path):
+        self.baselines.pop(text_path, None)
+
+    def _stat(self, text_path):
+        try:
+            st = os.stat(text_path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def record(self, text_path, content):
+        """Stores the baseline for content that was just read from or written to text_path."""
+        stat = self._stat(text_path)
+        if stat is None:
+            self.baselines.pop(text_path, None)
+            return
+        self.baselines[text_path] = (stat[0], stat[1], content_digest(content))
+
+    def read(self, text_path):
+        """Reads text_path from disk and records its baseline."""
+        with open(text_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.record(text_path, content)
+        return content
+
+    def is_current(self, text_path):
+        """True if the file still has the size and mtime it had when its baseline was taken."""
+        baseline = self.baselines.get(text_path)
+        return baseline is not None and self._stat(text_path) == baseline[:2]
+
+    def matches(self, text_path, content):
+        """True if content is exactly what is on disk right now, so there is nothing to save."""
+        baseline = self.baselines.get(text_path)
+        if baseline is None or self._stat(text_path) != baseline[:2]:
+            return False
+        return baseline[2] == content_digest(content)
+
+    def changed_on_disk(self, text_path):
+        """
+        True if the file was modified by someone else since its baseline was taken.
+        A changed mtime alone (e.g. a touch) is confirmed against the digest.
+        """
+        baseline = self.baselines.get(text_path)
+        if baseline is None:
+            return False
+        stat = self._stat(text_path)
+        if stat == baseline[:2]:
+            return False
+        if stat is None:
+            return True
+        try:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                disk_content = f.read()
+        except (OSError, UnicodeDecodeError):
+            return True
+        if content_digest(disk_content) != baseline[2]:
+            return True
+        self.baselines[text_path] = (stat[0], stat[1], baseline[2])
+        return False
@@ -0,0 +1,283 @@
+import os
+import difflib
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from ..utils.file_handler import write_text_atomic
+from .bulk_history import make_delta
+
+logger = logging.getLogger(__name__)
+
+# Below this many on-disk files a thread pool is cheaper than starting worker processes.
+PROCESS_POOL_MIN_FILES = 2000
+CHUNK_SIZE = 64
+MAX_DIFF_LINES = 40
+
+
+class Transform:
+    """A caption edit. apply() returns (new_content, number_of_changes)."""
+
+    def apply(self, content):
+        raise NotImplementedError
+
+    def describe(self):
+        return self.__class__.__name__
+
+
+class PrefixSuffix(Transform):
+    def __init__(self, prefix="", suffix=""):
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def apply(self, content):
+        if not self.prefix and not self.suffix:
+            return content, 0
+        return f"{self.prefix}{content}{self.suffix}", 1
+
+    def describe(self):
+        return f"Add prefix {self.prefix!r} / suffix {self.suffix!r}"
+
+
+class StripWhitespace(Transform):
+    def apply(self, content):
+        new_content = content.strip()
+        return new_content, int(new_content != content)
+
+    def describe(self):
+        return "Clear leading/trailing whitespace"
+
+
+class RegexReplace(Transform):
+    """Replaces every match of a compiled pattern; replace_text is inserted literally."""
+
+    def __init__(self, pattern, replace_text):
+        self.pattern = pattern
+        self.replace_text = replace_text
+
+    def apply(self, content):
+        # A function replacement keeps backslashes in replace_text literal.
+        replace_text = self.replace_text
+        return self.pattern.subn(lambda _match: replace_text, content)
+
+    def describe(self):
+        return f"Replace {self.pattern.pattern!r} with {self.replace_text!r}"
+
+
+def split_tags(content, separator=','):
+    return [tag.strip() for tag in content.split(separator) if tag.strip()]
+
+
+def _surrounding_whitespace(content):
+    """The (leading, trailing) whitespace of content, kept when its tags are rewritten."""
+    body = content.strip()
+    if not body:
+        return "", content
+    return content[:len(content) - len(content.lstrip())], content[len(content.rstrip()):]
+
+
+class AddTags(Transform):
+    """Adds comma-separated tags that are not present yet, at the end or the start."""
+
+    def __init__(self, tags, separator=', ', at_start=False):
+        self.tags = list(tags)
+        self.separator = separator
+        self.at_start = at_start
+
+    def apply(self, content):
+        existing = set(split_tags(content, self.separator.strip() or self.separator))
+        missing = [tag for tag in dict.fromkeys(self.tags) if tag not in existing]
+        if not missing:
+            return content, 0
+        body = content.strip()
+        leading, trailing = _surrounding_whitespace(content)
+        parts = missing + [body] if self.at_start else [body] + missing
+        return leading + self.separator.join(part for part in parts if part) + trailing, len(missing)
+
+    def describe(self):
+        return f"Add tags {', '.join(self.tags)}"
+
+
+class RemoveTags(Transform):
+    def __init__(self, tags, separator=', '):
+        self.tags = set(tags)
+        self.separator = separator
+
+    def apply(self, content):
+        tags = split_tags(content, self.separator.strip() or self.separator)
+        kept = [tag for tag in tags if tag not in self.tags]
+        if len(kept) == len(tags):
+            return content, 0
+        leading, trailing = _surrounding_whitespace(content)
+        return leading + self.separator.join(kept) + trailing, len(tags) - len(kept)
+
+    def describe(self):
+        return f"Remove tags {', '.join(sorted(self.tags))}"
+
+
+class TransformPipeline(Transform):
+    """Runs several transforms in order; the change counts are summed."""
+
+    def __init__(self, transforms):
+        self.transforms = list(transforms)
+
+    def apply(self, content):
+        total = 0
+        for transform in self.transforms:
+            content, count = transform.apply(content)
+            total += count
+        return content, total
+
+    def describe(self):
+        return "; ".join(transform.describe() for transform in self.transforms)
+
+
+class TransformResult:
+    __slots__ = ('text_path', 'new_content', 'count', 'diff', 'delta', 'error', 'written')
+
+    def __init__(self, text_path, new_content=None, count=0, diff=None, delta=None, error=None, written=False):
+        self.text_path = text_path
+        self.new_content = new_content
+        self.count = count
+        self.diff = diff
+        self.delta = delta
+        self.error = error
+        self.written = written
+
+    @property
+    def changed(self):
+        return self.count > 0 and self.error is None
+
+
+def make_diff(text_path, old_content, new_content):
+    name = os.path.basename(text_path)
+    lines = list(difflib.unified_diff(old_content.splitlines(), new_content.splitlines(),
+                                      fromfile=name, tofile=name, n=1, lineterm=''))
+    if len(lines) > MAX_DIFF_LINES:
+        lines = lines[:MAX_DIFF_LINES] + [f"... ({len(lines) - MAX_DIFF_LINES} more line(s))"]
+    return "\n".join(lines)
+
+
+def _transform_content(text_path, content, transform, dry_run, record_deltas=False):
+    new_content, count = transform.apply(content)
+    if not count or new_content == content:
+        return TransformResult(text_path)
+    diff = make_diff(text_path, content, new_content) if dry_run else None
+    delta = make_delta(content, new_content) if record_deltas else None
+    return TransformResult(text_path, new_content, count, diff, delta)
+
+
+def _transform_chunk(text_paths, transform, dry_run, return_content, record_deltas=False, cancel_event=None):
+    """
+    Worker entry point: reads, transforms and (unless dry_run) rewrites files on disk.
+    Stops before the next file once cancel_event is set; files not reached get no result.
+    """
+    results = []
+    for text_path in text_paths:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        try:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            result = _transform_content(text_path, content, transform, dry_run, record_deltas)
+            if result.count and not dry_run:
+                write_text_atomic(text_path, result.new_content)
+                result.written = True
+            if not return_content:
+                result.new_content = None
+        except Exception as e:
+            result = TransformResult(text_path, error=f"{e}")
+        results.append(result)
+    return results
+
+
+def run_transforms(text_paths, transform, in_memory=None, dry_run=False, cancel_event=None,
+                   max_workers=None, return_content=True, record_deltas=False):
+    """
+    Streams files through transform, yielding a TransformResult per file as it finishes.
+
+    Files listed in in_memory (path -> content, e.g. open or edited captions) are
+    transformed in memory and never written; the caller decides what to do with them.
+    Every other file is read, transformed and atomically rewritten by a worker pool,
+    a process pool for large batches, so nothing is kept in memory unless return_content
+    is set. With dry_run nothing is written and each changed result carries a diff;
+    with record_deltas each changed result carries an undo delta (see bulk_history).
+
+    Setting cancel_event stops the workers before their next file; the generator still
+    yields the result of every file that was processed, so callers that record what was
+    written should set it and keep consuming. Closing the generator early also cancels,
+    but the results of files that were in progress at that moment are lost.
+    """
+    in_memory = in_memory or {}
+    cancel_event = cancel_event or threading.Event()
+
+    for text_path, content in in_memory.items():
+        if cancel_event.is_set():
+            return
+        if content is None:
+            continue
+        result = _transform_content(text_path, content, transform, dry_run, record_deltas)
+        if dry_run and not return_content:
+            result.new_content = None
+        yield result
+
+    disk_paths = [text_path for text_path in text_paths if text_path not in in_memory]
+    if not disk_paths:
+        return
+    chunks = (disk_paths[i:i + CHUNK_SIZE] for i in range(0, len(disk_paths), CHUNK_SIZE))
+    manager = None
+    if len(disk_paths) >= PROCESS_POOL_MIN_FILES:
+        workers = max_workers or os.cpu_count() or 1
+        # Spawn, not fork: forking the GUI process while its QThreads and thread pools
+        # hold locks can deadlock the children.
+        context = multiprocessing.get_context('spawn')
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        # Worker processes can't see a threading.Event; they check a managed copy of it.
+        manager = context.Manager()
+        worker_cancel = manager.Event()
+    else:
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        pool = ThreadPoolExecutor(max_workers=workers)
+        worker_cancel = cancel_event
+
+    in_flight = {}
+
+    def submit_next():
+        if cancel_event.is_set():
+            return False
+        for chunk in chunks:
+            future = pool.submit(_transform_chunk, chunk, transform, dry_run, return_content, record_deltas, worker_cancel)
+            in_flight[future] = chunk
+            return True
+        return False
+
+    try:
+        # Keep a bounded number of chunks queued so huge datasets don't create millions of futures.
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while in_flight:
+            # A timeout, so a cancel reaches the worker processes while their chunks run.
+            done, _not_done = wait(in_flight, timeout=0.1, return_when=FIRST_COMPLETED)
+            if cancel_event.is_set() and worker_cancel is not cancel_event:
+                worker_cancel.set()
+            for future in done:
+                chunk = in_flight.pop(future)
+                submit_next()
+                if future.cancelled():
+                    continue
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    logger.error(f"Transform worker failed: {e}")
+                    chunk_results = [TransformResult(text_path, error=f"{e}") for text_path in chunk]
+                yield from chunk_results
+    finally:
+        cancel_event.set()
+        worker_cancel.set()
+        for future in in_flight:
+            future.cancel()
+        pool.shutdown(wait=True)
+        if manager is not None:
+            manager.shutdown()
@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QToolBar, QCheckBox, QSizePolicy, QPushButton, QFrame, QMessageBox, QFileDialog, QLabel, QListWidget, QTextEdit, QDialog, QLineEdit, QStackedWidget, QStyle
 from PyQt6.QtGui import QShortcut, QKeySequence, QFont, QIcon, QAction
-from PyQt6.QtCore import Qt, QEvent, pyqtSignal
+from PyQt6.QtCore import Qt, QEvent, QTimer, pyqtSignal
 import os, sys, subprocess
 
 from .ui.main_window_ui import Ui_MainWindow
@@ -9,6 +9,15 @@ from .core.file_operations import FileOperations
 from .core.dialog_manager import DialogManager
 from .core.hotkey_manager import HotkeyManager
 from .core.settings_manager import SettingsManager
+from .core.search_engine import SearchEngine
+from .core.edit_journal import EditJournal
+from .core import memory_usage
+from .core import memory_budget
+from .core.memory_budget import MemoryBudget
+from .utils import tracing
+
+JOURNAL_SYNC_INTERVAL_MS = 2000
+MEMORY_CHECK_INTERVAL_MS = 1000
 
 class MainWindow(QMainWindow, Ui_MainWindow):
     file_loaded = pyqtSignal()
@@ -24,6 +33,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dialog_manager = DialogManager(self)
         self.hotkey_manager = HotkeyManager(self)
         self.settings_manager = SettingsManager(self)
+        self.search_engine = SearchEngine(self.app_state, self.get_text_content)
+        self.edit_journal = EditJournal(self.app_state.folder_path)
+        self.memory_budget = MemoryBudget(self.config.settings.cache_budget_mb * memory_budget.MEGABYTE)
+        self.trace_overlay = None
 
         self.setWindowTitle(f"DatasetQuickView - {self.app_state.folder_path}")
         self.resize(1200, 800)
@@ -36,22 +49,30 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.settings_manager.load_settings()
         self.connect_signals()
-        self.file_operations.load_dataset(self.recursive_checkbox.isChecked())
-        
-        self.file_list.dataset = self.app_state.dataset
-        self.file_list.populate_list(self.app_state.dataset.keys())
-        
         self.hotkey_manager.setup_hotkeys()
         self.apply_font_settings()
         self.center_on_screen()
 
-        if self.app_state.dataset:
-            self.file_list.setCurrentRow(0)
+        self.journal_timer = QTimer(self)
+        self.journal_timer.setInterval(JOURNAL_SYNC_INTERVAL_MS)
+        self.journal_timer.timeout.connect(self.sync_edit_journal)
+        self.journal_timer.start()
+
+        self.register_caches()
+        self.memory_timer = QTimer(self)
+        self.memory_timer.setInterval(MEMORY_CHECK_INTERVAL_MS)
+        self.memory_timer.timeout.connect(self.memory_budget.enforce)
+        self.memory_timer.start()
+
+        # The folder is scanned in the background so the window can paint right away;
+        # unsaved edits from a crashed session are offered once the list is filled.
+        self.file_operations.load_dataset_async(self.recursive_checkbox.isChecked(), on_loaded=self.recover_unsaved_edits)
 
     def connect_signals(self):
         self.file_list.currentItemChanged.connect(self.on_file_selected)
         self.file_list.list_widget.itemClicked.connect(self.on_file_clicked)
         self.text_editor_panel.text_modified.connect(self.on_text_modified)
+        self.text_editor_panel.text_edited.connect(self.on_text_edited)
         self.recursive_checkbox.toggled.connect(self.update_status)
         self.file_list.list_widget.viewport().installEventFilter(self)
         self.filename_edit.returnPressed.connect(lambda: self.file_operations.commit_rename(self.filename_edit.text()))
@@ -68,31 +89,40 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.find_replace_button.clicked.connect(self.dialog_manager.open_find_dialog)
         self.prefix_suffix_button.clicked.connect(self.dialog_manager.open_prefix_suffix_dialog)
         self.clear_whitespace_button.clicked.connect(self.dialog_manager.open_clear_whitespace_dialog)
+        self.undo_bulk_button.clicked.connect(self.undo_bulk_edit)
+        self.checkpoints_button.clicked.connect(self.dialog_manager.open_checkpoint_dialog)
+        self.redo_bulk_button.clicked.connect(lambda: self.undo_bulk_edit(redo=True))
+        self.config.subscribe(self.on_settings_changed)
 
     def on_file_clicked(self, item):
         # This ensures that re-selecting the same item still triggers the focus behavior
         self.on_file_selected(item, None)
 
+    @tracing.traced('on_file_selected', 'navigation')
     def on_file_selected(self, current_item, previous_item):
+        self.text_editor_panel.flush_pending_edits()
         if self.filename_stack.currentWidget() == self.filename_edit:
             self.cancel_rename()
         if previous_item is not None and self.auto_save_checkbox.isChecked():
-            self.file_operations.save_item_changes(previous_item.data(Qt.ItemDataRole.UserRole))
+            with tracing.span('auto_save', 'save'):
+                self.file_operations.save_item_changes(previous_item.data(Qt.ItemDataRole.UserRole))
 
         if current_item is None:
+            self.memory_budget.protect([])
             self.media_viewer.clear_media()
             self.text_editor_panel.load_text_files([], self.app_state.current_font_size, self.app_state.text_cache)
             self.filename_label.setText("")
             return
 
         media_path = current_item.data(Qt.ItemDataRole.UserRole)
-        text_paths = self.app_state.dataset.get(media_path, [])
+        text_paths = self.app_state.text_paths_for(media_path)
 
         if not text_paths:
             basename, _ = os.path.splitext(media_path)
             new_txt_path = basename + ".txt"
             text_paths = [new_txt_path]
         
+        self.memory_budget.protect([media_path, *text_paths])
         self.media_viewer.set_media(media_path)
         self.text_editor_panel.load_text_files(text_paths, self.app_state.current_font_size, self.app_state.text_cache)
 
@@ -103,21 +133,149 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if text_paths:
             self.text_editor_panel.focus_and_move_cursor_to_end(text_paths[0])
 
-        if hasattr(self, 'find_dialog') and self.dialog_manager.find_dialog and self.dialog_manager.find_dialog.isVisible():
-            self.dialog_manager.find_dialog.sync_to_media_item(media_path)
+        if self.dialog_manager.find_dialog and self.dialog_manager.find_dialog.isVisible():
+            with tracing.span('find_sync', 'search'):
+                self.dialog_manager.find_dialog.sync_to_media_item(media_path)
         
         if self.app_state.detached_viewer:
             self.app_state.detached_viewer.set_media(media_path)
         self.update_status()
         self.file_loaded.emit()
 
-    def on_text_modified(self, text_path, new_content):
-        self.app_state.text_cache[text_path] = new_content
+    def on_text_edited(self, text_path):
+        # Keystrokes only flip the dirty marker; the text itself is copied out of the
+        # editor by TextEditorPanel.flush_pending_edits when something needs it.
         if text_path not in self.app_state.dirty_files:
-            self.app_state.dirty_files.add(text_path)
-            media_path = self.file_list.get_media_path_from_text_path(text_path)
-            if media_path:
-                self.file_list.set_item_dirty(media_path, True)
+            self.app_state.track_text_path(text_path)
+            newly_dirty = self.app_state.dirty_files.add(text_path, self.app_state.media_for_text(text_path))
+            self.file_list.set_items_dirty(newly_dirty, True)
+
+    def on_text_modified(self, text_path, new_content):
+        _changed, newly_dirty, newly_clean = self.app_state.apply_text_changes(((text_path, new_content),))
+        self.file_list.set_items_dirty(newly_dirty, True)
+        self.file_list.set_items_dirty(newly_clean, False)
+        media_paths = self.app_state.media_for_text(text_path)
+        self.search_engine.update_text(text_path, new_content, media_paths[0] if media_paths else None)
+
+    def apply_text_changes(self, changes):
+        """
+        Batch form of on_text_modified for bulk tools. Caches, dirty state and the
+        search index are updated once for all (text_path, new_content) pairs, open
+        editors are refreshed without re-emitting edits, and the file list repaints once.
+        Returns the list of changed paths.
+        """
+        changed, newly_dirty, newly_clean = self.app_state.apply_text_changes(changes)
+        if not changed:
+            return []
+        for text_path in list(self.text_editor_panel.text_editors):
+            if text_path in changed:
+                self.text_editor_panel.set_editor_text(text_path, changed[text_path])
+        self.file_list.set_items_dirty(newly_dirty, True)
+        self.file_list.set_items_dirty(newly_clean, False)
+        self.search_engine.update_texts(changed.items())
+        return list(changed)
+
+    def sync_edit_journal(self):
+        """Writes unsaved edits made since the last call to the crash-recovery journal."""
+        if not self.app_state.dirty_files and not self.edit_journal:
+            return
+        self.text_editor_panel.flush_pending_edits()
+        self.edit_journal.sync(self.app_state.dirty_files, self.app_state.text_cache)
+
+    def open_edit_journal(self):
+        """Switches the journal to the current folder, e.g. after loading a new one."""
+        self.sync_edit_journal()
+        self.edit_journal.close()
+        self.edit_journal = EditJournal(self.app_state.folder_path)
+        self.recover_unsaved_edits()
+
+    def recover_unsaved_edits(self):
+        recovered = self.edit_journal.replay()
+        changes = {text_path: content for text_path, content in recovered.items()
+                   if content != self.get_text_content(text_path)}
+        if not changes:
+            self.edit_journal.discard()
+            return
+        reply = QMessageBox.question(self, 'Recover Unsaved Changes',
+                                     f"The previous session ended with unsaved changes in {len(changes)} file(s).\n\n"
+                                     "Restore them? They will be marked as unsaved so you can review them first.",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.Yes)
+        if reply != QMessageBox.StandardButton.Yes:
+            self.edit_journal.discard()
+            return
+        self.edit_journal.adopt(changes)
+        self.apply_text_changes(changes.items())
+        self.statusBar().showMessage(f"Recovered unsaved changes in {len(changes)} file(s).", 5000)
+
+    def undo_bulk_edit(self, redo=False):
+        from .tools.bulk_transform import run_bulk_undo
+        outcome = run_bulk_undo(self, self, redo=redo)
+        if outcome is None:
+            return
+        action = "Redid" if redo else "Undid"
+        message = f"{action} bulk edit in {outcome.files_changed} file(s)."
+        if outcome.conflicts:
+            message += f" {len(outcome.conflicts)} file(s) were changed since and left alone."
+        if outcome.cancelled:
+            message = "Cancelled. " + message
+        self.statusBar().showMessage(message, 5000)
+
+    def update_bulk_history_buttons(self):
+        history = self.app_state.bulk_history
+        next_undo = history.next_undo()
+        next_redo = history.next_redo()
+        self.undo_bulk_button.setEnabled(next_undo is not None)
+        self.redo_bulk_button.setEnabled(next_redo is not None)
+        self.undo_bulk_button.setToolTip(f"Undo: {next_undo.description} ({next_undo.file_count} file(s))" if next_undo
+                                         else "Undo the last Replace All, prefix/suffix or whitespace edit.")
+        self.redo_bulk_button.setToolTip(f"Redo: {next_redo.description} ({next_redo.file_count} file(s))" if next_redo
+                                         else "Redo the last undone bulk edit.")
+
+    def get_text_content(self, text_path):
+        """Returns the current text of a file: open editor, then cache, then disk."""
+        editor = self.text_editor_panel.text_editors.get(text_path)
+        if editor:
+            return editor.toPlainText()
+        if text_path in self.app_state.text_cache:
+            return self.app_state.text_cache[text_path]
+        try:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception:
+            return None
+
+    def register_caches(self):
+        """Puts the caches under the shared memory budget, see core/memory_budget.py."""
+        budget = self.memory_budget
+        budget.register('search_results', memory_budget.PRIORITY_SEARCH_RESULTS,
+                        self.search_engine.result_cache_memory, self.search_engine.evict_results)
+        budget.register('text_cache', memory_budget.PRIORITY_TEXT_CACHE,
+                        lambda: self.app_state.text_cache.bytes, self.app_state.evict_texts)
+        budget.register('thumbnails', memory_budget.PRIORITY_THUMBNAILS,
+                        lambda: self.file_list.thumbnail_total, self.file_list.evict_thumbnails)
+        budget.register('search_index', memory_budget.PRIORITY_SEARCH_INDEX,
+                        self.search_engine.index_memory, self._evict_search_index)
+        budget.register('decoded_images', memory_budget.PRIORITY_CURRENT_ITEM,
+                        lambda: sum(viewer.decoded_bytes() for viewer in (self.media_viewer, self.app_state.detached_viewer) if viewer))
+
+    def _evict_search_index(self, bytes_needed, protected):
+        # The open find dialog patches its results through the index; keep it while in use.
+        find_dialog = self.dialog_manager.find_dialog
+        if find_dialog is not None and find_dialog.isVisible():
+            return 0
+        return self.search_engine.drop_index()
+
+    def memory_report(self):
+        """Estimated memory per subsystem, see core/memory_usage.py."""
+        report = memory_usage.index_usage(self.app_state.index)
+        report.update(memory_usage.caption_store_usage(self.app_state))
+        report.update(memory_usage.search_index_usage(self.search_engine.index, self.search_engine.text_to_media,
+                                                      self.search_engine.result_cache))
+        report.update(self.file_list.memory_usage())
+        viewers = [viewer for viewer in (self.media_viewer, self.app_state.detached_viewer) if viewer]
+        report['decoded_images'] = {'bytes': sum(viewer.decoded_bytes() for viewer in viewers), 'items': len(viewers)}
+        return report
 
     def update_status(self):
         current = self.file_list.currentRow()
@@ -134,9 +292,19 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.file_list.setFont(font)
         self.text_editor_panel.set_font_for_all(font)
 
+    def on_settings_changed(self, old_settings, new_settings):
+        if (old_settings.file_list_width, old_settings.text_editor_width) != (new_settings.file_list_width, new_settings.text_editor_width):
+            self.apply_layout_settings()
+        # Format changes re-filter the last scan; use Refresh to pick up new files on disk.
+        if old_settings.enabled_media_extensions != new_settings.enabled_media_extensions:
+            self.file_operations.apply_media_formats()
+        if old_settings.cache_budget_mb != new_settings.cache_budget_mb:
+            self.memory_budget.set_ceiling(new_settings.cache_budget_mb * memory_budget.MEGABYTE)
+            self.memory_budget.enforce()
+
     def apply_layout_settings(self):
-        file_list_width = int(self.config.get_setting('Program', 'file_list_width', fallback=250))
-        text_editor_width = int(self.config.get_setting('Program', 'text_editor_width', fallback=300))
+        file_list_width = self.config.settings.file_list_width
+        text_editor_width = self.config.settings.text_editor_width
         self.main_splitter.setSizes([file_list_width, self.width() - file_list_width - text_editor_width, text_editor_width])
         self.main_splitter.setStretchFactor(0, 0)
         self.main_splitter.setStretchFactor(1, 1)
@@ -155,13 +323,13 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             parent = source.parent()
             if isinstance(parent, QListWidget):
                 if parent.viewMode() == QListWidget.ViewMode.IconMode:
-                    current_thumb_size = int(self.config.get_setting('FileList', 'thumbnail_size', 80))
+                    current_thumb_size = self.config.settings.thumbnail_size
                     if event.angleDelta().y() > 0:
                         new_thumb_size = current_thumb_size + 10
                     else:
                         new_thumb_size = max(20, current_thumb_size - 10)
+                    # The file list follows the change through its settings subscription
                     self.config.set_setting('FileList', 'thumbnail_size', str(new_thumb_size))
-                    self.file_list.apply_view_settings()
                     return True
             elif isinstance(parent, QTextEdit):
                 if event.angleDelta().y() > 0:
@@ -192,7 +360,20 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     
 
+    def toggle_trace_overlay(self):
+        if self.trace_overlay is None:
+            from .widgets.trace_overlay import TraceOverlay
+            self.trace_overlay = TraceOverlay(self)
+        enabled = self.trace_overlay.toggle()
+        self.statusBar().showMessage("Timing overlay on: recording spans." if enabled else "Timing overlay off.", 2000)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.trace_overlay is not None and self.trace_overlay.isVisible():
+            self.trace_overlay.reposition()
+
     def closeEvent(self, event):
+        discarded = False
         if self.app_state.dirty_files:
             reply = QMessageBox.question(self, 'Unsaved Changes',
                                        "You have unsaved changes. Do you want to save them before exiting?",
@@ -200,16 +381,26 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                                        QMessageBox.StandardButton.Cancel)
 
             if reply == QMessageBox.StandardButton.Save:
-                self.file_operations.save_all_changes()
+                self.file_operations.save_all_changes_and_wait()
                 event.accept()
             elif reply == QMessageBox.StandardButton.Discard:
+                discarded = True
                 event.accept()
             else:
                 event.ignore()
                 return
-        
+
+        self.journal_timer.stop()
+        if discarded:
+            self.edit_journal.discard()
+        else:
+            self.sync_edit_journal()
+        self.edit_journal.close()
         if self.app_state.detached_viewer:
             self.app_state.detached_viewer.close()
+        self.file_operations.dataset_loader.shutdown()
+        self.file_operations.save_engine.shutdown()
+        self.search_engine.persist()
         self.settings_manager.save_settings()
         super().closeEvent(event)
 
@@ -0,0 +1,184 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QProgressDialog
+from PyQt6.QtCore import Qt
+import logging
+import threading
+
+from ..core.transforms import run_transforms
+from ..core.bulk_history import replay_bulk_edit
+
+logger = logging.getLogger(__name__)
+
+MAX_PREVIEW_FILES = 200
+
+
+class BulkTransformOutcome:
+    def __init__(self):
+        self.memory_changes = {}
+        self.disk_changes = {}
+        self.files_changed = 0
+        self.total_changes = 0
+        self.diffs = []
+        self.errors = []
+        self.conflicts = []
+        self.cancelled = False
+
+
+def run_bulk_transform(parent, main_window, text_paths, transform, dry_run=False, title="Applying"):
+    """
+    Runs transform over text_paths with a cancellable progress dialog.
+
+    Captions that are open or have unsaved edits are changed in memory and become
+    dirty; all other files are rewritten on disk by the worker pool without going
+    through the text cache. Returns a BulkTransformOutcome; with dry_run nothing is
+    changed and the outcome carries per-file diffs instead, otherwise the edit is
+    recorded in the bulk undo history.
+    """
+    app_state = main_window.app_state
+    search_engine = main_window.search_engine
+    text_paths = list(dict.fromkeys(text_paths))
+    in_memory = _in_memory_contents(main_window, text_paths)
+    progress = _make_progress_dialog(parent, title, len(text_paths))
+
+    outcome = BulkTransformOutcome()
+    deltas = []
+    # Cancelling sets the event and keeps consuming, so files the workers already
+    # rewrote still get an undo delta and a fresh cache and index entry.
+    cancel_event = threading.Event()
+    # The index only needs the new text of files written on disk if it has been built.
+    results = run_transforms(text_paths, transform, in_memory, dry_run=dry_run, cancel_event=cancel_event,
+                             return_content=not dry_run and search_engine.index.is_built,
+                             record_deltas=not dry_run)
+    try:
+        for done, result in enumerate(results, 1):
+            if result.error is not None:
+                logger.error(f"Error processing file {result.text_path}: {result.error}")
+                outcome.errors.append(result.text_path)
+            elif result.count:
+                outcome.files_changed += 1
+                outcome.total_changes += result.count
+                if dry_run:
+                    if len(outcome.diffs) < MAX_PREVIEW_FILES:
+                        outcome.diffs.append(result.diff)
+                    continue
+                deltas.append((result.text_path, result.delta))
+                if result.text_path in in_memory:
+                    outcome.memory_changes[result.text_path] = result.new_content
+                else:
+                    # Written on disk: a clean cached copy is now stale.
+                    app_state.text_cache.pop(result.text_path, None)
+                    if result.new_content is not None:
+                        outcome.disk_changes[result.text_path] = result.new_content
+            if done % 50 == 0 or done == len(text_paths):
+                progress.setValue(done)
+            if progress.wasCanceled():
+                cancel_event.set()
+    finally:
+        results.close()
+    outcome.cancelled = cancel_event.is_set()
+    progress.close()
+
+    if not dry_run:
+        app_state.bulk_history.record(transform.describe(), deltas)
+        _apply_outcome(main_window, outcome)
+    return outcome
+
+
+def run_bulk_undo(parent, main_window, redo=False):
+    """Undoes the last bulk edit (or redoes the last undone one). Returns the outcome or None."""
+    history = main_window.app_state.bulk_history
+    edit = history.next_redo() if redo else history.next_undo()
+    if edit is None:
+        return None
+    title = "Redo" if redo else "Undo"
+    app_state = main_window.app_state
+    in_memory = _in_memory_contents(main_window)
+    progress = _make_progress_dialog(parent, f"{title}: {edit.description}", edit.file_count)
+
+    outcome = BulkTransformOutcome()
+    cancel_event = threading.Event()
+    results = replay_bulk_edit(edit, undo=not redo, in_memory=in_memory, cancel_event=cancel_event,
+                               return_content=main_window.search_engine.index.is_built)
+    try:
+        for done, result in enumerate(results, 1):
+            if result.error is not None:
+                outcome.conflicts.append(result.text_path)
+            elif result.changed:
+                outcome.files_changed += 1
+                if result.text_path in in_memory:
+                    outcome.memory_changes[result.text_path] = result.new_content
+                else:
+                    app_state.text_cache.pop(result.text_path, None)
+                    if result.new_content is not None:
+                        outcome.disk_changes[result.text_path] = result.new_content
+            if done % 50 == 0 or done == edit.file_count:
+                progress.setValue(done)
+            if progress.wasCanceled():
+                cancel_event.set()
+    finally:
+        results.close()
+    outcome.cancelled = cancel_event.is_set()
+    progress.close()
+
+    # A cancelled replay stays on its stack; running it again skips files already done.
+    if not outcome.cancelled:
+        if redo:
+            history.mark_redone(edit)
+        else:
+            history.mark_undone(edit)
+    _apply_outcome(main_window, outcome)
+    return outcome
+
+
+def _in_memory_contents(main_window, text_paths=None):
+    # Open and edited captions are changed in memory; everything else on disk.
+    text_editor_panel = main_window.text_editor_panel
+    dirty_files = main_window.app_state.dirty_files
+    text_editor_panel.flush_pending_edits()
+    if text_paths is None:
+        text_paths = list(text_editor_panel.text_editors) + list(dirty_files)
+    return {path: main_window.get_text_content(path) for path in text_paths
+            if path in text_editor_panel.text_editors or path in dirty_files}
+
+
+def _make_progress_dialog(parent, title, total):
+    progress = QProgressDialog(f"{title}...", "Cancel", 0, total, parent)
+    progress.setWindowTitle(title)
+    progress.setWindowModality(Qt.WindowModality.WindowModal)
+    progress.setMinimumDuration(300)
+    return progress
+
+
+def _apply_outcome(main_window, outcome):
+    main_window.apply_text_changes(outcome.memory_changes.items())
+    if outcome.disk_changes:
+        main_window.search_engine.update_texts(outcome.disk_changes.items())
+    main_window.update_bulk_history_buttons()
+
+
+def show_transform_preview(parent, transform, outcome):
+    """Shows the dry-run result of a transform: counts and the first per-file diffs."""
+    dialog = QDialog(parent)
+    dialog.setWindowTitle("Preview Changes")
+    dialog.resize(700, 500)
+    layout = QVBoxLayout(dialog)
+
+    summary = f"{transform.describe()}\n{outcome.total_changes} change(s) in {outcome.files_changed} file(s)."
+    if outcome.errors:
+        summary += f" {len(outcome.errors)} file(s) could not be read."
+    if outcome.files_changed > len(outcome.diffs):
+        summary += f" Showing the first {len(outcome.diffs)}."
+    layout.addWidget(QLabel(summary))
+
+    diff_view = QPlainTextEdit()
+    diff_view.setReadOnly(True)
+    diff_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+    diff_view.setPlainText("\n\n".join(outcome.diffs) if outcome.diffs else "No files would change.")
+    layout.addWidget(diff_view)
+
+    button_layout = QHBoxLayout()
+    button_layout.addStretch()
+    close_button = QPushButton("Close")
+    close_button.clicked.connect(dialog.accept)
+    button_layout.addWidget(close_button)
+    layout.addLayout(button_layout)
+    dialog.exec()
@@ -0,0 +1,178 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton, QLabel,
+                             QPlainTextEdit, QInputDialog, QMessageBox, QProgressDialog, QApplication)
+from PyQt6.QtCore import Qt
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
+import logging
+
+from ..core.checkpoints import CheckpointStore
+
+logger = logging.getLogger(__name__)
+
+MAX_LISTED_CHANGES = 500
+
+
+class CheckpointDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Checkpoints")
+        self.resize(650, 500)
+        self.main_window = parent
+        self.store = CheckpointStore(self.main_window.app_state.folder_path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
+
+        main_layout = QVBoxLayout(self)
+        main_layout.addWidget(QLabel("Checkpoints store the saved captions of this folder. Unsaved edits are not included."))
+
+        self.checkpoint_list = QListWidget()
+        main_layout.addWidget(self.checkpoint_list)
+
+        self.details_view = QPlainTextEdit()
+        self.details_view.setReadOnly(True)
+        self.details_view.setPlaceholderText("Select a checkpoint and click Compare to see what changed since.")
+        main_layout.addWidget(self.details_view)
+
+        button_layout = QHBoxLayout()
+        self.create_button = QPushButton("Create")
+        self.compare_button = QPushButton("Compare")
+        self.restore_button = QPushButton("Restore")
+        self.delete_button = QPushButton("Delete")
+        self.close_button = QPushButton("Close")
+        for button in (self.create_button, self.compare_button, self.restore_button, self.delete_button):
+            button_layout.addWidget(button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_button)
+        main_layout.addLayout(button_layout)
+
+        self.create_button.clicked.connect(self.create_checkpoint)
+        self.compare_button.clicked.connect(self.compare_checkpoint)
+        self.restore_button.clicked.connect(self.restore_checkpoint)
+        self.delete_button.clicked.connect(self.delete_checkpoint)
+        self.close_button.clicked.connect(self.accept)
+        self.checkpoint_list.currentItemChanged.connect(self._update_buttons)
+
+        self.refresh_list()
+
+    def done(self, result):
+        self._executor.shutdown(wait=True)
+        super().done(result)
+
+    def refresh_list(self):
+        self.checkpoint_list.clear()
+        for summary in self.store.list_checkpoints():
+            item = QListWidgetItem(f"{summary['name']}  ({summary['created']}, {summary['file_count']} file(s))")
+            item.setData(Qt.ItemDataRole.UserRole, summary['id'])
+            self.checkpoint_list.addItem(item)
+        self._update_buttons()
+
+    def _update_buttons(self, *_args):
+        has_selection = self.checkpoint_list.currentItem() is not None
+        self.compare_button.setEnabled(has_selection)
+        self.restore_button.setEnabled(has_selection)
+        self.delete_button.setEnabled(has_selection)
+
+    def _selected_id(self):
+        item = self.checkpoint_list.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def _text_paths(self):
+        return [text_path for text_paths in self.main_window.app_state.dataset.values() for text_path in text_paths]
+
+    def _run_in_background(self, label, function, *args):
+        """Runs function off the GUI thread behind a busy dialog and returns its result."""
+        progress = QProgressDialog(label, None, 0, 0, self)
+        progress.setWindowTitle("Checkpoints")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        future = self._executor.submit(function, *args)
+        while not future.done():
+            QApplication.processEvents()
+            wait([future], timeout=0.05)
+        progress.close()
+        return future.result()
+
+    def create_checkpoint(self):
+        name, ok = QInputDialog.getText(self, "Create Checkpoint", "Checkpoint name (optional):")
+        if not ok:
+            return
+        if self.main_window.app_state.dirty_files:
+            QMessageBox.information(self, "Unsaved Changes", "Unsaved edits are not part of the checkpoint. Save them first to include them.")
+        try:
+            summary = self._run_in_background("Creating checkpoint...", self.store.create, name.strip(), self._text_paths())
+        except Exception as e:
+            logger.error(f"Could not create checkpoint: {e}")
+            QMessageBox.critical(self, "Error", f"Could not create checkpoint: {e}")
+            return
+        self.refresh_list()
+        self.main_window.statusBar().showMessage(f"Created checkpoint '{summary['name']}' with {summary['file_count']} file(s).", 3000)
+
+    def _diff_selected(self):
+        checkpoint_id = self._selected_id()
+        if not checkpoint_id:
+            return None
+        try:
+            return self._run_in_background("Comparing with checkpoint...", self.store.diff, checkpoint_id, self._text_paths())
+        except Exception as e:
+            logger.error(f"Could not compare checkpoint: {e}")
+            QMessageBox.critical(self, "Error", f"Could not compare with checkpoint: {e}")
+            return None
+
+    def compare_checkpoint(self):
+        diff = self._diff_selected()
+        if diff is None:
+            return
+        folder = self.main_window.app_state.folder_path
+        lines = [f"{len(diff.modified)} modified, {len(diff.added)} added, {len(diff.removed)} removed, {diff.unchanged} unchanged."]
+        for title, paths in (("Modified", diff.modified), ("Added", diff.added), ("Removed", diff.removed)):
+            if paths:
+                lines.append("")
+                lines.append(f"{title}:")
+                lines.extend(f"  {os.path.relpath(path, folder)}" for path in paths[:MAX_LISTED_CHANGES])
+                if len(paths) > MAX_LISTED_CHANGES:
+                    lines.append(f"  ... and {len(paths) - MAX_LISTED_CHANGES} more")
+        if diff.errors:
+            lines.append("")
+            lines.append(f"{len(diff.errors)} file(s) could not be read.")
+        self.details_view.setPlainText("\n".join(lines))
+
+    def restore_checkpoint(self):
+        file_operations = self.main_window.file_operations
+        if not file_operations.resolve_unsaved_changes("Save your unsaved changes before restoring the checkpoint?"):
+            return
+        diff = self._diff_selected()
+        if diff is None:
+            return
+        changed_paths = diff.changed_paths()
+        if not changed_paths:
+            QMessageBox.information(self, "Nothing to Restore", "All captions already match this checkpoint.")
+            return
+        reply = QMessageBox.question(self, 'Restore Checkpoint',
+                                     f"Restore {len(changed_paths)} caption(s) to the selected checkpoint?\n\n"
+                                     f"Captions added since the checkpoint ({len(diff.added)}) are kept as they are.",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            contents = self._run_in_background("Reading checkpoint...", lambda: dict(self.store.read_contents(self._selected_id(), changed_paths)))
+        except Exception as e:
+            logger.error(f"Could not read checkpoint: {e}")
+            QMessageBox.critical(self, "Error", f"Could not read checkpoint: {e}")
+            return
+        file_operations.restore_texts(contents, rescan=bool(diff.removed))
+        self.details_view.setPlainText(f"Restored {len(contents)} caption(s).")
+
+    def delete_checkpoint(self):
+        checkpoint_id = self._selected_id()
+        if not checkpoint_id:
+            return
+        reply = QMessageBox.question(self, 'Delete Checkpoint', "Delete the selected checkpoint?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            self._run_in_background("Deleting checkpoint...", self.store.delete, checkpoint_id)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not delete checkpoint: {e}")
+        self.refresh_list()
@@ -6,9 +6,17 @@ import logging
 import re
 
 from ..ui.find_replace_dialog_ui import Ui_FindReplaceDialog
+from ..core.search_results import SearchResults
+from ..core.search_index import compile_search_pattern
+from ..core.transforms import RegexReplace
+from ..widgets.search_results_view import SearchResultsModel
+from .bulk_transform import run_bulk_transform
 
 logger = logging.getLogger(__name__)
 
+# Larger datasets are searched once typing pauses instead of on every keystroke.
+INSTANT_SEARCH_MAX_ITEMS = 5000
+
 class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -17,7 +25,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         self.main_window = parent
         self.text_editor_panel = self.main_window.text_editor_panel
 
-        self.global_search_results = []
+        self.global_search_results = SearchResults()
         self.current_result_index = -1
         self.search_direction = 0
         self.search_pending = False
@@ -27,16 +35,20 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         self.search_update_timer.setSingleShot(True)
         self.search_update_timer.setInterval(200)
 
-        self.find_input.textChanged.connect(self.update_find_count)
-        self.case_sensitive_checkbox.stateChanged.connect(self.update_highlights_for_all_editors)
-        self.whole_words_checkbox.stateChanged.connect(self.update_highlights_for_all_editors)
+        self.results_model = SearchResultsModel(self.main_window.get_text_content, self)
+        self.results_view.setModel(self.results_model)
+        self.results_view.clicked.connect(self._on_result_activated)
+        self.results_view.activated.connect(self._on_result_activated)
+
+        self.find_input.textChanged.connect(self._on_find_text_changed)
+        self.case_sensitive_checkbox.stateChanged.connect(self._perform_search_update)
+        self.whole_words_checkbox.stateChanged.connect(self._perform_search_update)
         self.find_next_button.clicked.connect(self.find_next)
         self.find_prev_button.clicked.connect(self.find_previous)
         self.replace_button.clicked.connect(self.replace_one)
         self.replace_and_next_button.clicked.connect(self.replace_and_find_next)
         self.replace_all_button.clicked.connect(self.replace_all)
         self.main_window.file_loaded.connect(self.resume_search)
-        self.text_editor_panel.text_modified.connect(self.on_external_text_change)
         self.search_update_timer.timeout.connect(self._perform_search_update)
 
     def showEvent(self, event):
@@ -48,6 +60,12 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             except TypeError:
                 pass
             editor.selectionChanged.connect(self._update_replace_button_state)
+        # closeEvent disconnects this; reconnect once, however often the dialog is shown.
+        try:
+            self.text_editor_panel.text_edited.disconnect(self.on_external_text_change)
+        except TypeError:
+            pass
+        self.text_editor_panel.text_edited.connect(self.on_external_text_change)
 
     def closeEvent(self, event):
         self.text_editor_panel.clear_highlights()
@@ -58,7 +76,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
                 pass
             editor.selectionChanged.connect(self.text_editor_panel._on_selection_changed)
         try:
-            self.text_editor_panel.text_modified.disconnect(self.on_external_text_change)
+            self.text_editor_panel.text_edited.disconnect(self.on_external_text_change)
         except TypeError:
             pass
         super().closeEvent(event)
@@ -72,12 +90,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             return
 
         # Find the index of the first result that belongs to the new media item
-        new_index = -1
-        for i, result in enumerate(self.global_search_results):
-            res_media_path, _text_path, _pos, _len = result
-            if res_media_path == media_path:
-                new_index = i
-                break  # Stop at the first match on the new item
+        new_index = self.global_search_results.first_index_for_media(media_path)
 
         if new_index != -1:
             # A match exists on the newly selected item. Jump to it.
@@ -86,6 +99,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         else:
             # No match on the new item. Clear highlights and disable buttons.
             self.current_result_index = -1
+            self.results_view.select_row(-1)
             self.text_editor_panel.clear_highlights()
             self.replace_button.setEnabled(False)
             self.replace_and_next_button.setEnabled(False)
@@ -117,8 +131,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         find_text = self.find_input.text()
         case_sensitive = self.case_sensitive_checkbox.isChecked()
         whole_words = self.whole_words_checkbox.isChecked()
-        for editor in self.text_editor_panel.get_all_editors():
-            self.text_editor_panel.highlight_occurrences(editor, find_text, -1, case_sensitive, whole_words)
+        self.text_editor_panel.highlight_all(find_text, case_sensitive, whole_words)
 
     def update_find_count(self, text):
         self.current_result_index = -1
@@ -128,7 +141,8 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         self.update_highlights_for_all_editors()
 
         if not text:
-            self.global_search_results = []
+            self.global_search_results = SearchResults()
+            self.results_model.set_results(self.global_search_results)
             self.main_window.file_list.set_find_results(set())
             self.status_label.setText("Enter text to find.")
             self.replace_button.setEnabled(False)
@@ -143,11 +157,11 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             current_media_item = self.main_window.file_list.currentItem()
             if current_media_item:
                 current_media_path = current_media_item.data(Qt.ItemDataRole.UserRole)
-                for i, result in enumerate(self.global_search_results):
-                    if result[0] == current_media_path:
-                        self.current_result_index = i
-                        self._jump_to_result(i)
-                        return # We're done, _jump_to_result will update the status
+                i = self.global_search_results.first_index_for_media(current_media_path)
+                if i != -1:
+                    self.current_result_index = i
+                    self._jump_to_result(i)
+                    return # We're done, _jump_to_result will update the status
 
         # If no result on current item, or no item selected, just show total.
         self.status_label.setText(f"Found {total_found} occurrence(s)." if total_found > 0 else "No occurrences found.")
@@ -155,49 +169,25 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
 
 
     def _build_global_search_index(self, find_text):
-        self.global_search_results = []
+        self.global_search_results = SearchResults()
         if not find_text: 
+            self.results_model.set_results(self.global_search_results)
             self.main_window.file_list.set_find_results(set())
             return
 
-        find_flags = QTextDocument.FindFlag(0)
-        if self.case_sensitive_checkbox.isChecked():
-            find_flags |= QTextDocument.FindFlag.FindCaseSensitively
-        if self.whole_words_checkbox.isChecked():
-            find_flags |= QTextDocument.FindFlag.FindWholeWords
+        # Edits still sitting in the editors have to reach the index before it is queried.
+        self.text_editor_panel.flush_pending_edits()
+        if not self.main_window.search_engine.index.is_built:
+            self.status_label.setText("Indexing text files...")
+            self.status_label.repaint()
 
-        for media_path, text_paths in self.main_window.app_state.dataset.items():
-            for text_path in text_paths:
-                editor = self.text_editor_panel.text_editors.get(text_path)
-                if editor:
-                    content = editor.toPlainText()
-                elif text_path in self.main_window.app_state.text_cache:
-                    content = self.main_window.app_state.text_cache[text_path]
-                else:
-                    content = self._read_file_content(text_path)
-                if content is None: continue
-                
-                doc = QTextDocument()
-                doc.setPlainText(content)
-                cursor = QTextCursor(doc)
-                while True:
-                    cursor = doc.find(find_text, cursor, find_flags)
-                    if cursor.isNull():
-                        break
-                    self.global_search_results.append((media_path, text_path, cursor.selectionStart(), cursor.selectionEnd() - cursor.selectionStart()))
-        
-        self.global_search_results.sort(key=lambda x: (x[0], x[1], x[2]))
+        self.global_search_results = self.main_window.search_engine.search(
+            find_text,
+            self.case_sensitive_checkbox.isChecked(),
+            self.whole_words_checkbox.isChecked())
         
-        found_media_files = {result[0] for result in self.global_search_results}
-        self.main_window.file_list.set_find_results(found_media_files)
-
-    def _read_file_content(self, path):
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            logger.warning(f"Could not read file {path}: {e}")
-            return None
+        self.results_model.set_results(self.global_search_results)
+        self.main_window.file_list.set_find_results(self.global_search_results.media_paths())
 
     def _find_operation(self, find_backwards):
         if not self.global_search_results:
@@ -213,21 +203,14 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
                 return
             current_media_path = current_media_item.data(Qt.ItemDataRole.UserRole)
 
-            next_index = -1
             if find_backwards:
                 # Find the last result that is chronologically BEFORE the current media path.
-                for i in range(len(self.global_search_results) - 1, -1, -1):
-                    if self.global_search_results[i][0] < current_media_path:
-                        next_index = i
-                        break
+                next_index = self.global_search_results.index_before_media(current_media_path)
                 if next_index == -1: # Wrap around
                     next_index = len(self.global_search_results) - 1
             else:  # Find forwards
                 # Find the first result that is on or after the current media path.
-                for i, result in enumerate(self.global_search_results):
-                    if result[0] >= current_media_path:
-                        next_index = i
-                        break
+                next_index = self.global_search_results.index_at_or_after_media(current_media_path)
                 if next_index == -1: # Wrap around
                     next_index = 0
             self.current_result_index = next_index
@@ -247,13 +230,12 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         current_media_item = self.main_window.file_list.currentItem()
         current_media_path = current_media_item.data(Qt.ItemDataRole.UserRole) if current_media_item else None
 
+        self.results_view.select_row(index)
         if current_media_path != media_path:
             self.search_pending = True
-            for i in range(self.main_window.file_list.count()):
-                item = self.main_window.file_list.list_widget.item(i)
-                if item and item.data(Qt.ItemDataRole.UserRole) == media_path:
-                    self.main_window.file_list.setCurrentRow(i)
-                    break
+            row = self.main_window.file_list.row_for_media(media_path)
+            if row != -1:
+                self.main_window.file_list.setCurrentRow(row)
         else:
             self._highlight_result(text_path, position, length)
         
@@ -266,10 +248,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             find_text = self.find_input.text()
             case_sensitive = self.case_sensitive_checkbox.isChecked()
             whole_words = self.whole_words_checkbox.isChecked()
-            
-            for ed in self.text_editor_panel.get_all_editors():
-                current_pos_in_editor = position if ed == editor else -1
-                self.text_editor_panel.highlight_occurrences(ed, find_text, current_pos_in_editor, case_sensitive, whole_words)
+            self.text_editor_panel.highlight_all(find_text, case_sensitive, whole_words, editor, position)
 
             cursor = editor.textCursor()
             cursor.setPosition(position)
@@ -294,10 +273,18 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         else:
             self.status_label.setText(f"Found {total_found} total. No match on current item.")
 
+    def _on_result_activated(self, index):
+        if not index.isValid():
+            return
+        self.current_result_index = index.row()
+        self._jump_to_result(self.current_result_index)
+
     def find_next(self):
+        self._flush_pending_search()
         self._find_operation(find_backwards=False)
 
     def find_previous(self):
+        self._flush_pending_search()
         self._find_operation(find_backwards=True)
 
     def _get_find_flags(self):
@@ -314,14 +301,28 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             self.update_highlights_for_all_editors()
             self._jump_to_result(self.current_result_index)
 
-    def on_external_text_change(self, file_path, new_content):
+    def on_external_text_change(self, file_path):
         if self.isVisible() and self.find_input.text():
             self.search_update_timer.start()
 
     def _perform_search_update(self):
         self.update_find_count(self.find_input.text())
 
+    def _flush_pending_search(self):
+        """Runs a search still waiting for typing to pause, so actions don't use the previous query's hits."""
+        if self.search_update_timer.isActive():
+            self.search_update_timer.stop()
+            self._perform_search_update()
+
+    def _on_find_text_changed(self, text):
+        if text and len(self.main_window.app_state.dataset) > INSTANT_SEARCH_MAX_ITEMS:
+            self.search_update_timer.start()
+        else:
+            self.search_update_timer.stop()
+            self.update_find_count(text)
+
     def replace_one(self):
+        self._flush_pending_search()
         if self.current_result_index == -1:
             return
 
@@ -358,6 +359,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         self.update_find_count(find_text)
 
     def replace_and_find_next(self):
+        self._flush_pending_search()
         if self.current_result_index == -1:
             self.find_next()
             return
@@ -385,20 +387,7 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             return
 
         # Find the first result that is strictly after the one we just replaced.
-        next_index = -1
-        for i, result in enumerate(self.global_search_results):
-            media_path, text_path, position, _ = result
-            if media_path > old_media_path:
-                next_index = i
-                break
-            if media_path == old_media_path:
-                if text_path > old_text_path:
-                    next_index = i
-                    break
-                if text_path == old_text_path:
-                    if position > old_position:
-                        next_index = i
-                        break
+        next_index = self.global_search_results.index_after(old_media_path, old_text_path, old_position)
         
         # If no such item is found, wrap around to the beginning.
         if next_index == -1:
@@ -408,25 +397,18 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
         self._jump_to_result(self.current_result_index)
 
     def replace_all(self):
+        self._flush_pending_search()
         find_text = self.find_input.text()
         replace_text = self.replace_input.text()
         if not find_text or not self.global_search_results:
             return
 
-        # Group replacements by file path
-        replacements_by_file = {}
-        for media_path, text_path, position, length in self.global_search_results:
-            if text_path not in replacements_by_file:
-                replacements_by_file[text_path] = []
-            replacements_by_file[text_path].append((position, length))
-
-        total_replacements = 0
-        files_changed = 0
+        text_paths = sorted({text_path for _media_path, text_path, _pos, _len in self.global_search_results})
 
         confirm_message = (
             f"Are you sure you want to replace all {len(self.global_search_results)} occurrences of '{find_text}' "
-            f"with '{replace_text}' in {len(replacements_by_file)} file(s)?\n\n"
-            "This action is irreversible."
+            f"with '{replace_text}' in {len(text_paths)} file(s)?\n\n"
+            "Files that are not open or edited are changed directly on disk. Use Undo Bulk Edit to revert."
         )
         reply = QMessageBox.question(self, 'Confirm Replace All', confirm_message,
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -436,54 +418,18 @@ class FindReplaceDialog(QDialog, Ui_FindReplaceDialog):
             self.status_label.setText("Replace all cancelled.")
             return
 
-        for file_path, replacements in replacements_by_file.items():
-            try:
-                # Read from cache if available, otherwise from disk
-                if file_path in self.main_window.app_state.text_cache:
-                    content = self.main_window.app_state.text_cache[file_path]
-                else:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                # Apply replacements from the end to avoid shifting indices
-                replacements.sort(key=lambda x: x[0], reverse=True)
-                
-                count_in_file = 0
-                for pos, length in replacements:
-                    # Check if the text to be replaced still matches the find_text
-                    # This is a safeguard against replacing the wrong text if the file has changed
-                    if content[pos:pos+length].lower() == find_text.lower() or \
-                       (self.case_sensitive_checkbox.isChecked() and content[pos:pos+length] == find_text):
-                        content = content[:pos] + replace_text + content[pos+length:]
-                        count_in_file += 1
-
-                if count_in_file > 0:
-                    total_replacements += count_in_file
-                    files_changed += 1
-                    # Write back to disk
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    
-                    # Update editor if open
-                    editor = self.text_editor_panel.text_editors.get(file_path)
-                    if editor:
-                        editor.blockSignals(True)
-                        cursor_pos = editor.textCursor().position()
-                        editor.setPlainText(content)
-                        cursor = editor.textCursor()
-                        cursor.setPosition(cursor_pos)
-                        editor.setTextCursor(cursor)
-                        editor.blockSignals(False)
-
-                    # Update cache
-                    self.main_window.app_state.text_cache[file_path] = content
-
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {e}")
-                QMessageBox.warning(self, "Error", f"Could not process file: {file_path}\n{e}")
-
-        self.status_label.setText(f"Made {total_replacements} replacement(s) in {files_changed} file(s).")
+        pattern = compile_search_pattern(find_text, self.case_sensitive_checkbox.isChecked(), self.whole_words_checkbox.isChecked())
+        # Open and edited captions are replaced in memory and stay unsaved; everything else is rewritten on disk.
+        outcome = run_bulk_transform(self, self.main_window, text_paths, RegexReplace(pattern, replace_text), title="Replace All")
+
+        if outcome.errors:
+            QMessageBox.warning(self, "Error", f"Could not process {len(outcome.errors)} file(s), e.g.:\n" + "\n".join(outcome.errors[:10]))
+
+        status = f"Made {outcome.total_changes} replacement(s) in {outcome.files_changed} file(s)."
+        if outcome.cancelled:
+            status = "Cancelled. " + status
         self.update_find_count(self.find_input.text())
+        self.status_label.setText(status)
 
     def _get_files_from_scope(self):
         scope_index = self.scope_combo.currentIndex()
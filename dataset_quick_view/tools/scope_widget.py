@@ -40,6 +40,21 @@ class ScopeWidget(QWidget):
         self.extensions_label.setVisible(is_extensions_scope)
         self.extensions_input.setVisible(is_extensions_scope)
 
+    def get_target_paths(self):
+        """Like get_targets, but editors are resolved to the text file they show."""
+        editor_paths = {editor: path for path, editor in self.text_editor_panel.text_editors.items()}
+        paths = []
+        for target in self.get_targets():
+            if isinstance(target, QTextEdit):
+                path = editor_paths.get(target)
+                if not path:
+                    logger.warning(f"Could not find path for editor: {target}")
+                    continue
+                paths.append(path)
+            else:
+                paths.append(target)
+        return paths
+
     def get_targets(self):
         scope_index = self.scope_combo.currentIndex()
 
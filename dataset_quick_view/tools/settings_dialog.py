@@ -93,7 +93,27 @@ class SettingsDialog(QDialog):
         self.text_editor_width_spinbox.setValue(int(self.config.get_setting('Program', 'text_editor_width', fallback=300)))
         layout.addRow("Text Editor Width:", self.text_editor_width_spinbox)
 
+        self.persist_index_checkbox = QCheckBox("Keep the search index on disk between sessions")
+        self.persist_index_checkbox.setChecked(self.config.get_bool_setting('Search', 'persist_index', fallback=False))
+        layout.addRow(self.persist_index_checkbox)
+
+        self.cache_budget_spinbox = QSpinBox()
+        self.cache_budget_spinbox.setRange(64, 1048576)
+        self.cache_budget_spinbox.setSingleStep(256)
+        self.cache_budget_spinbox.setSuffix(" MB")
+        self.cache_budget_spinbox.setValue(self.config.settings.cache_budget_mb)
+        self.cache_budget_spinbox.setToolTip("Memory for thumbnails, cached captions and the search index. "
+                                             "The oldest entries are dropped beyond this; the current item never is.")
+        layout.addRow("Cache Memory Budget:", self.cache_budget_spinbox)
+
     def accept(self):
+        # One batch, so subscribers see a single change
+        with self.config.batch():
+            self._store_settings()
+        self.config.save_config()
+        super().accept()
+
+    def _store_settings(self):
         # File List settings
         self.config.set_setting('FileList', 'view_mode', self.view_mode_combo.currentText())
         self.config.set_setting('FileList', 'thumbnail_size', self.thumbnail_size_lineedit.text())
@@ -111,5 +131,8 @@ class SettingsDialog(QDialog):
         self.config.set_setting('Program', 'file_list_width', str(self.file_list_width_spinbox.value()))
         self.config.set_setting('Program', 'text_editor_width', str(self.text_editor_width_spinbox.value()))
 
-        self.config.save_config()
-        super().accept()
+        # Search settings
+        self.config.set_setting('Search', 'persist_index', str(self.persist_index_checkbox.isChecked()))
+
+        # Memory settings
+        self.config.set_setting('Memory', 'cache_budget_mb', str(self.cache_budget_spinbox.value()))
@@ -1,5 +1,7 @@
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QComboBox, QLabel, QCheckBox
 
+from ..widgets.search_results_view import SearchResultsView
+
 class Ui_FindReplaceDialog(object):
     def setupUi(self, FindReplaceDialog):
         FindReplaceDialog.setObjectName("FindReplaceDialog")
@@ -20,6 +22,7 @@ class Ui_FindReplaceDialog(object):
         self.whole_words_checkbox = QCheckBox("Whole words")
 
         self.status_label = QLabel("Enter text to find.")
+        self.results_view = SearchResultsView()
 
         self.find_prev_button = QPushButton("Find Previous")
         self.find_next_button = QPushButton("Find Next")
@@ -38,6 +41,7 @@ class Ui_FindReplaceDialog(object):
         self.form_layout.addWidget(self.case_sensitive_checkbox)
         self.form_layout.addWidget(self.whole_words_checkbox)
         self.form_layout.addWidget(self.status_label)
+        self.form_layout.addWidget(self.results_view)
 
         self.button_layout.addStretch()
         self.button_layout.addWidget(self.find_prev_button)
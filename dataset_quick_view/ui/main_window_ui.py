@@ -1,4 +1,4 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QToolBar, QCheckBox, QSizePolicy, QPushButton, QFrame, QLabel, QLineEdit, QStackedWidget, QStyle
+from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QToolBar, QCheckBox, QSizePolicy, QPushButton, QFrame, QLabel, QLineEdit, QStackedWidget, QStyle, QProgressBar
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt
 
@@ -171,6 +171,23 @@ class Ui_MainWindow(object):
         self.clear_whitespace_button.setToolTip("Remove all leading and trailing whitespace from the text files.")
         self.clear_whitespace_button.setStyleSheet("padding: 4px 8px;")
         self.text_toolbar.addWidget(self.clear_whitespace_button)
+
+        self.undo_bulk_button = QPushButton("Undo Bulk Edit")
+        self.undo_bulk_button.setToolTip("Undo the last Replace All, prefix/suffix or whitespace edit.")
+        self.undo_bulk_button.setStyleSheet("padding: 4px 8px;")
+        self.undo_bulk_button.setEnabled(False)
+        self.text_toolbar.addWidget(self.undo_bulk_button)
+
+        self.redo_bulk_button = QPushButton("Redo Bulk Edit")
+        self.redo_bulk_button.setToolTip("Redo the last undone bulk edit.")
+        self.redo_bulk_button.setStyleSheet("padding: 4px 8px;")
+        self.redo_bulk_button.setEnabled(False)
+        self.text_toolbar.addWidget(self.redo_bulk_button)
+
+        self.checkpoints_button = QPushButton("Checkpoints")
+        self.checkpoints_button.setToolTip("Snapshot, compare and restore all captions of this folder.")
+        self.checkpoints_button.setStyleSheet("padding: 4px 8px;")
+        self.text_toolbar.addWidget(self.checkpoints_button)
         
         self.text_panel_layout.addWidget(self.text_toolbar)
 
@@ -186,3 +203,10 @@ class Ui_MainWindow(object):
         self.main_splitter.addWidget(self.file_list)
         self.main_splitter.addWidget(self.media_viewer_container)
         self.main_splitter.addWidget(self.text_panel_container)
+
+        # Background save progress, only visible while a multi-file save is running
+        self.save_progress_bar = QProgressBar()
+        self.save_progress_bar.setMaximumWidth(200)
+        self.save_progress_bar.setFormat("Saving %v / %m")
+        self.save_progress_bar.hide()
+        MainWindow.statusBar().addPermanentWidget(self.save_progress_bar)
@@ -1,7 +1,11 @@
 import configparser
+import io
 import os
 import sys
 import logging
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
@@ -14,54 +18,159 @@ def get_app_base_path():
         # Running from source, place it in the project root
         return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+DEFAULTS = {
+    'General': {
+        'config_version': '1',
+        'remember_last_folder': 'false',
+        'last_folder_path': ''
+    },
+    'Editing': {
+        'auto_save': 'true'
+    },
+    'Display': {
+        'font_size': '10'
+    },
+    'MediaFormats': {
+        'supported': '.png,.jpg,.jpeg,.bmp,.webp,.gif,.mp4',
+        'png': 'true',
+        'jpg': 'true',
+        'jpeg': 'true',
+        'bmp': 'true',
+        'webp': 'true',
+        'gif': 'true',
+        'mp4': 'true'
+    },
+    'Video': {
+        'loop': 'true'
+    },
+    'Program': {
+        'file_list_width': '250',
+        'text_editor_width': '300'
+    },
+    'FileList': {
+        'view_mode': 'List',
+        'thumbnail_size': '80',
+        'grid_layout': 'false'
+    },
+    'Search': {
+        'persist_index': 'false'
+    },
+    'Memory': {
+        'cache_budget_mb': '1024'
+    }
+}
+
+# Writes to config.ini are delayed by this much and coalesced, so a burst of
+# Ctrl+wheel or splitter updates costs one write.
+SAVE_DELAY_SECONDS = 0.5
+
+_current_config = None
+_default_settings = None
+
+
+def _get_bool(parser, section, key, fallback):
+    try:
+        return parser.getboolean(section, key, fallback=fallback)
+    except ValueError:
+        return fallback
+
+
+def _get_int(parser, section, key, fallback):
+    try:
+        return int(parser.get(section, key, fallback=fallback))
+    except ValueError:
+        return fallback
+
+
+class Settings(namedtuple('Settings', [
+        'remember_last_folder', 'last_folder_path', 'recursive_search', 'auto_save', 'font_size',
+        'supported_formats', 'enabled_media_extensions', 'loop_video', 'file_list_width',
+        'text_editor_width', 'view_mode', 'thumbnail_size', 'grid_layout', 'persist_index',
+        'cache_budget_mb'])):
+    """
+    Immutable, typed snapshot of the configuration. Reading a field is a plain
+    attribute access, so hot paths use this instead of parsing config.ini values.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_parser(cls, parser):
+        supported_formats = tuple(fmt.strip() for fmt in parser.get('MediaFormats', 'supported', fallback=DEFAULTS['MediaFormats']['supported']).split(',') if fmt.strip())
+        return cls(
+            remember_last_folder=_get_bool(parser, 'General', 'remember_last_folder', False),
+            last_folder_path=parser.get('General', 'last_folder_path', fallback=''),
+            recursive_search=_get_bool(parser, 'General', 'recursive_search', False),
+            auto_save=_get_bool(parser, 'Editing', 'auto_save', True),
+            font_size=_get_int(parser, 'Display', 'font_size', 10),
+            supported_formats=supported_formats,
+            enabled_media_extensions=tuple(fmt for fmt in supported_formats
+                                           if _get_bool(parser, 'MediaFormats', fmt.replace('.', ''), True)),
+            loop_video=_get_bool(parser, 'Video', 'loop', True),
+            file_list_width=_get_int(parser, 'Program', 'file_list_width', 250),
+            text_editor_width=_get_int(parser, 'Program', 'text_editor_width', 300),
+            view_mode=parser.get('FileList', 'view_mode', fallback='List'),
+            thumbnail_size=_get_int(parser, 'FileList', 'thumbnail_size', 80),
+            grid_layout=_get_bool(parser, 'FileList', 'grid_layout', False),
+            persist_index=_get_bool(parser, 'Search', 'persist_index', False),
+            cache_budget_mb=_get_int(parser, 'Memory', 'cache_budget_mb', 1024),
+        )
+
+    @classmethod
+    def defaults(cls):
+        parser = configparser.ConfigParser()
+        parser.read_dict(DEFAULTS)
+        return cls.from_parser(parser)
+
+
+def current_settings():
+    """
+    The settings of the running application's ConfigManager, or the defaults when
+    there is none (e.g. in scripts). Never reads or writes config.ini.
+    """
+    global _default_settings
+    if _current_config is not None:
+        return _current_config.settings
+    if _default_settings is None:
+        _default_settings = Settings.defaults()
+    return _default_settings
+
+
+def load_settings(config_path=None):
+    """
+    Reads a config.ini (the application's by default) into Settings without creating,
+    migrating or writing it; missing values fall back to the defaults.
+    """
+    parser = configparser.ConfigParser()
+    parser.read_dict(DEFAULTS)
+    parser.read(config_path or os.path.join(get_app_base_path(), 'config.ini'), encoding='utf-8')
+    return Settings.from_parser(parser)
+
+
 class ConfigManager:
-    def __init__(self):
-        self.config_path = os.path.join(get_app_base_path(), 'config.ini')
+    def __init__(self, config_path=None):
+        self.config_path = config_path or os.path.join(get_app_base_path(), 'config.ini')
         self.config = configparser.ConfigParser()
-        self.defaults = {
-            'General': {
-                'config_version': '1',
-                'remember_last_folder': 'false',
-                'last_folder_path': ''
-            },
-            'Editing': {
-                'auto_save': 'true'
-            },
-            'Display': {
-                'font_size': '10'
-            },
-            'MediaFormats': {
-                'supported': '.png,.jpg,.jpeg,.bmp,.webp,.gif,.mp4',
-                'png': 'true',
-                'jpg': 'true',
-                'jpeg': 'true',
-                'bmp': 'true',
-                'webp': 'true',
-                'gif': 'true',
-                'mp4': 'true'
-            },
-            'Video': {
-                'loop': 'true'
-            },
-            'Program': {
-                'file_list_width': '250',
-                'text_editor_width': '300'
-            },
-            'FileList': {
-                'view_mode': 'List',
-                'thumbnail_size': '80',
-                'grid_layout': 'false'
-            }
-        }
+        self.defaults = DEFAULTS
+        self._lock = threading.RLock()
+        self._save_timer = None
+        self._subscribers = []
+        self._batch_depth = 0
+        self._settings = None
         self.load_or_create_config()
+        global _current_config
+        _current_config = self
 
     def load_or_create_config(self):
+        if self._save_timer is not None:
+            # Don't let the file on disk overwrite changes that are still waiting to be written.
+            self.save_config()
         if not os.path.exists(self.config_path):
             self.config.read_dict(self.defaults)
             self.save_config()
         else:
             self.config.read(self.config_path)
             self.check_and_update_config()
+        self._settings_changed()
 
     def check_and_update_config(self):
         updated = False
@@ -98,9 +207,78 @@ class ConfigManager:
         if updated:
             self.save_config()
 
+    @property
+    def settings(self):
+        """The current Settings snapshot."""
+        return self._settings
+
+    def subscribe(self, callback):
+        """Calls callback(old_settings, new_settings) after every change of the settings."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @contextmanager
+    def batch(self):
+        """Groups several set_setting calls into a single change notification."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._settings_changed()
+
+    def _settings_changed(self):
+        if self._batch_depth:
+            return
+        with self._lock:
+            old_settings = self._settings
+            new_settings = Settings.from_parser(self.config)
+            self._settings = new_settings
+        if old_settings is None or new_settings == old_settings:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(old_settings, new_settings)
+            except Exception as e:
+                logger.error(f"Error applying settings change in {callback}: {e}")
+
     def save_config(self):
-        with open(self.config_path, 'w') as configfile:
-            self.config.write(configfile)
+        """Writes config.ini now, replacing any pending delayed write."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._write_config()
+
+    def schedule_save(self):
+        """Writes config.ini from a background thread once changes have settled."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY_SECONDS, self._write_pending)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _write_pending(self):
+        with self._lock:
+            self._save_timer = None
+            self._write_config()
+
+    def _write_config(self):
+        buffer = io.StringIO()
+        with self._lock:
+            self.config.write(buffer)
+        tmp_path = self.config_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as configfile:
+                configfile.write(buffer.getvalue())
+            os.replace(tmp_path, self.config_path)
+        except OSError as e:
+            logger.error(f"Could not write {self.config_path}: {e}")
 
     def get_setting(self, section, key, fallback=None):
         return self.config.get(section, key, fallback=fallback or self.defaults.get(section, {}).get(key, None))
@@ -110,6 +288,12 @@ class ConfigManager:
         return value
 
     def set_setting(self, section, key, value):
-        if not self.config.has_section(section):
-            self.config.add_section(section)
-        self.config.set(section, key, str(value))
\ No newline at end of file
+        """Changes a setting in memory, notifies subscribers and schedules a delayed save."""
+        with self._lock:
+            if not self.config.has_section(section):
+                self.config.add_section(section)
+            if self.config.get(section, key, fallback=None) == str(value):
+                return
+            self.config.set(section, key, str(value))
+        self._settings_changed()
+        self.schedule_save()
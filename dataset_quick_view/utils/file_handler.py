@@ -1,18 +1,14 @@
 import os
+import shutil
+import tempfile
 from collections import defaultdict
-from .config_manager import ConfigManager
-
-def get_enabled_media_extensions():
-    config = ConfigManager()
-    supported_formats = config.get_setting('MediaFormats', 'supported', fallback='.png,.jpg,.jpeg,.bmp,.webp,.gif,.mp4')
-    enabled_extensions = []
-    for fmt in supported_formats.split(','):
-        fmt = fmt.strip()
-        if not fmt:
-            continue
-        if config.get_bool_setting('MediaFormats', fmt.replace('.', ''), fallback=True):
-            enabled_extensions.append(fmt)
-    return enabled_extensions
+from concurrent.futures import ThreadPoolExecutor
+from .config_manager import current_settings
+
+def get_enabled_media_extensions(settings=None):
+    """Enabled media extensions of the given settings snapshot, or of the running app's."""
+    settings = settings or current_settings()
+    return list(settings.enabled_media_extensions)
 
 def is_media_file(filename):
     """Checks if a file is a media file based on its extension."""
@@ -21,28 +17,84 @@ def is_media_file(filename):
 
 def find_dataset_files(folder_path, recursive=True):
     """Scans a folder to group media files with their associated text files."""
+    return group_dataset_files(scan_folder(folder_path, recursive))
+
+def _list_directory(directory):
+    """Returns (file paths, subdirectories to descend into) of one directory."""
+    files = []
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not followed.
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
+            except OSError:
+                pass
+            files.append(entry.path)
+    return files, subdirs
+
+def _walk_files(folder_path, max_workers=None):
+    """
+    Yields every file below folder_path. Each level of the tree is listed by a thread
+    pool, which overlaps the directory reads on network drives and large trees.
+    """
+    if max_workers == 1:
+        for root, _dirs, files in os.walk(folder_path):
+            for filename in files:
+                yield os.path.join(root, filename)
+        return
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scan') as pool:
+        level = [folder_path]
+        while level:
+            next_level = []
+            for files, subdirs in pool.map(_try_list_directory, level):
+                yield from files
+                next_level.extend(subdirs)
+            level = next_level
+
+def _try_list_directory(directory):
+    try:
+        return _list_directory(directory)
+    except OSError:
+        # os.walk skips unreadable directories as well.
+        return [], []
+
+def scan_folder(folder_path, recursive=True, max_workers=None):
+    """
+    Lists every file in a folder grouped by path without extension, media or not.
+    Keeping this around lets media format changes re-group without touching the disk.
+    """
     if not os.path.isdir(folder_path):
         return {}
 
     files_by_basename = defaultdict(list)
     
     if recursive:
-        for root, _dirs, files in os.walk(folder_path):
-            for filename in files:
-                basename, _ = os.path.splitext(filename)
-                full_path = os.path.join(root, filename)
-                files_by_basename[os.path.join(root, basename)].append(full_path)
+        for full_path in _walk_files(folder_path, max_workers):
+            basename, _ = os.path.splitext(full_path)
+            files_by_basename[basename].append(full_path)
     else:
         for filename in os.listdir(folder_path):
             full_path = os.path.join(folder_path, filename)
             if os.path.isfile(full_path):
                 basename, _ = os.path.splitext(filename)
                 files_by_basename[os.path.join(folder_path, basename)].append(full_path)
+    return dict(files_by_basename)
+
+def group_dataset_files(files_by_basename, enabled_extensions=None):
+    """Builds the dataset (media path -> text paths) from a scan_folder result."""
+    if enabled_extensions is None:
+        enabled_extensions = get_enabled_media_extensions()
+    enabled_extensions = tuple(ext.lower() for ext in enabled_extensions)
 
     dataset = {}
     for _base_path, paths in files_by_basename.items():
-        media_files = [p for p in paths if is_media_file(p)]
-        text_files = [p for p in paths if not is_media_file(p)]
+        media_files = [p for p in paths if p.lower().endswith(enabled_extensions)]
+        text_files = [p for p in paths if not p.lower().endswith(enabled_extensions)]
 
         # If multiple media files share a basename (e.g., cat.jpg, cat.png),
         # treat them as separate dataset items, each associated with all text files.
@@ -55,3 +107,27 @@ def find_dataset_files(folder_path, recursive=True):
                 dataset[media_file] = []
 
     return dataset
+
+def write_text_atomic(path, content, fsync=False):
+    """
+    Writes text to a temporary file next to path and swaps it in with os.replace,
+    so readers never see a half-written caption.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,170 @@
+"""
+Lightweight timing spans for the hot paths (scanning, decoding, editors, search,
+saves, thumbnails).
+
+    with tracing.span('decode', 'media', path=file_path):
+        ...
+
+    @tracing.traced('load_text_files', 'editor')
+    def load_text_files(...):
+
+While tracing is off, span() returns a shared no-op object and traced functions
+check a single flag, so instrumented code costs next to nothing. When on, finished
+spans go into a bounded ring buffer that the overlay summarizes and that can be
+exported as Chrome trace JSON (chrome://tracing, https://ui.perfetto.dev).
+Set DQV_TRACE=1 to trace from startup.
+"""
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+
+DEFAULT_CAPACITY = 100000
+
+_enabled = False
+_events = deque(maxlen=DEFAULT_CAPACITY)
+_origin_ns = time.perf_counter_ns()
+_thread_names = {}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', 'start_ns')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self.name, self.category, self.start_ns, time.perf_counter_ns() - self.start_ns, self.args)
+        return False
+
+
+def _record(name, category, start_ns, duration_ns, args):
+    thread = threading.current_thread()
+    thread_id = thread.ident
+    if thread_id not in _thread_names:
+        _thread_names[thread_id] = thread.name
+    # deque.append is atomic, so worker threads can record without a lock.
+    _events.append((name, category, start_ns, duration_ns, thread_id, args))
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(capacity=None):
+    global _enabled, _events
+    if capacity and capacity != _events.maxlen:
+        _events = deque(_events, maxlen=capacity)
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    _events.clear()
+
+
+def span(name, category='app', **args):
+    """Context manager timing the enclosed block while tracing is enabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args or None)
+
+
+def traced(name=None, category='app'):
+    """Decorator form of span(); the span is named after the function by default."""
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(span_name, category, start_ns, time.perf_counter_ns() - start_ns, None)
+        return wrapper
+    return decorator
+
+
+def events():
+    """A snapshot of the recorded events as (name, category, start_ns, duration_ns, thread_id, args)."""
+    return list(_events)
+
+
+def summarize(window_s=10.0, now_ns=None):
+    """
+    Per-span statistics of the events that finished in the last window_s seconds:
+    {name: {'category', 'count', 'last_ms', 'avg_ms', 'max_ms', 'total_ms'}}.
+    """
+    now_ns = now_ns or time.perf_counter_ns()
+    since_ns = now_ns - int(window_s * 1e9)
+    summary = {}
+    for name, category, start_ns, duration_ns, _thread_id, _args in reversed(events()):
+        if start_ns + duration_ns < since_ns:
+            break
+        entry = summary.get(name)
+        duration_ms = duration_ns / 1e6
+        if entry is None:
+            summary[name] = {'category': category, 'count': 1, 'last_ms': duration_ms,
+                             'max_ms': duration_ms, 'total_ms': duration_ms}
+        else:
+            entry['count'] += 1
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['total_ms'] += duration_ms
+    for entry in summary.values():
+        entry['avg_ms'] = entry['total_ms'] / entry['count']
+    return summary
+
+
+def chrome_trace():
+    """The recorded events in Chrome's Trace Event Format."""
+    pid = os.getpid()
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'DatasetQuickView'}}]
+    for thread_id, thread_name in list(_thread_names.items()):
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': thread_name}})
+    for name, category, start_ns, duration_ns, thread_id, args in events():
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': thread_id,
+                 'ts': (start_ns - _origin_ns) / 1000, 'dur': duration_ns / 1000}
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        trace_events.append(event)
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path):
+    """Writes chrome_trace() to path and returns the number of spans written."""
+    trace = chrome_trace()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f)
+    return sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')
+
+
+if os.environ.get('DQV_TRACE', '').lower() in ('1', 'true', 'yes', 'on'):
+    enable()
@@ -1,18 +1,30 @@
 from PyQt6.QtWidgets import QWidget, QListWidget, QListWidgetItem, QVBoxLayout, QSlider, QLabel, QHBoxLayout
-from PyQt6.QtCore import Qt, pyqtSignal, QSize, QObject, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QObject, QThread, QPoint
 from PyQt6.QtGui import QFont, QColor, QPixmap, QIcon
 import os
 from .list_item_delegate import ListItemDelegate
+from ..utils import tracing
+from ..core.memory_usage import deep_size
+
+# Native memory of one QListWidgetItem with its text and path data, not counting the
+# characters (2 bytes each); measured from process RSS, which tracemalloc cannot see.
+LIST_ITEM_BYTES = 520
+# Most rows checked when looking for evicted thumbnails that scrolled into view.
+MAX_VISIBLE_ROWS = 2000
 
 class ThumbnailWorker(QObject):
     thumbnail_ready = pyqtSignal(int, QIcon)
+    batch_finished = pyqtSignal()
 
     def process_thumbnails(self, tasks):
         for row, file_path, thumb_size in tasks:
-            pixmap = QPixmap(file_path)
-            if not pixmap.isNull():
+            with tracing.span('thumbnail', 'thumbnails'):
+                pixmap = QPixmap(file_path)
+                if pixmap.isNull():
+                    continue
                 icon = QIcon(pixmap.scaled(thumb_size, thumb_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-                self.thumbnail_ready.emit(row, icon)
+            self.thumbnail_ready.emit(row, icon)
+        self.batch_finished.emit()
 
 class FileListView(QWidget):
     currentItemChanged = pyqtSignal(QListWidgetItem, QListWidgetItem)
@@ -22,6 +34,15 @@ class FileListView(QWidget):
         self.config = config
         self.dataset = dataset if dataset is not None else {}
         self.found_files = set()
+        self.rows_by_media = {}
+        self.thumbnail_bytes = {}
+        self.thumbnail_total = 0
+        # Rows whose icon was dropped by the memory budget; reloaded once visible
+        self.evicted_thumbnails = set()
+        self._thumbnails_loading = False
+        self._thumbnail_tasks = []
+        self._view_state = None
+        self.config.subscribe(lambda _old, _new: self.apply_view_settings())
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(4, 4, 4, 4)
@@ -91,6 +112,8 @@ class FileListView(QWidget):
         self.thumbnail_worker = ThumbnailWorker()
         self.thumbnail_worker.moveToThread(self.thumbnail_thread)
         self.thumbnail_worker.thumbnail_ready.connect(self.update_thumbnail)
+        self.thumbnail_worker.batch_finished.connect(self._on_thumbnail_batch_finished)
+        self.list_widget.verticalScrollBar().valueChanged.connect(self.load_visible_thumbnails)
         self.thumbnail_thread.started.connect(lambda: self.thumbnail_worker.process_thumbnails(self._thumbnail_tasks))
         self.thumbnail_thread.start()
 
@@ -102,17 +125,31 @@ class FileListView(QWidget):
         self.list_widget.update()
 
     def apply_view_settings(self):
-        current_media_path = None
-        current_item = self.list_widget.currentItem()
-        if current_item:
-            current_media_path = current_item.data(Qt.ItemDataRole.UserRole)
-
-        view_mode = self.config.get_setting('FileList', 'view_mode', 'List')
-        thumb_size = int(self.config.get_setting('FileList', 'thumbnail_size', 80))
-        grid_layout = self.config.get_bool_setting('FileList', 'grid_layout', False)
-
-        self.list_widget.clear()
-
+        """
+        Applies the view mode and thumbnail settings to the existing items in place;
+        the list is not rebuilt, so selection and unsaved markers are kept.
+        """
+        settings = self.config.settings
+        view_mode, thumb_size, grid_layout = settings.view_mode, settings.thumbnail_size, settings.grid_layout
+        view_state = (view_mode, thumb_size, grid_layout)
+        if view_state == self._view_state:
+            return
+
+        self.list_widget.setUpdatesEnabled(False)
+        try:
+            self._set_view_mode(view_mode, thumb_size, grid_layout)
+            self._thumbnail_tasks = []
+            if view_mode != 'Thumbnails':
+                self._forget_thumbnails()
+            self.evicted_thumbnails = set()
+            for row in range(self.list_widget.count()):
+                self._apply_item_view(self.list_widget.item(row), row, view_mode, thumb_size)
+        finally:
+            self.list_widget.setUpdatesEnabled(True)
+        self._view_state = view_state
+        self._start_thumbnail_tasks(view_mode)
+
+    def _set_view_mode(self, view_mode, thumb_size, grid_layout):
         if view_mode == 'Thumbnails':
             self.list_widget.setViewMode(QListWidget.ViewMode.IconMode)
             self.list_widget.setIconSize(QSize(thumb_size, thumb_size))
@@ -131,52 +168,133 @@ class FileListView(QWidget):
             self.list_widget.setViewMode(QListWidget.ViewMode.ListMode)
             self.list_widget.setIconSize(QSize(0, 0))
 
-        self.populate_list(self.dataset.keys())
-
-        if current_media_path:
-            for i in range(self.list_widget.count()):
-                item = self.list_widget.item(i)
-                if item.data(Qt.ItemDataRole.UserRole) == current_media_path:
-                    self.list_widget.setCurrentItem(item)
-                    break
+    def _apply_item_view(self, item, row, view_mode, thumb_size):
+        file_path = item.data(Qt.ItemDataRole.UserRole)
+        if view_mode == 'Thumbnails':
+            # In thumbnail mode, hide the text and load the icon in the background
+            item.setText('')
+            self._thumbnail_tasks.append((row, file_path, thumb_size))
+            # Set a fixed size hint for the item to ensure proper spacing
+            item.setSizeHint(QSize(thumb_size, thumb_size))
+        else:
+            display_name = self.get_display_name(file_path)
+            item.setText(f"{display_name} *" if item.font().italic() else display_name)
+            item.setIcon(QIcon())
+            item.setSizeHint(QSize())
 
+    @tracing.traced('populate_list', 'file_list')
     def populate_list(self, media_files):
         self.list_widget.clear()
-        view_mode = self.config.get_setting('FileList', 'view_mode', 'List')
-        thumb_size = int(self.config.get_setting('FileList', 'thumbnail_size', 80))
-        grid_layout = self.config.get_bool_setting('FileList', 'grid_layout', False)
+        settings = self.config.settings
+        view_mode, thumb_size = settings.view_mode, settings.thumbnail_size
         self._thumbnail_tasks = []
+        self.rows_by_media = {}
+        self._forget_thumbnails()
+        self.evicted_thumbnails = set()
 
         for row, file_path in enumerate(sorted(media_files)):
+            self.rows_by_media[file_path] = row
             item = QListWidgetItem()
             item.setData(Qt.ItemDataRole.UserRole, file_path)
             item.setText(self.get_display_name(file_path))
-
             if view_mode == 'Thumbnails':
-                # In thumbnail mode, hide the text and prepare for an icon
-                item.setText('')
-                # Add placeholder icon or leave empty for now
-                # Add task for background processing
-                self._thumbnail_tasks.append((row, file_path, thumb_size))
-                # Set a fixed size hint for the item to ensure proper spacing
-                item.setSizeHint(QSize(thumb_size, thumb_size))
-
+                self._apply_item_view(item, row, view_mode, thumb_size)
             self.list_widget.addItem(item)
         self.update_progress(self.list_widget.currentRow(), self.count())
+        self._start_thumbnail_tasks(view_mode)
+        self.list_widget.update() # Force a repaint
 
+    def _start_thumbnail_tasks(self, view_mode):
         # Start processing thumbnails in background if in thumbnail mode
         if view_mode == 'Thumbnails' and self._thumbnail_tasks:
             # Stop and restart thread to process new tasks
             if self.thumbnail_thread.isRunning():
                 self.thumbnail_thread.quit()
                 self.thumbnail_thread.wait()
+            self._thumbnails_loading = True
             self.thumbnail_thread.start()
-        self.list_widget.update() # Force a repaint
+
+    def _on_thumbnail_batch_finished(self):
+        self._thumbnails_loading = False
+        self.load_visible_thumbnails()
 
     def update_thumbnail(self, row, icon):
         item = self.list_widget.item(row)
         if item:
             item.setIcon(icon)
+            self.thumbnail_total -= self.thumbnail_bytes.get(row, 0)
+            self.thumbnail_bytes[row] = sum(size.width() * size.height() * 4 for size in icon.availableSizes())
+            self.thumbnail_total += self.thumbnail_bytes[row]
+
+    def _forget_thumbnails(self):
+        self.thumbnail_bytes = {}
+        self.thumbnail_total = 0
+
+    def _visible_rows(self):
+        """Rows currently on screen, from the first visible one down to the bottom of the viewport."""
+        viewport = self.list_widget.viewport().rect()
+        first = -1
+        # The top left corner can fall into the spacing between grid cells; probe a little further in.
+        for offset in range(0, 64, 8):
+            first = self.list_widget.indexAt(QPoint(viewport.left() + offset, viewport.top() + offset)).row()
+            if first != -1:
+                break
+        rows = []
+        for row in range(max(first, 0), min(self.list_widget.count(), max(first, 0) + MAX_VISIBLE_ROWS)):
+            rect = self.list_widget.visualItemRect(self.list_widget.item(row))
+            if rect.top() > viewport.bottom():
+                break
+            if rect.intersects(viewport):
+                rows.append(row)
+        return rows
+
+    def load_visible_thumbnails(self):
+        """Queues evicted thumbnails that are on screen again."""
+        if not self.evicted_thumbnails or self._thumbnails_loading or self.config.settings.view_mode != 'Thumbnails':
+            return
+        rows = [row for row in self._visible_rows() if row in self.evicted_thumbnails]
+        if not rows:
+            return
+        thumb_size = self.config.settings.thumbnail_size
+        self.evicted_thumbnails.difference_update(rows)
+        self._thumbnail_tasks = [(row, self.list_widget.item(row).data(Qt.ItemDataRole.UserRole), thumb_size) for row in rows]
+        self._start_thumbnail_tasks('Thumbnails')
+
+    def evict_thumbnails(self, bytes_needed, protected=()):
+        """
+        Drops the icons farthest from the current row until bytes_needed are freed,
+        keeping the rows on screen and protected media. Returns the bytes freed.
+        """
+        if not self.thumbnail_bytes:
+            return 0
+        current = max(self.list_widget.currentRow(), 0)
+        keep = set(self._visible_rows())
+        keep.update(self.rows_by_media[media_path] for media_path in protected if media_path in self.rows_by_media)
+        freed = 0
+        for row in sorted(self.thumbnail_bytes, key=lambda row: abs(row - current), reverse=True):
+            if freed >= bytes_needed:
+                break
+            if row in keep:
+                continue
+            item = self.list_widget.item(row)
+            if item:
+                item.setIcon(QIcon())
+            freed += self.thumbnail_bytes.pop(row)
+            self.evicted_thumbnails.add(row)
+        self.thumbnail_total -= freed
+        return freed
+
+    def memory_usage(self):
+        """Estimated bytes of the list items (native and Python side) and the thumbnail icons."""
+        count = self.list_widget.count()
+        chars = sum(len(media_path) + len(self.get_display_name(media_path)) for media_path in self.rows_by_media)
+        return {
+            'list_items': {'bytes': count * LIST_ITEM_BYTES + chars * 2 + deep_size(self.rows_by_media), 'items': count},
+            'thumbnails': {'bytes': self.thumbnail_total, 'items': len(self.thumbnail_bytes)},
+        }
+
+    def row_for_media(self, media_path):
+        return self.rows_by_media.get(media_path, -1)
 
     def get_media_path_from_text_path(self, text_path):
         for media_path, text_paths in self.dataset.items():
@@ -192,21 +310,33 @@ class FileListView(QWidget):
         return None
 
     def set_item_dirty(self, media_path, is_dirty):
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) == media_path:
-                font = item.font()
-                display_name = self.get_display_name(media_path)
-                if is_dirty:
-                    font.setItalic(True)
-                    item.setText(f"{display_name} *")
-                    item.setForeground(QColor("#FAD7A0"))
-                else:
-                    font.setItalic(False)
-                    item.setText(display_name)
-                    item.setForeground(QColor("white"))
-                item.setFont(font)
-                break
+        item = self.list_widget.item(self.row_for_media(media_path))
+        if item is None:
+            return
+        font = item.font()
+        if font.italic() == is_dirty:
+            return
+        display_name = self.get_display_name(media_path)
+        if is_dirty:
+            font.setItalic(True)
+            item.setText(f"{display_name} *")
+            item.setForeground(QColor("#FAD7A0"))
+        else:
+            font.setItalic(False)
+            item.setText(display_name)
+            item.setForeground(QColor("white"))
+        item.setFont(font)
+
+    def set_items_dirty(self, media_paths, is_dirty):
+        if not media_paths:
+            return
+        # Repaint once for the whole batch instead of once per item.
+        self.list_widget.setUpdatesEnabled(False)
+        try:
+            for media_path in media_paths:
+                self.set_item_dirty(media_path, is_dirty)
+        finally:
+            self.list_widget.setUpdatesEnabled(True)
 
     def sync_slider_to_list(self, row):
         if self.slider.value() != row:
@@ -248,9 +378,9 @@ class FileListView(QWidget):
             self.dataset[new_path] = self.dataset.pop(old_path)
 
         # Update list widget item
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) == old_path:
-                item.setData(Qt.ItemDataRole.UserRole, new_path)
-                item.setText(self.get_display_name(new_path))
-                break
+        row = self.rows_by_media.pop(old_path, -1)
+        item = self.list_widget.item(row) if row != -1 else None
+        if item:
+            self.rows_by_media[new_path] = row
+            item.setData(Qt.ItemDataRole.UserRole, new_path)
+            item.setText(self.get_display_name(new_path))
@@ -1,10 +1,11 @@
 import os
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtCore import QUrl, Qt
 from PyQt6.QtGui import QPixmap
 
+from ..utils.config_manager import current_settings
+from ..utils import tracing
+
 class MediaViewer(QWidget):
     def __init__(self, config=None):
         super().__init__()
@@ -19,18 +20,28 @@ class MediaViewer(QWidget):
         self.image_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
         self.layout.addWidget(self.image_label)
 
-        # Video player
+        # Video player, created with the first video (see _ensure_video_player)
+        self.video_widget = None
+        self.player = None
+        self.audio_output = None
+
+        self.image_label.hide()
+
+    def _ensure_video_player(self):
+        # QtMultimedia loads the FFmpeg backend on import, which is slow; only pay for
+        # it once a video is actually shown.
+        if self.player is not None:
+            return
+        from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from PyQt6.QtMultimediaWidgets import QVideoWidget
         self.video_widget = QVideoWidget()
+        self.video_widget.hide()
         self.layout.addWidget(self.video_widget)
         self.player = QMediaPlayer()
         self.audio_output = QAudioOutput()
         self.player.setAudioOutput(self.audio_output)
         self.player.setVideoOutput(self.video_widget)
 
-        # Start with both hidden
-        self.image_label.hide()
-        self.video_widget.hide()
-
     def set_media(self, file_path):
         self.clear_media()
         if not file_path or not os.path.exists(file_path):
@@ -38,45 +49,47 @@ class MediaViewer(QWidget):
             
         ext = os.path.splitext(file_path)[1].lower()
         
-        # Get supported formats from config or use defaults
-        if self.config:
-            supported_formats_str = self.config.get_setting('MediaFormats', 'supported', fallback='.png,.jpg,.jpeg,.bmp,.webp,.gif,.mp4')
-        else:
-            supported_formats_str = '.png,.jpg,.jpeg,.bmp,.webp,.gif,.mp4'
-        
-        supported_formats = [f.strip() for f in supported_formats_str.split(',')]
-        supported_image_formats = [f for f in supported_formats if f != '.mp4']
-        supported_video_formats = ['.mp4']
+        # Supported formats from the config's settings snapshot, or the defaults
+        settings = self.config.settings if self.config else current_settings()
+        supported_video_formats = ('.mp4',)
+        supported_image_formats = [f for f in settings.supported_formats if f not in supported_video_formats]
 
         if ext in supported_image_formats:
-            self.video_widget.hide()
             self.image_label.show()
-            self.original_pixmap = QPixmap(file_path)
-            self.image_label.setPixmap(self.original_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+            with tracing.span('decode', 'media'):
+                self.original_pixmap = QPixmap(file_path)
+            with tracing.span('scale', 'media'):
+                self.image_label.setPixmap(self.original_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
 
         elif ext in supported_video_formats:
+            self._ensure_video_player()
             self.image_label.hide()
             self.video_widget.show()
             self.player.setSource(QUrl.fromLocalFile(file_path))
             
             # Loop video if setting is enabled
-            loop = True
-            if self.config:
-                loop = self.config.get_bool_setting('Video', 'loop', fallback=True)
-
-            if loop:
+            if settings.loop_video:
                 self.player.setLoops(-1) # -1 means infinite loop
             else:
                 self.player.setLoops(1) # Play once
             self.player.play()
 
     def clear_media(self):
-        self.player.stop()
+        if self.player is not None:
+            self.player.stop()
+            self.video_widget.hide()
         self.image_label.hide()
         self.image_label.clear()
-        self.video_widget.hide()
         self.original_pixmap = None
 
+    def decoded_bytes(self):
+        """Bytes of the decoded image and the scaled copy on screen."""
+        total = 0
+        for pixmap in (self.original_pixmap, self.image_label.pixmap()):
+            if pixmap is not None and not pixmap.isNull():
+                total += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        return total
+
     def resizeEvent(self, event):
         # When the widget is resized, scale the pixmap again from the original.
         if self.original_pixmap and not self.original_pixmap.isNull():
@@ -0,0 +1,84 @@
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+import os
+
+from ..core.search_index import str_span
+
+SNIPPET_BEFORE = 30
+SNIPPET_AFTER = 60
+
+
+class SearchResultsModel(QAbstractListModel):
+    """Exposes SearchResults to a view; snippets are only built for rows that get painted."""
+
+    def __init__(self, content_provider, parent=None):
+        super().__init__(parent)
+        self.content_provider = content_provider
+        self.results = []
+        self._content_cache = {}
+
+    def set_results(self, results):
+        self.beginResetModel()
+        self.results = results
+        self._content_cache = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.results)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self.results)):
+            return None
+        media_path, text_path, position, length = self.results[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{os.path.basename(text_path)}:  {self._snippet(text_path, position, length)}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return text_path
+        return None
+
+    def _snippet(self, text_path, position, length):
+        content = self._content_cache.get(text_path)
+        if content is None:
+            content = self.content_provider(text_path) or ""
+            if len(self._content_cache) > 256:
+                self._content_cache.clear()
+            self._content_cache[text_path] = content
+        # Hit positions are UTF-16 offsets for QTextCursor; slice the str by its own indices.
+        position, length = str_span(content, position, length)
+        start = max(0, position - SNIPPET_BEFORE)
+        end = position + length + SNIPPET_AFTER
+        snippet = content[start:end].replace('\n', ' ')
+        if start > 0:
+            snippet = '…' + snippet
+        if end < len(content):
+            snippet += '…'
+        return snippet
+
+
+class SearchResultsView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Uniform sizes let the view lay out any number of rows without measuring them.
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setMinimumHeight(150)
+
+    def select_row(self, row):
+        model = self.model()
+        if model is None:
+            return
+        self.blockSignals(True)
+        self.selectionModel().blockSignals(True)
+        if 0 <= row < model.rowCount():
+            index = model.index(row, 0)
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
+        else:
+            self.clearSelection()
+        self.selectionModel().blockSignals(False)
+        self.blockSignals(False)
@@ -1,10 +1,20 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QLabel, QScrollArea, QFrame, QPushButton, QInputDialog, QMessageBox
 from PyQt6.QtGui import QPalette, QColor, QTextCharFormat, QTextCursor, QTextDocument
-from PyQt6.QtCore import pyqtSignal, QSignalBlocker, Qt, QEvent
+from PyQt6.QtCore import pyqtSignal, QSignalBlocker, Qt, QEvent, QTimer, QPoint
+from bisect import bisect_left, bisect_right
 import os
 
+from ..core.search_index import compile_search_pattern, find_spans
+from ..utils import tracing
+
+HIGHLIGHT_DELAY_MS = 30
+# Above this many characters only the visible part of a document is highlighted.
+LONG_DOCUMENT_CHARS = 20000
+VISIBLE_MARGIN_CHARS = 2000
+
 class TextEditorPanel(QWidget):
-    text_modified = pyqtSignal(str, str)  # Signal to emit when text changes (file_path, new_content)
+    text_modified = pyqtSignal(str, str)  # Emitted when edited text is materialized (file_path, new_content)
+    text_edited = pyqtSignal(str)  # Emitted on every edit, without copying the document (file_path)
 
     def __init__(self, main_window=None):
         super().__init__()
@@ -27,9 +37,25 @@ class TextEditorPanel(QWidget):
         self.editors_layout.setSpacing(8)
 
         self.text_editors = {}
+        # Document revision of each editor when its text was last handed out via text_modified.
+        self._synced_revisions = {}
 
         self.primary_highlight_color = QColor("#BDBDBD")
         self.secondary_highlight_color = QColor("#E0E0E0")
+        self.primary_format = QTextCharFormat()
+        self.primary_format.setBackground(self.primary_highlight_color)
+        self.primary_format.setForeground(QColor("black"))
+        self.secondary_format = QTextCharFormat()
+        self.secondary_format.setBackground(self.secondary_highlight_color)
+        self.secondary_format.setForeground(QColor("black"))
+
+        # Highlight requests are coalesced and rendered once the timer fires.
+        self.highlight_timer = QTimer(self)
+        self.highlight_timer.setSingleShot(True)
+        self.highlight_timer.setInterval(HIGHLIGHT_DELAY_MS)
+        self.highlight_timer.timeout.connect(self._render_highlights)
+        self._highlight_request = None
+        self._highlight_state = {}
         self.base_stylesheet = "QTextEdit { border-radius: 5px; }"
         self.active_editor_stylesheet = "QTextEdit { border: 2px solid #5E94FF; border-radius: 5px; }"
 
@@ -49,37 +75,94 @@ class TextEditorPanel(QWidget):
                 editor.setStyleSheet(self.base_stylesheet)
 
     def clear_highlights(self, editor=None):
+        if editor is None:
+            self.highlight_timer.stop()
+            self._highlight_request = None
+            self._highlight_state = {}
+        else:
+            self._highlight_state.pop(editor, None)
         editors_to_clear = [editor] if editor else self.text_editors.values()
         for ed in editors_to_clear:
             ed.setExtraSelections([])
 
-    def highlight_occurrences(self, editor, text, current_pos=-1, case_sensitive=False, whole_words=False):
-        selections = []
-        primary_format = QTextCharFormat()
-        primary_format.setBackground(self.primary_highlight_color)
-        primary_format.setForeground(QColor("black"))
-        
-        secondary_format = QTextCharFormat()
-        secondary_format.setBackground(self.secondary_highlight_color)
-        secondary_format.setForeground(QColor("black"))
-
-        find_flags = QTextDocument.FindFlag(0)
-        if case_sensitive:
-            find_flags |= QTextDocument.FindFlag.FindCaseSensitively
-        if whole_words:
-            find_flags |= QTextDocument.FindFlag.FindWholeWords
-
-        cursor = QTextCursor(editor.document())
-        while not cursor.isNull() and not cursor.atEnd():
-            cursor = editor.document().find(text, cursor, find_flags)
-            if not cursor.isNull():
-                is_current = cursor.selectionStart() == current_pos
+    def highlight_all(self, text, case_sensitive=False, whole_words=False, current_editor=None, current_pos=-1):
+        """Schedules highlighting of every occurrence of text in all editors."""
+        if not text:
+            self.clear_highlights()
+            return
+        pattern = compile_search_pattern(text, case_sensitive, whole_words)
+        self._request_highlights(pattern, (text, case_sensitive, whole_words), current_editor, current_pos)
+
+    def _request_highlights(self, pattern, pattern_key, current_editor=None, current_pos=-1, excluded=None):
+        self._highlight_request = (pattern, pattern_key, current_editor, current_pos, excluded)
+        self.highlight_timer.start()
+
+    def _render_highlights(self):
+        if self._highlight_request is None:
+            return
+        for editor in self.text_editors.values():
+            self._render_editor_highlights(editor)
+
+    def _render_editor_highlights(self, editor):
+        pattern, pattern_key, current_editor, current_pos, excluded = self._highlight_request
+        document = editor.document()
+        key = (pattern_key, excluded, document.revision())
+
+        state = self._highlight_state.get(editor)
+        if state is None or state['key'] != key:
+            # Match spans are computed once per (query, document revision).
+            spans = find_spans(pattern, editor.toPlainText())
+            if excluded is not None and excluded[0] is editor:
+                spans = [span for span in spans if (span[0], span[0] + span[1]) != excluded[1:]]
+            state = {'key': key, 'spans': spans, 'starts': [span[0] for span in spans],
+                     'window': None, 'selections': None, 'first': 0, 'current': -1}
+            self._highlight_state[editor] = state
+
+        window = self._visible_window(editor) if document.characterCount() > LONG_DOCUMENT_CHARS else None
+        changed = False
+        if state['selections'] is None or state['window'] != window:
+            first, last = 0, len(state['spans'])
+            if window is not None:
+                first = bisect_left(state['starts'], window[0])
+                last = bisect_right(state['starts'], window[1])
+            selections = []
+            for position, length in state['spans'][first:last]:
+                cursor = QTextCursor(document)
+                cursor.setPosition(position)
+                cursor.setPosition(position + length, QTextCursor.MoveMode.KeepAnchor)
                 selection = QTextEdit.ExtraSelection()
                 selection.cursor = cursor
-                selection.format = primary_format if is_current else secondary_format
+                selection.format = self.secondary_format
                 selections.append(selection)
-        
-        editor.setExtraSelections(selections)
+            state.update(window=window, selections=selections, first=first, current=-1)
+            changed = True
+
+        # Only the formats of the old and new current match are touched when the current match moves.
+        current = -1
+        if editor is current_editor and current_pos >= 0:
+            i = bisect_left(state['starts'], current_pos) - state['first']
+            if 0 <= i < len(state['selections']) and state['starts'][i + state['first']] == current_pos:
+                current = i
+        if current != state['current']:
+            if state['current'] != -1:
+                state['selections'][state['current']].format = self.secondary_format
+            if current != -1:
+                state['selections'][current].format = self.primary_format
+            state['current'] = current
+            changed = True
+
+        if changed:
+            editor.setExtraSelections(state['selections'])
+
+    def _visible_window(self, editor):
+        viewport = editor.viewport()
+        start = editor.cursorForPosition(QPoint(0, 0)).position()
+        end = editor.cursorForPosition(QPoint(viewport.width(), viewport.height())).position()
+        return (max(0, start - VISIBLE_MARGIN_CHARS), end + VISIBLE_MARGIN_CHARS)
+
+    def _on_editor_scrolled(self):
+        if self._highlight_request is not None:
+            self.highlight_timer.start()
 
     def _on_selection_changed(self):
         source_editor = self.sender()
@@ -87,8 +170,7 @@ class TextEditorPanel(QWidget):
             return
 
         if not source_editor.textCursor().hasSelection():
-            for editor in self.get_all_editors():
-                self.clear_highlights(editor)
+            self.clear_highlights()
             return
 
         for editor in self.get_all_editors():
@@ -98,69 +180,88 @@ class TextEditorPanel(QWidget):
                 if cursor.hasSelection():
                     cursor.clearSelection()
                     editor.setTextCursor(cursor)
-                self.clear_highlights(editor)
         
         user_cursor = source_editor.textCursor()
-        selected_text = user_cursor.selectedText()
+        selected_text = user_cursor.selectedText().replace('\u2029', '\n')
 
         if len(selected_text) < 2 or selected_text.isspace():
-            self.clear_highlights(source_editor)
+            self.clear_highlights()
             return
 
-        secondary_format = QTextCharFormat()
-        secondary_format.setBackground(self.secondary_highlight_color)
-        secondary_format.setForeground(QColor("black"))
-        find_flags = QTextDocument.FindFlag.FindCaseSensitively
-
-        for editor in self.get_all_editors():
-            selections = []
-            doc_cursor = QTextCursor(editor.document())
-            while not doc_cursor.isNull() and not doc_cursor.atEnd():
-                doc_cursor = editor.document().find(selected_text, doc_cursor, find_flags)
-                if not doc_cursor.isNull():
-                    if (editor == source_editor and
-                        doc_cursor.selectionStart() == user_cursor.selectionStart() and
-                        doc_cursor.selectionEnd() == user_cursor.selectionEnd()):
-                        continue
-
-                    selection = QTextEdit.ExtraSelection()
-                    selection.cursor = doc_cursor
-                    selection.format = secondary_format
-                    selections.append(selection)
-            
-            editor.setExtraSelections(selections)
+        pattern = compile_search_pattern(selected_text, case_sensitive=True)
+        excluded = (source_editor, user_cursor.selectionStart(), user_cursor.selectionEnd())
+        self._request_highlights(pattern, (selected_text, True, False), excluded=excluded)
 
     def _on_text_changed(self, file_path):
+        if file_path in self.text_editors:
+            self.text_edited.emit(file_path)
+
+    def has_pending_edits(self, file_path):
+        """True if the editor for file_path changed since its text was last materialized."""
         editor = self.text_editors.get(file_path)
-        if editor:
-            self.text_modified.emit(file_path, editor.toPlainText())
+        return editor is not None and editor.document().revision() != self._synced_revisions.get(file_path)
+
+    def flush_pending_edits(self, file_path=None):
+        """
+        Copies the text of edited editors out of their documents and emits text_modified
+        for each one. Call this before anything that reads the text cache or search index.
+        """
+        file_paths = [file_path] if file_path is not None else list(self.text_editors)
+        for path in file_paths:
+            if self.has_pending_edits(path):
+                editor = self.text_editors[path]
+                self._synced_revisions[path] = editor.document().revision()
+                self.text_modified.emit(path, editor.toPlainText())
+
+    def discard_pending_edits(self):
+        """Forgets unmaterialized edits, e.g. before the editors are reverted or reloaded."""
+        for path, editor in self.text_editors.items():
+            self._synced_revisions[path] = editor.document().revision()
+
+    def set_editor_text(self, file_path, content, keep_cursor=False):
+        """Replaces an editor's text without reporting it as a user edit."""
+        editor = self.text_editors.get(file_path)
+        if editor is None:
+            return
+        cursor_pos = editor.textCursor().position()
+        editor.blockSignals(True)
+        editor.setPlainText(content)
+        if keep_cursor:
+            cursor = editor.textCursor()
+            cursor.setPosition(min(cursor_pos, editor.document().characterCount() - 1))
+            editor.setTextCursor(cursor)
+        editor.blockSignals(False)
+        self._synced_revisions[file_path] = editor.document().revision()
 
+    @tracing.traced('load_text_files', 'editor')
     def load_text_files(self, file_paths, font_size, text_cache):
         self.clear_highlights()
+        self._highlight_state = {}
         for i in reversed(range(self.editors_layout.count())):
             widget = self.editors_layout.itemAt(i).widget()
             if widget:
                 widget.setParent(None)
         self.text_editors = {}
+        self._synced_revisions = {}
 
         if not file_paths:
             self.editors_layout.addWidget(QLabel("No text files for this item. Start typing to create one."))
         else:
+            app_state = self.main_window.app_state
             for file_path in file_paths:
-                # Check cache first, otherwise read from file
-                if file_path in text_cache:
-                    content = text_cache[file_path]
-                else:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                    except FileNotFoundError:
-                        # This is a new file, start with empty content
-                        content = ""
-                    except Exception as e:
-                        content = f"Error reading file: {e}"
-                    # Add to cache regardless of whether it was read or is new
-                    text_cache[file_path] = content
+                # Use the cache unless the file was changed on disk, otherwise read from file
+                cached = text_cache.get(file_path)
+                try:
+                    content = app_state.read_text(file_path)
+                except FileNotFoundError:
+                    # This is a new file, start with empty content
+                    content = cached if cached is not None else ""
+                except Exception as e:
+                    content = f"Error reading file: {e}"
+                if cached is not None and content != cached:
+                    self.main_window.search_engine.update_text(file_path, content)
+                # Add to cache regardless of whether it was read or is new
+                text_cache[file_path] = content
 
                 filename = os.path.basename(file_path)
                 _, ext = os.path.splitext(filename)
@@ -181,9 +282,11 @@ class TextEditorPanel(QWidget):
 
                 editor.setPlainText(content)
                 editor.setAcceptRichText(False)
+                self._synced_revisions[file_path] = editor.document().revision()
 
                 editor.installEventFilter(self)
                 editor.selectionChanged.connect(self._on_selection_changed)
+                editor.verticalScrollBar().valueChanged.connect(self._on_editor_scrolled)
                 # Use a lambda to pass the file_path to the slot
                 editor.textChanged.connect(lambda fp=file_path: self._on_text_changed(fp))
 
@@ -240,32 +343,19 @@ class TextEditorPanel(QWidget):
                 QMessageBox.information(self, "Format Exists", f"The format '{text}' already exists for this item.")
                 return
 
-            # Add to dataset and cache
-            self.main_window.app_state.dataset.setdefault(media_path, []).append(new_text_path)
-            self.main_window.app_state.text_cache[new_text_path] = ""
-            self.main_window.on_text_modified(new_text_path, "") # Mark as dirty
-
             # Ask to apply to all
-            reply = QMessageBox.question(self, 'Apply to All?', 
-                                       f"Do you want to create an empty '{text}' file for all other items in the dataset?",
+            reply = QMessageBox.question(self, 'Apply to All?',
+                                       f"Do you want to add a '{text}' editor to all other items in the dataset?\n\n"
+                                       "Files are only created for items whose text you edit and save.",
                                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                        QMessageBox.StandardButton.No)
 
+            # Nothing is written or marked dirty here: the empty editor becomes a
+            # tracked file once it is edited.
             if reply == QMessageBox.StandardButton.Yes:
-                for m_path in self.main_window.app_state.dataset.keys():
-                    if m_path == media_path: continue # Skip current
-                    
-                    m_base, _ = os.path.splitext(m_path)
-                    t_path = m_base + text
-                    
-                    # Add to dataset if it doesn't exist
-                    if t_path not in self.main_window.app_state.dataset.get(m_path, []):
-                        self.main_window.app_state.dataset.setdefault(m_path, []).append(t_path)
-                    
-                    # Add to cache and mark as dirty if not already there
-                    if t_path not in self.main_window.app_state.text_cache:
-                        self.main_window.app_state.text_cache[t_path] = ""
-                        self.main_window.on_text_modified(t_path, "")
+                self.main_window.app_state.add_virtual_format(text)
+            else:
+                self.main_window.app_state.add_text_path(media_path, new_text_path)
 
             # Refresh the view for the current item
             self.main_window.on_file_selected(current_item, None)
\ No newline at end of file
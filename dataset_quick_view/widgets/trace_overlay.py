@@ -0,0 +1,97 @@
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+import logging
+
+from ..utils import tracing
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL_MS = 500
+SUMMARY_WINDOW_S = 10
+MAX_ROWS = 14
+
+
+class TraceOverlay(QFrame):
+    """Semi-transparent panel over the main window listing recent span timings."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("traceOverlay")
+        self.setStyleSheet("""
+            #traceOverlay { background-color: rgba(20, 20, 20, 210); border: 1px solid #888888; border-radius: 4px; }
+            QLabel { color: #e0e0e0; background: transparent; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        self.table_label = QLabel()
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPointSize(9)
+        self.table_label.setFont(font)
+        self.table_label.setTextFormat(Qt.TextFormat.PlainText)
+        layout.addWidget(self.table_label)
+
+        button_layout = QHBoxLayout()
+        self.export_button = QPushButton("Export Trace...")
+        self.clear_button = QPushButton("Clear")
+        button_layout.addWidget(self.export_button)
+        button_layout.addWidget(self.clear_button)
+        button_layout.addStretch()
+        layout.addLayout(button_layout)
+
+        self.export_button.clicked.connect(self.export_trace)
+        self.clear_button.clicked.connect(self._clear)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        """Shows the overlay and starts tracing, or hides it and stops tracing."""
+        if self.isVisible():
+            self.refresh_timer.stop()
+            self.hide()
+            tracing.disable()
+            return False
+        tracing.enable()
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.refresh_timer.start()
+        return True
+
+    def refresh(self):
+        summary = tracing.summarize(SUMMARY_WINDOW_S)
+        rows = sorted(summary.items(), key=lambda item: item[1]['total_ms'], reverse=True)[:MAX_ROWS]
+        lines = [f"Last {SUMMARY_WINDOW_S} s                 count    last     avg     max (ms)"]
+        for name, entry in rows:
+            lines.append(f"{name[:26]:<26} {entry['count']:5d} {entry['last_ms']:7.1f} {entry['avg_ms']:7.1f} {entry['max_ms']:7.1f}")
+        if not rows:
+            lines.append("No spans recorded yet.")
+        self.table_label.setText("\n".join(lines))
+        self.adjustSize()
+        self.reposition()
+
+    def reposition(self):
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(parent.width() - self.width() - 12, 40)
+
+    def _clear(self):
+        tracing.clear()
+        self.refresh()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "trace.json", "Chrome Trace (*.json)")
+        if not path:
+            return
+        try:
+            count = tracing.export_chrome_trace(path)
+        except Exception as e:
+            logger.error(f"Could not export trace: {e}")
+            QMessageBox.critical(self, "Error", f"Could not export trace: {e}")
+            return
+        self.parentWidget().statusBar().showMessage(f"Exported {count} span(s) to {path}. Open it in chrome://tracing or ui.perfetto.dev.", 5000)
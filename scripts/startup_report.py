@@ -0,0 +1,201 @@
+"""
+Startup report for DatasetQuickView.
+
+Runs the application's imports under `python -X importtime` and, optionally, opens
+the main window offscreen on a folder, then prints where startup time goes. Exits
+with status 1 if a budget is exceeded or a module that should load lazily was
+imported at startup, so it can run as a CI check.
+
+    python scripts/startup_report.py
+    python scripts/startup_report.py --folder path/to/dataset --max-first-paint-ms 1500
+    python scripts/startup_report.py --json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+STARTUP_MODULE = 'dataset_quick_view.main_window'
+
+# Modules that must only be imported on first use.
+LAZY_MODULES = (
+    'PyQt6.QtMultimedia',
+    'PyQt6.QtMultimediaWidgets',
+    'dataset_quick_view.tools.',
+)
+
+
+def parse_importtime(stderr):
+    """Returns [(module, self_us, cumulative_us, depth)] from `-X importtime` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+            imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return imports
+
+
+def import_report(module=STARTUP_MODULE, top=15):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr[-2000:]}")
+    imports = parse_importtime(process.stderr)
+    total_us = sum(cumulative for _name, _self, cumulative, depth in imports if depth == 0)
+    lazy_violations = sorted({name for name, _self, _cumulative, _depth in imports
+                              if any(name == lazy or (lazy.endswith('.') and name.startswith(lazy)) for lazy in LAZY_MODULES)})
+    slowest = sorted(imports, key=lambda entry: entry[1], reverse=True)[:top]
+    return {
+        'module': module,
+        'total_import_ms': round(total_us / 1000, 1),
+        'module_count': len(imports),
+        'slowest_self_ms': [(name, round(self_us / 1000, 2)) for name, self_us, _cumulative, _depth in slowest],
+        'lazy_violations': lazy_violations,
+    }
+
+
+def _write_sample_dataset(folder, count=200):
+    # Zero-byte images are enough: startup only scans and lists them.
+    for i in range(count):
+        open(os.path.join(folder, f'item{i:05d}.png'), 'wb').close()
+        with open(os.path.join(folder, f'item{i:05d}.txt'), 'w', encoding='utf-8') as f:
+            f.write(f'caption {i}')
+
+
+def window_report(folder, timeout_s=60):
+    """Opens the main window offscreen in a fresh interpreter and times its startup phases."""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen',
+               PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure-window', folder],
+                             cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=timeout_s)
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"Window measurement failed:\n{process.stderr[-2000:]}")
+
+
+def _measure_window(folder):
+    # Runs in the child process started by window_report.
+    start = time.perf_counter()
+    from PyQt6.QtCore import QObject, QEvent
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+
+    class FirstPaint(QObject):
+        # The time of the first paint event any widget gets, whatever else the event loop
+        # handles in the same pass (the loader's queued result, for one).
+        def __init__(self):
+            super().__init__()
+            self.painted = None
+
+        def eventFilter(self, obj, event):
+            if self.painted is None and event.type() == QEvent.Type.Paint:
+                self.painted = time.perf_counter()
+            return False
+
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    from dataset_quick_view.main_window import MainWindow
+    from dataset_quick_view.utils.config_manager import ConfigManager
+    imported = time.perf_counter()
+
+    # A fresh config with the default settings, so the numbers don't depend on the
+    # developer's saved view mode or recursive scan, and config.ini is left alone.
+    config_dir = tempfile.mkdtemp(prefix='dqv-startup-config-')
+    try:
+        window = MainWindow(folder, ConfigManager(os.path.join(config_dir, 'config.ini')))
+        constructed = time.perf_counter()
+        loader = window.file_operations.dataset_loader
+        # Queued behind the window's own handler, so this fires once the list is filled.
+        finished = []
+        loader.loaded.connect(lambda *_args: finished.append(time.perf_counter()))
+        loader.failed.connect(lambda *_args: finished.append(time.perf_counter()))
+        window.show()
+        while (not finished or first_paint.painted is None) and time.perf_counter() - start < 50:
+            app.processEvents()
+            time.sleep(0.001)
+        app.removeEventFilter(first_paint)
+        painted = first_paint.painted or time.perf_counter()
+        loaded = finished[0] if finished else time.perf_counter()
+
+        multimedia_loaded = 'PyQt6.QtMultimedia' in sys.modules
+        loader.shutdown()
+        # Nothing was edited; don't leave a crash-recovery journal behind for the folder.
+        window.edit_journal.discard()
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+    print(json.dumps({
+        'imports_ms': round((imported - start) * 1000, 1),
+        'construct_ms': round((constructed - imported) * 1000, 1),
+        'first_paint_ms': round((painted - start) * 1000, 1),
+        'dataset_loaded_ms': round((loaded - start) * 1000, 1),
+        'items': window.file_list.count(),
+        'multimedia_loaded': multimedia_loaded,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report where DatasetQuickView spends its startup time.")
+    parser.add_argument('--folder', help="Dataset folder to open offscreen (default: a generated sample).")
+    parser.add_argument('--no-window', action='store_true', help="Only report imports.")
+    parser.add_argument('--max-import-ms', type=float, help="Fail if importing the app takes longer.")
+    parser.add_argument('--max-first-paint-ms', type=float, help="Fail if the window takes longer to first paint.")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+    parser.add_argument('--measure-window', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_window:
+        _measure_window(args.measure_window)
+        return 0
+
+    report = {'imports': import_report()}
+    if not args.no_window:
+        if args.folder:
+            report['window'] = window_report(args.folder)
+        else:
+            with tempfile.TemporaryDirectory() as folder:
+                _write_sample_dataset(folder)
+                report['window'] = window_report(folder)
+
+    failures = []
+    imports = report['imports']
+    if imports['lazy_violations']:
+        failures.append(f"imported at startup: {', '.join(imports['lazy_violations'])}")
+    if args.max_import_ms is not None and imports['total_import_ms'] > args.max_import_ms:
+        failures.append(f"imports took {imports['total_import_ms']} ms (budget {args.max_import_ms} ms)")
+    window = report.get('window')
+    if window:
+        if window['multimedia_loaded']:
+            failures.append("QtMultimedia was loaded while opening the window")
+        if args.max_first_paint_ms is not None and window['first_paint_ms'] > args.max_first_paint_ms:
+            failures.append(f"first paint took {window['first_paint_ms']} ms (budget {args.max_first_paint_ms} ms)")
+    report['failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Imports of {imports['module']}: {imports['total_import_ms']} ms over {imports['module_count']} module(s)")
+        print("Slowest modules (self time):")
+        for name, self_ms in imports['slowest_self_ms']:
+            print(f"  {self_ms:8.2f} ms  {name}")
+        if window:
+            print(f"Window: imports {window['imports_ms']} ms, constructed +{window['construct_ms']} ms, "
+                  f"first paint at {window['first_paint_ms']} ms, {window['items']} item(s) loaded at {window['dataset_loaded_ms']} ms")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())